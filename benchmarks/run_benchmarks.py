@@ -0,0 +1,212 @@
+import argparse
+import contextlib
+import glob
+import io
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+from benchmarks.synthetic_universe import write_universe, generate_embeddings
+from dcf_app.services.nlp_service import use_encoder, get_encoder, ENCODERS
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_OUTPUT_DIR = os.path.join("results", "benchmarks")
+REGRESSION_RATIO = 1.2
+
+
+def _measure(fn, repeat: int) -> dict:
+    """Runs fn repeat times (its output silenced) and summarizes the wall times in ms."""
+    times = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            times.append(1000 * (time.perf_counter() - start))
+    return {
+        "median_ms": float(np.median(times)),
+        "min_ms": float(np.min(times)),
+        "max_ms": float(np.max(times)),
+        "repeat": repeat,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_size(n: int, repeat: int = 5, seed: int = 0) -> dict:
+    """
+    Benchmarks one universe size in the current working directory, which
+    receives the synthetic universe and the vector caches.
+
+    Returns:
+        dict: {benchmark name: timing summary}
+    """
+    from dcf_app.utils import loader
+    from dcf_app.models.peer_matcher import (
+        prepare_vectors, build_peer_matrix, find_closest_peers, load_matching_universe
+    )
+    from dcf_app.models.three_statement_model import forecast_3_statement, forecast_3_statement_batch
+    from dcf_app.models.dcf_model import discounted_cash_flow, discounted_cash_flow_batch
+    from dcf_app.models.dcf_generator import run_sensitivity_analysis
+    from dcf_app.services.peer_matcher_service import run_peer_match_pipeline
+
+    path = os.path.abspath(f"synthetic_universe_{n}.csv")
+    universe = write_universe(n, path, seed=seed)
+    target = universe.iloc[0].to_dict()
+    heavy_repeat = max(1, min(repeat, 3 if n >= 100000 else repeat))
+    results = {}
+
+    # prepare_vectors and the sync pipeline read the universe from loader.PEER_UNIVERSE_CSV
+    original_path = loader.PEER_UNIVERSE_CSV
+    loader.PEER_UNIVERSE_CSV = path
+    try:
+        results["prepare_vectors_cold"] = _measure(lambda: prepare_vectors(target["name"]), 1)
+        results["prepare_vectors_warm"] = _measure(lambda: prepare_vectors(target["name"]), heavy_repeat)
+        results["run_peer_match_pipeline"] = _measure(
+            lambda: run_peer_match_pipeline(target["name"]), heavy_repeat
+        )
+    finally:
+        loader.PEER_UNIVERSE_CSV = original_path
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        peer_universe = load_matching_universe(path)
+    results["run_peer_match_pipeline_preloaded"] = _measure(
+        lambda: run_peer_match_pipeline(target["name"], peer_universe=peer_universe), repeat
+    )
+
+    # Similarity search over encoder-independent clustered embeddings
+    peers = universe.to_dict(orient="records")
+    for peer, vector in zip(peers, generate_embeddings(universe, seed=seed)):
+        peer["vector"] = vector
+    peer_matrix = build_peer_matrix(peers)
+    queries = [peers[i] for i in np.random.default_rng(seed).choice(n, min(repeat, n), replace=False)]
+    query_iter = itertools.cycle(queries)
+
+    def search(peer_matrix=peer_matrix):
+        query = next(query_iter)
+        find_closest_peers(query["vector"], peers, top_k=5, target_name=query["name"], peer_matrix=peer_matrix)
+
+    results["find_closest_peers"] = _measure(search, repeat)
+    results["find_closest_peers_with_matrix_build"] = _measure(lambda: search(peer_matrix=None), heavy_repeat)
+
+    # Valuation kernels: one company, then the whole universe at once
+    inputs = {k: target[k] for k in ("revenue_base", "revenue_growth", "ebitda_margin", "capex_pct",
+                                     "depreciation_pct", "nwc_pct", "tax_rate")}
+    fcfs = [year["fcf"] for year in forecast_3_statement(**inputs)]
+    columns = {k: universe[k].to_numpy() for k in inputs}
+    batch_fcfs = forecast_3_statement_batch(**columns)["fcf"]
+
+    results["forecast_3_statement"] = _measure(lambda: forecast_3_statement(**inputs), repeat)
+    results["forecast_3_statement_batch"] = _measure(lambda: forecast_3_statement_batch(**columns), repeat)
+    results["discounted_cash_flow"] = _measure(lambda: discounted_cash_flow(fcfs, 0.10, 0.03), repeat)
+    results["discounted_cash_flow_batch"] = _measure(lambda: discounted_cash_flow_batch(batch_fcfs, 0.10, 0.03),
+                                                     repeat)
+    results["sensitivity_grid"] = _measure(
+        lambda: run_sensitivity_analysis(fcfs, (0.08, 0.12), (0.02, 0.04), num_points=100), repeat
+    )
+    return results
+
+
+def compare_runs(previous: dict, current: dict, threshold: float = REGRESSION_RATIO) -> list[dict]:
+    """
+    Median-time ratios (current / previous) for benchmarks present in both runs.
+
+    Returns:
+        list[dict]: One entry per benchmark with "size", "name", "ratio" and "regression"
+    """
+    rows = []
+    for size, benches in current["sizes"].items():
+        for name, timing in benches.items():
+            before = previous.get("sizes", {}).get(size, {}).get(name)
+            if not before or not before["median_ms"]:
+                continue
+            ratio = timing["median_ms"] / before["median_ms"]
+            rows.append({"size": size, "name": name, "ratio": ratio, "regression": ratio > threshold})
+    return rows
+
+
+def run_benchmarks(sizes=None, repeat: int = 5, output_dir: str = DEFAULT_OUTPUT_DIR, workdir: str = None,
+                   seed: int = 0) -> str:
+    """
+    Runs every benchmark at each universe size and writes the results as JSON.
+
+    Caches and synthetic universes live in workdir (a fresh temporary
+    directory by default), so runs start cold and never touch the real
+    vector caches. The previous result file in output_dir, if any, is
+    compared against and regressions are reported.
+
+    Returns:
+        str: Path of the JSON result file
+    """
+    sizes = sizes or DEFAULT_SIZES
+    output_dir = os.path.abspath(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    previous_files = sorted(glob.glob(os.path.join(output_dir, "benchmark_*.json")))
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "encoder": get_encoder().model_id,
+        "seed": seed,
+        "sizes": {},
+    }
+
+    cwd = os.getcwd()
+    workdir = workdir or tempfile.mkdtemp(prefix="dcf_bench_")
+    os.chdir(workdir)
+    try:
+        for n in sizes:
+            print(f"⏱️ Benchmarking {n} companies...")
+            report["sizes"][str(n)] = run_size(n, repeat=repeat, seed=seed)
+            for name, timing in report["sizes"][str(n)].items():
+                print(f"   {name:<40} {timing['median_ms']:>12.3f} ms")
+    finally:
+        os.chdir(cwd)
+
+    path = os.path.join(output_dir, f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📁 Benchmark results → {path}")
+
+    if previous_files:
+        with open(previous_files[-1], "r") as f:
+            previous = json.load(f)
+        for row in compare_runs(previous, report):
+            flag = "⚠️" if row["regression"] else "  "
+            print(f"{flag} {row['size']:>7} {row['name']:<40} x{row['ratio']:.2f} vs {os.path.basename(previous_files[-1])}")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the peer-matching and valuation stages on synthetic universes")
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=DEFAULT_SIZES,
+                        help="Comma-separated universe sizes (default: 1000,10000,100000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per benchmark")
+    parser.add_argument("--output_dir", type=str, default=DEFAULT_OUTPUT_DIR, help="Where result JSON files go")
+    parser.add_argument("--workdir", type=str, help="Directory for synthetic universes and caches (default: temp)")
+    parser.add_argument("--encoder", choices=sorted(ENCODERS), default="hashing",
+                        help="Description encoder (default: the model-free hashing encoder)")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed")
+    args = parser.parse_args()
+
+    use_encoder(args.encoder)
+    run_benchmarks(sizes=args.sizes, repeat=args.repeat, output_dir=args.output_dir,
+                   workdir=args.workdir, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# Sector -> (industries, description vocabulary); mirrors the sectors of the bundled universe
+SECTORS = {
+    "Technology": (["Software - Application", "Semiconductors", "Information Technology Services"],
+                   ["cloud", "software", "platform", "data", "semiconductor", "analytics", "enterprise", "chips"]),
+    "Healthcare": (["Biotechnology", "Medical Devices", "Drug Manufacturers"],
+                   ["clinical", "therapies", "patients", "diagnostic", "biologics", "devices", "oncology", "drug"]),
+    "Industrials": (["Airlines", "Aerospace & Defense", "Specialty Industrial Machinery"],
+                    ["manufacturing", "equipment", "aerospace", "logistics", "machinery", "engineering", "defense"]),
+    "Consumer Cyclical": (["Specialty Retail", "Auto Parts", "Restaurants"],
+                          ["retail", "stores", "apparel", "restaurants", "automotive", "brands", "consumers"]),
+    "Financial Services": (["Banks - Regional", "Asset Management", "Insurance"],
+                           ["banking", "loans", "deposits", "insurance", "asset", "wealth", "lending"]),
+    "Energy": (["Oil & Gas E&P", "Oil & Gas Midstream"],
+               ["oil", "gas", "drilling", "pipelines", "exploration", "reserves", "refining"]),
+    "Utilities": (["Utilities - Regulated Electric"],
+                  ["electric", "utility", "transmission", "customers", "power", "grid", "regulated"]),
+}
+COMMON_WORDS = ["company", "provides", "services", "products", "customers", "operates", "through", "segments",
+                "united", "states", "international", "solutions"]
+
+
+def generate_universe(n: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Deterministic synthetic peer universe with the columns of
+    dcf_app/data/peer_universe.csv.
+
+    Descriptions are drawn from a per-sector vocabulary so text similarity
+    follows sectors; fundamentals are drawn from ranges typical of the bundled
+    universe, with a few missing P/E ratios.
+
+    Args:
+        n (int): Number of companies
+        seed (int): Same seed, same universe
+
+    Returns:
+        pd.DataFrame: One row per company
+    """
+    rng = np.random.default_rng(seed)
+    sector_names = list(SECTORS)
+    sectors = rng.choice(len(sector_names), size=n)
+
+    rows = []
+    for i in range(n):
+        sector = sector_names[sectors[i]]
+        industries, vocabulary = SECTORS[sector]
+        words = rng.choice(vocabulary, size=12).tolist() + rng.choice(COMMON_WORDS, size=8).tolist()
+        rng.shuffle(words)
+        rows.append({
+            "ticker": f"SYN{i:06d}",
+            "name": f"Synthetic Company {i}",
+            "description": f"Synthetic Company {i} " + " ".join(words) + ".",
+            "sector": sector,
+            "industry": industries[rng.integers(len(industries))],
+        })
+
+    df = pd.DataFrame(rows)
+    df["revenue_base"] = np.round(rng.lognormal(mean=20.5, sigma=1.5, size=n), 0)
+    df["revenue_growth"] = np.round(rng.normal(0.08, 0.06, size=n), 4)
+    df["ebitda_margin"] = np.round(rng.uniform(0.05, 0.45, size=n), 4)
+    df["ev_ebitda"] = np.round(rng.uniform(3.0, 30.0, size=n), 3)
+    df["pe_ratio"] = np.where(rng.random(n) < 0.3, np.nan, np.round(rng.uniform(6.0, 50.0, size=n), 3))
+    df["earnings"] = np.round(df["revenue_base"] * rng.uniform(0.02, 0.2, size=n), 0)
+    df["capex_pct"] = np.round(rng.uniform(0.01, 0.10, size=n), 4)
+    df["depreciation_pct"] = np.round(rng.uniform(0.02, 0.08, size=n), 4)
+    df["nwc_pct"] = np.round(rng.uniform(0.01, 0.06, size=n), 4)
+    df["tax_rate"] = 0.21
+    return df
+
+
+def generate_embeddings(universe: pd.DataFrame, dim: int = 384, spread: float = 0.6, seed: int = 0) -> np.ndarray:
+    """
+    Deterministic unit-length float32 embeddings clustered by sector (and
+    industry), for similarity benchmarks that should not depend on an encoder.
+
+    Returns:
+        np.ndarray: (len(universe) x dim) matrix, rows in universe order
+    """
+    rng = np.random.default_rng(seed)
+    centers = {s: rng.normal(size=dim) for s in sorted(universe["sector"].unique())}
+    offsets = {s: rng.normal(size=dim) * 0.5 for s in sorted(universe["industry"].unique())}
+    base = np.vstack([centers[s] + offsets[ind] for s, ind in zip(universe["sector"], universe["industry"])])
+    matrix = (base + spread * rng.normal(size=base.shape)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def write_universe(n: int, path: str, seed: int = 0) -> pd.DataFrame:
+    """Writes generate_universe(n, seed) to a CSV at path and returns it."""
+    df = generate_universe(n, seed=seed)
+    df.to_csv(path, index=False)
+    return df
@@ -1,8 +1,17 @@
 import os
-import yfinance as yf
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import date
 import pandas as pd
 from tqdm import tqdm
 from collections import defaultdict
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dcf_app.utils.yf_cache import CachedTicker, get_yf_cache
+from dcf_app.services.universe_refresh import refresh_universe
 
 # === Output Folder and File ===
 output_dir = os.path.join("dcf_app", "data")
@@ -14,6 +23,57 @@ TICKER_SOURCE = "https://datahub.io/core/nasdaq-listings/r/nasdaq-listed-symbols
 EXCLUDED_SECTORS = {"Biotechnology", "Shell Companies", "SPACs", "Blank Check", None}
 MIN_REVENUE = 50_000_000
 VALID_MULTIPLE_RANGE = (3, 30)
+MAX_TICKERS = 2000
+MAX_WORKERS = 8
+REQUESTS_PER_SECOND = 4.0  # Ticker fetches per second across all workers
+MAX_RETRIES = 4
+BACKOFF_SECONDS = 1.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens refill per second up to `capacity`.
+    acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: float = None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        while True:
+            with self._lock:
+                now = self._clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            self._sleep(wait)
+
+
+def with_retries(fetch, ticker, limiter: TokenBucket = None, max_retries: int = MAX_RETRIES,
+                 backoff: float = BACKOFF_SECONDS, sleep=time.sleep):
+    """
+    Calls fetch(ticker), retrying failures with exponential backoff and jitter.
+    Every attempt (including retries) waits for a rate-limiter token.
+    The last exception is re-raised once retries are exhausted.
+    """
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return fetch(ticker)
+        except Exception:
+            if attempt == max_retries:
+                raise
+            sleep(backoff * (2 ** attempt) * (0.5 + random.random()))
 
 def get_all_tickers():
     try:
@@ -58,51 +118,144 @@ def is_valid_company(row):
     except:
         return False
 
-def build_peer_universe():
-    tickers = get_all_tickers()
+def fetch_ticker_row(ticker: str, refresh: bool = False) -> dict:
+    """
+    Pulls one ticker's universe row from yfinance. With refresh=True the
+    ticker's cached responses are dropped first, so the row is built from a
+    new fetch rather than from data up to a TTL old.
+    """
+    if refresh:
+        get_yf_cache().invalidate(ticker)
+    t = CachedTicker(ticker)
+    info = t.info
+
+    return {
+        "ticker": ticker,
+        "name": info.get("shortName") or info.get("longName"),
+        "description": (info.get("longBusinessSummary") or "").strip(),
+        "sector": info.get("sector"),
+        "industry": info.get("industry"),
+        "revenue_base": info.get("totalRevenue"),
+        "revenue_growth": calculate_revenue_growth(t),
+        "ebitda_margin": info.get("ebitdaMargins"),
+        "ev_ebitda": info.get("enterpriseToEbitda"),
+        "pe_ratio": info.get("trailingPE"),
+    }
+
+
+def load_checkpoint(path: str) -> dict:
+    """
+    Reads the per-ticker checkpoint (JSON Lines, one record per finished ticker).
+    Later records win; a torn last line from an interrupted run is ignored.
+
+    Returns:
+        dict: ticker -> {"ticker", "status": "saved" | "skipped" | "error", "row"}
+    """
+    records = {}
+    if not os.path.exists(path):
+        return records
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records[record["ticker"]] = record
+    return records
+
+
+def build_peer_universe(
+    tickers: list[str] = None,
+    fetch=None,
+    max_workers: int = MAX_WORKERS,
+    requests_per_second: float = REQUESTS_PER_SECOND,
+    max_retries: int = MAX_RETRIES,
+    backoff: float = BACKOFF_SECONDS,
+    checkpoint_path: str = None,
+    output_dir: str = output_dir,
+    refresh: bool = False,
+):
+    """
+    Fetches the universe concurrently and writes the sector and combined CSVs.
+
+    Tickers are fetched by a bounded thread pool behind a shared token bucket,
+    with retries and backoff on failure. Each finished ticker is appended to a
+    checkpoint file straight away, so an interrupted build resumes where it
+    stopped; tickers that failed after all retries are tried again next run.
+
+    With refresh=True every ticker is fetched again (the checkpoint is per
+    day) and the combined universe is updated through refresh_universe, which
+    re-embeds only the companies whose data changed.
+
+    Args:
+        tickers (list[str]): Tickers to scan (default: first MAX_TICKERS listed symbols)
+        fetch: ticker -> row dict (default: fetch_ticker_row, bypassing the
+            yfinance cache when refreshing); swap in a local stand-in for testing
+        max_workers (int): Concurrent fetches
+        requests_per_second (float): Rate limit across all workers
+        max_retries (int): Retries per ticker after the first attempt
+        backoff (float): Base backoff in seconds (doubles each retry)
+        checkpoint_path (str): Per-ticker JSON Lines checkpoint (default: in output_dir)
+        output_dir (str): Where the CSVs are written
+        refresh (bool): Incremental refresh of an existing universe
+
+    Returns:
+        pd.DataFrame: The combined universe
+    """
+    if tickers is None:
+        tickers = get_all_tickers()[:MAX_TICKERS]
+    if fetch is None:
+        fetch = partial(fetch_ticker_row, refresh=refresh)
     print(f"🔍 Found {len(tickers)} tickers to scan...")
 
+    combined_path = os.path.join(output_dir, "peer_universe.csv")
+    checkpoint_name = f"peer_universe_refresh_{date.today():%Y%m%d}.jsonl" if refresh else "peer_universe_checkpoint.jsonl"
+    checkpoint_path = checkpoint_path or os.path.join(output_dir, checkpoint_name)
     existing_tickers = set()
-    if os.path.exists(combined_output_path):
-        existing_df = pd.read_csv(combined_output_path)
+    if os.path.exists(combined_path) and not refresh:
+        existing_df = pd.read_csv(combined_path)
         existing_tickers = set(existing_df['ticker'].tolist())
 
-    sector_to_rows = defaultdict(list)
-    saved, skipped = 0, 0
+    records = load_checkpoint(checkpoint_path)
+    done = {t for t, r in records.items() if r["status"] != "error"}
+    pending = [t for t in dict.fromkeys(tickers) if t not in existing_tickers and t not in done]
+    print(f"⏩ Resuming: {len(done)} tickers already checkpointed, {len(pending)} to fetch")
 
-    for ticker in tqdm(tickers[:2000]):
-        if ticker in existing_tickers:
-            continue
+    # Terminate a torn last line so the first new record is not glued onto it
+    if os.path.exists(checkpoint_path) and os.path.getsize(checkpoint_path) > 0:
+        with open(checkpoint_path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
 
-        try:
-            t = yf.Ticker(ticker)
-            info = t.info
-
-            row = {
-                "ticker": ticker,
-                "name": info.get("shortName") or info.get("longName"),
-                "description": info.get("longBusinessSummary", "").strip(),
-                "sector": info.get("sector"),
-                "industry": info.get("industry"),
-                "revenue_base": info.get("totalRevenue"),
-                "revenue_growth": calculate_revenue_growth(t),
-                "ebitda_margin": info.get("ebitdaMargins"),
-                "ev_ebitda": info.get("enterpriseToEbitda"),
-                "pe_ratio": info.get("trailingPE"),
-            }
-
-            if not is_valid_company(row):
-                skipped += 1
-                continue
+    limiter = TokenBucket(requests_per_second)
 
-            sector_key = row["sector"].lower().replace(" ", "_")
-            sector_to_rows[sector_key].append(row)
-            saved += 1
+    def process(ticker):
+        row = with_retries(fetch, ticker, limiter=limiter, max_retries=max_retries, backoff=backoff)
+        status = "saved" if row is not None and is_valid_company(row) else "skipped"
+        return {"ticker": ticker, "status": status, "row": row if status == "saved" else None}
 
-        except Exception as e:
-            print(f"❌ Error processing {ticker}: {e}")
-            skipped += 1
-            continue
+    with open(checkpoint_path, "a") as checkpoint, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(process, ticker): ticker for ticker in pending}
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            ticker = futures[future]
+            try:
+                record = future.result()
+            except Exception as e:
+                print(f"❌ Error processing {ticker}: {e}")
+                record = {"ticker": ticker, "status": "error", "row": None}
+            checkpoint.write(json.dumps(record) + "\n")
+            checkpoint.flush()
+            records[ticker] = record
+
+    sector_to_rows = defaultdict(list)
+    for ticker in tickers:
+        record = records.get(ticker)
+        if record and record["status"] == "saved":
+            row = record["row"]
+            sector_to_rows[row["sector"].lower().replace(" ", "_")].append(row)
+    saved = sum(len(rows) for rows in sector_to_rows.values())
+    skipped = sum(1 for t in tickers if t in records and records[t]["status"] != "saved")
 
     # ✅ Save cleaned results
     full_dataset = []
@@ -113,9 +266,18 @@ def build_peer_universe():
         print(f"📁 Saved {len(df_sector)} companies → {path}")
         full_dataset.extend(rows)
 
-    pd.DataFrame(full_dataset).to_csv(combined_output_path, index=False)
-    print(f"\n📦 Combined peer universe saved → {combined_output_path}")
+    combined = pd.DataFrame(full_dataset)
+    if refresh:
+        refresh_universe(full_dataset, universe_path=combined_path)
+    else:
+        combined.to_csv(combined_path, index=False)
+    print(f"\n📦 Combined peer universe saved → {combined_path}")
     print(f"✅ Final stats: {saved} saved, {skipped} skipped")
+    return combined
 
 if __name__ == "__main__":
-    build_peer_universe()
+    parser = argparse.ArgumentParser(description="Build or refresh the peer universe")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Refetch all tickers and re-embed only the companies that changed")
+    args = parser.parse_args()
+    build_peer_universe(refresh=args.refresh)
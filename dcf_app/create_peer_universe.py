@@ -1,6 +1,6 @@
 import os
 import time
-import yfinance as yf
+from dcf_app.utils.yf_cache import CachedTicker
 import pandas as pd
 
 # ✅ High-quality large caps — consistent data
@@ -28,7 +28,7 @@ def calculate_revenue_growth(ticker_obj):
 
 for i, ticker in enumerate(tickers):
     try:
-        t = yf.Ticker(ticker)
+        t = CachedTicker(ticker)
         info = t.info
 
         revenue = info.get("totalRevenue")
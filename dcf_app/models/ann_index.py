@@ -0,0 +1,205 @@
+import time
+import numpy as np
+from dcf_app.models.similarity import normalize_rows, top_k_indices
+
+
+def _matrix_checksum(matrix: np.ndarray) -> float:
+    return float(np.asarray(matrix, dtype=np.float64).sum())
+
+
+def spherical_kmeans(matrix: np.ndarray, n_clusters: int, n_iter: int = 20, seed: int = 0) -> np.ndarray:
+    """
+    k-means on unit vectors using cosine similarity; returns unit-length centroids.
+    Empty clusters are re-seeded from random points.
+    """
+    rng = np.random.default_rng(seed)
+    n_clusters = min(n_clusters, matrix.shape[0])
+    centroids = matrix[rng.choice(matrix.shape[0], n_clusters, replace=False)].copy()
+
+    for _ in range(n_iter):
+        assignments = np.argmax(matrix @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, matrix)
+        counts = np.bincount(assignments, minlength=n_clusters)
+
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = matrix[rng.choice(matrix.shape[0], int(empty.sum()), replace=False)]
+        new_centroids = normalize_rows(sums)
+        if np.allclose(new_centroids, centroids, atol=1e-6):
+            centroids = new_centroids
+            break
+        centroids = new_centroids
+
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest-neighbour index for cosine similarity.
+
+    The peer matrix is split into n_lists clusters with spherical k-means; a
+    query is only compared against the rows of its n_probe closest clusters.
+    Raising n_probe trades speed for recall (n_probe == n_lists is exact).
+
+    Only the cluster structure is persisted; load() re-attaches it to the
+    peer matrix it was built from.
+    """
+
+    def __init__(self, n_lists: int = None, n_probe: int = 8, n_iter: int = 20,
+                 train_size: int = None, seed: int = 0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.train_size = train_size
+        self.seed = seed
+        self.matrix = None
+        self.centroids = None
+        self.list_rows = None     # Row ids grouped by list
+        self.list_offsets = None  # list_rows[list_offsets[i]:list_offsets[i + 1]] belong to list i
+
+    def fit(self, matrix: np.ndarray) -> "IVFIndex":
+        """
+        Clusters the (row-normalized) peer matrix.
+
+        Args:
+            matrix (np.ndarray): (n x dim) peer matrix, ideally already unit-length rows
+        """
+        self.matrix = normalize_rows(matrix)
+        n_rows = self.matrix.shape[0]
+        if n_rows == 0:
+            raise ValueError("Cannot build an index over an empty matrix.")
+
+        n_lists = self.n_lists or max(1, int(np.sqrt(n_rows)))
+        train_size = min(n_rows, self.train_size or 256 * n_lists)
+        rng = np.random.default_rng(self.seed)
+        sample = self.matrix[rng.choice(n_rows, train_size, replace=False)] if train_size < n_rows else self.matrix
+
+        self.centroids = spherical_kmeans(sample, n_lists, n_iter=self.n_iter, seed=self.seed)
+        self.n_lists = self.centroids.shape[0]
+        self._assign()
+        return self
+
+    def _assign(self, block_size: int = 65536):
+        assignments = np.empty(self.matrix.shape[0], dtype=np.int64)
+        for start in range(0, self.matrix.shape[0], block_size):
+            block = self.matrix[start:start + block_size]
+            assignments[start:start + block_size] = np.argmax(block @ self.centroids.T, axis=1)
+
+        self.list_rows = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=self.n_lists)
+        self.list_offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def candidates(self, query, n_probe: int = None) -> np.ndarray:
+        """Row ids stored in the n_probe lists closest to the query."""
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        query = normalize_rows(np.asarray(query, dtype=np.float32))
+        lists = top_k_indices(self.centroids @ query, n_probe)
+        return np.concatenate([
+            self.list_rows[self.list_offsets[i]:self.list_offsets[i + 1]] for i in lists
+        ])
+
+    def search(self, query, top_k: int = 5, n_probe: int = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k rows by cosine similarity.
+
+        Returns:
+            tuple: (row ids, scores), best first
+        """
+        rows = self.candidates(query, n_probe=n_probe)
+        query = normalize_rows(np.asarray(query, dtype=np.float32))
+        scores = self.matrix[rows] @ query
+        best = top_k_indices(scores, top_k)
+        return rows[best], scores[best]
+
+    def save(self, path: str):
+        np.savez(
+            path,
+            centroids=self.centroids,
+            list_rows=self.list_rows,
+            list_offsets=self.list_offsets,
+            params=np.array([self.n_lists, self.n_probe, self.n_iter, self.seed], dtype=np.int64),
+            shape=np.array(self.matrix.shape, dtype=np.int64),
+            checksum=np.array(_matrix_checksum(self.matrix)),
+        )
+
+    @classmethod
+    def load(cls, path: str, matrix: np.ndarray) -> "IVFIndex":
+        """
+        Loads a saved index and re-attaches it to the matrix it was built from.
+        Raises ValueError if the matrix does not match the saved one.
+        """
+        data = np.load(path)
+        n_lists, n_probe, n_iter, seed = (int(x) for x in data["params"])
+        index = cls(n_lists=n_lists, n_probe=n_probe, n_iter=n_iter, seed=seed)
+        index.matrix = normalize_rows(matrix)
+
+        if tuple(data["shape"]) != index.matrix.shape or not np.isclose(
+                float(data["checksum"]), _matrix_checksum(index.matrix), rtol=1e-6):
+            raise ValueError(f"Index at {path} was built for a different peer matrix; rebuild it.")
+
+        index.centroids = data["centroids"]
+        index.list_rows = data["list_rows"]
+        index.list_offsets = data["list_offsets"]
+        return index
+
+
+def evaluate_recall(index: IVFIndex, queries: np.ndarray = None, top_k: int = 10,
+                    n_probe: int = None, n_queries: int = 200, seed: int = 0) -> dict:
+    """
+    Measures recall@k of the index against exact search over the same matrix.
+
+    Args:
+        index (IVFIndex): Fitted index
+        queries (np.ndarray): Query vectors (defaults to a sample of indexed rows)
+        top_k (int): k for recall@k
+        n_probe (int): Lists to probe (defaults to the index setting)
+        n_queries (int): Sample size when queries are not given
+
+    Returns:
+        dict: recall_at_k plus per-query timings and candidate counts
+    """
+    matrix = index.matrix
+    if queries is None:
+        rng = np.random.default_rng(seed)
+        queries = matrix[rng.choice(matrix.shape[0], min(n_queries, matrix.shape[0]), replace=False)]
+    queries = normalize_rows(np.atleast_2d(queries))
+
+    start = time.perf_counter()
+    exact = [set(top_k_indices(matrix @ q, top_k).tolist()) for q in queries]
+    exact_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    approx = [set(index.search(q, top_k=top_k, n_probe=n_probe)[0].tolist()) for q in queries]
+    ann_seconds = time.perf_counter() - start
+
+    hits = sum(len(e & a) for e, a in zip(exact, approx))
+    total = sum(len(e) for e in exact)
+    candidates = np.mean([index.candidates(q, n_probe=n_probe).shape[0] for q in queries])
+
+    return {
+        "recall_at_k": hits / total if total else 1.0,
+        "top_k": top_k,
+        "n_probe": min(n_probe or index.n_probe, index.n_lists),
+        "n_lists": index.n_lists,
+        "n_queries": len(queries),
+        "mean_candidates": float(candidates),
+        "exact_ms_per_query": 1000 * exact_seconds / len(queries),
+        "ann_ms_per_query": 1000 * ann_seconds / len(queries),
+    }
+
+
+if __name__ == "__main__":
+    import os
+    from dcf_app.utils.embedding_store import get_description_store, VECTOR_CACHE_DIR
+
+    store = get_description_store()
+    if len(store) == 0:
+        print("⚠️ Embedding store is empty; run the peer matcher first.")
+    else:
+        ivf = IVFIndex().fit(store.matrix)
+        path = os.path.join(VECTOR_CACHE_DIR, "ivf_index.npz")
+        ivf.save(path)
+        print(f"📁 Saved IVF index ({ivf.n_lists} lists over {len(store)} rows) → {path}")
+        for probe in (1, 4, 8, 16):
+            print(evaluate_recall(ivf, n_probe=probe))
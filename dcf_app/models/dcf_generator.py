@@ -1,47 +1,51 @@
+import logging
 import random
-from dcf_app.models.three_statement_model import forecast_3_statement
-from dcf_app.models.dcf_model import discounted_cash_flow
+from dcf_app.models.three_statement_model import forecast_3_statement, forecast_3_statement_batch
+from dcf_app.models.dcf_model import discounted_cash_flow, discounted_cash_flow_grid
 import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
 
 def run_sensitivity_analysis(
     forecast: list[dict],
     wacc_range: tuple,
     terminal_growth_range: tuple,
-    step: float = 0.01
+    step: float = 0.01,
+    num_points: int = None
 ) -> dict:
     """
     Builds a sensitivity table of DCF valuations over WACC and terminal growth rate ranges.
 
     Args:
-        forecast (list[dict]): List of forecasted financials per year (must include 'fcf')
+        forecast (list[dict]): List of forecasted financials per year (must include 'fcf'),
+            or the FCFs themselves
         wacc_range (tuple): (min_wacc, max_wacc)
         terminal_growth_range (tuple): (min_tgr, max_tgr)
         step (float): increment for both axes (default 0.01)
+        num_points (int): if set, use this many evenly spaced points per axis instead of step
 
     Returns:
         dict: {
             "wacc_values": [...],
             "terminal_growth_values": [...],
-            "valuation_matrix": [[...], [...], ...]
+            "valuation_matrix": [[...], [...], ...]  (None where WACC <= terminal growth)
         }
     """
-    fcfs = [year.get("fcf", 0) for year in forecast]
+    fcfs = [year.get("fcf", 0) if isinstance(year, dict) else year for year in forecast]
     if not fcfs:
         raise ValueError("⚠️ No forecasted FCFs found for sensitivity analysis.")
 
-    wacc_values = np.arange(wacc_range[0], wacc_range[1] + step, step)
-    tg_values = np.arange(terminal_growth_range[0], terminal_growth_range[1] + step, step)
+    if num_points:
+        wacc_values = np.linspace(wacc_range[0], wacc_range[1], num_points)
+        tg_values = np.linspace(terminal_growth_range[0], terminal_growth_range[1], num_points)
+    else:
+        wacc_values = np.arange(wacc_range[0], wacc_range[1] + step, step)
+        tg_values = np.arange(terminal_growth_range[0], terminal_growth_range[1] + step, step)
 
-    matrix = []
-    for wacc in wacc_values:
-        row = []
-        for tg in tg_values:
-            try:
-                value = discounted_cash_flow(fcfs, wacc=wacc, terminal_growth=tg)
-                row.append(round(value, 2))
-            except Exception:
-                row.append(None)
-        matrix.append(row)
+    grid = np.round(discounted_cash_flow_grid(fcfs, wacc_values, tg_values), 2)
+    matrix = np.where(np.isnan(grid), None, grid).tolist()
 
     return {
         "wacc_values": wacc_values.tolist(),
@@ -49,6 +53,20 @@ def run_sensitivity_analysis(
         "valuation_matrix": matrix
     }
 
+
+def sensitivity_to_frame(sensitivity: dict) -> pd.DataFrame:
+    """
+    Labels a run_sensitivity_analysis result as a WACC x TGR DataFrame
+    (the layout of results/sensitivity_matrix.csv).
+    """
+    return pd.DataFrame(
+        sensitivity["valuation_matrix"],
+        index=[f"WACC: {w:.2%}" for w in sensitivity["wacc_values"]],
+        columns=[f"TGR: {g:.2%}" for g in sensitivity["terminal_growth_values"]],
+        dtype=float
+    )
+
+
 def mock_dcf_valuation(company_description: str) -> float:
     """
     Temporary placeholder DCF logic for early UI testing or stubbing.
@@ -72,6 +90,19 @@ def generate_forecasted_fcfs(inputs: dict) -> list:
     fcfs = [year["fcf"] for year in forecast]
     return fcfs
 
+def generate_forecasted_fcfs_batch(inputs: dict) -> np.ndarray:
+    """
+    Forecast FCFs for many companies at once.
+
+    Args:
+        inputs (dict): Model assumptions, each a scalar or a length-N array
+
+    Returns:
+        np.ndarray: (N x years) Forecasted Free Cash Flows
+    """
+    return forecast_3_statement_batch(**inputs)["fcf"]
+
+
 def run_dcf_from_inputs(inputs, wacc=0.10, terminal_growth=0.03, exit_multiple=None):
     """
     Complete DCF valuation from raw inputs using centralized discounted_cash_flow().
@@ -100,8 +131,8 @@ def run_dcf_from_inputs(inputs, wacc=0.10, terminal_growth=0.03, exit_multiple=N
         exit_multiple=exit_multiple,
         method="exit" if exit_multiple else "perpetuity"
     )
-    print("📈 FCFs:", fcfs)
-    print("📊 Terminal Info:", terminal_info)
+    logger.debug("FCFs: %s", fcfs)
+    logger.debug("Terminal Info: %s", terminal_info)
 
     return value, {
         "method": "exit" if exit_multiple else "perpetuity",
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def discounted_cash_flow(
     fcfs: list[float],
     wacc: float = 0.10,
@@ -44,3 +47,73 @@ def discounted_cash_flow(
         "exit_multiple": exit_multiple
     }
 
+
+
+def discounted_cash_flow_grid(
+    fcfs: list[float],
+    wacc_values,
+    terminal_growth_values
+) -> np.ndarray:
+    """
+    Perpetuity-method mid-year DCF over a whole WACC x terminal growth grid.
+
+    Discount factors are computed once per WACC and the terminal values as an
+    outer product, so the full grid costs a few array operations.
+
+    Args:
+        fcfs: Forecasted Free Cash Flows (in millions)
+        wacc_values: WACC axis (rows)
+        terminal_growth_values: Terminal growth axis (columns)
+
+    Returns:
+        np.ndarray: (len(wacc_values) x len(terminal_growth_values)) enterprise values,
+        NaN where WACC <= terminal growth (no finite perpetuity value)
+    """
+    fcfs = np.asarray(fcfs, dtype=np.float64)
+    wacc = np.asarray(wacc_values, dtype=np.float64)[:, None]
+    growth = np.asarray(terminal_growth_values, dtype=np.float64)[None, :]
+    n = fcfs.shape[0]
+
+    periods = np.arange(1, n + 1) - 0.5  # Mid-year convention
+    discount_factors = (1 + wacc) ** -periods  # (W x n)
+    pv_fcfs = (discount_factors @ fcfs)[:, None]  # (W x 1)
+
+    spread = wacc - growth
+    valid = spread > 0
+    terminal_value = np.divide(fcfs[-1] * (1 + growth), spread,
+                               out=np.full(spread.shape, np.nan), where=valid)
+    terminal_discounted = terminal_value * discount_factors[:, -1:]
+
+    return pv_fcfs + terminal_discounted
+
+
+def discounted_cash_flow_batch(
+    fcfs,
+    wacc,
+    terminal_growth
+) -> np.ndarray:
+    """
+    Perpetuity-method mid-year DCF for many FCF paths at once.
+
+    Args:
+        fcfs: (N x years) Forecasted Free Cash Flows
+        wacc: Scalar or length-N discount rates
+        terminal_growth: Scalar or length-N terminal growth rates
+
+    Returns:
+        np.ndarray: Length-N enterprise values, NaN where WACC <= terminal growth
+    """
+    fcfs = np.atleast_2d(np.asarray(fcfs, dtype=np.float64))
+    n_paths, n = fcfs.shape
+    wacc = np.broadcast_to(np.asarray(wacc, dtype=np.float64), (n_paths,))[:, None]
+    growth = np.broadcast_to(np.asarray(terminal_growth, dtype=np.float64), (n_paths,))[:, None]
+
+    periods = np.arange(1, n + 1) - 0.5  # Mid-year convention
+    discount_factors = (1 + wacc) ** -periods  # (N x n)
+    pv_fcfs = np.einsum("ij,ij->i", fcfs, discount_factors)
+
+    spread = (wacc - growth)[:, 0]
+    terminal_value = np.divide(fcfs[:, -1] * (1 + growth[:, 0]), spread,
+                               out=np.full(n_paths, np.nan), where=spread > 0)
+
+    return pv_fcfs + terminal_value * discount_factors[:, -1]
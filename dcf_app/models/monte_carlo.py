@@ -0,0 +1,323 @@
+import numpy as np
+from scipy.special import ndtr
+from dcf_app.models.three_statement_model import forecast_3_statement_batch
+from dcf_app.models.dcf_model import discounted_cash_flow_batch
+
+SIMULATED_PARAMS = ("revenue_growth", "ebitda_margin", "capex_pct", "wacc", "terminal_growth")
+FIXED_INPUTS = ("revenue_base", "depreciation_pct", "nwc_pct", "tax_rate")
+
+# Default spread around each base assumption (normal std)
+DEFAULT_STD = {
+    "revenue_growth": 0.03,
+    "ebitda_margin": 0.03,
+    "capex_pct": 0.01,
+    "wacc": 0.01,
+    "terminal_growth": 0.005,
+}
+
+
+def _transform(z: np.ndarray, spec: dict) -> np.ndarray:
+    """
+    Maps correlated standard normal draws onto one parameter's marginal.
+
+    Supported specs:
+        {"dist": "normal", "mean", "std", optional "low"/"high" clip}
+        {"dist": "lognormal", "mu", "sigma"}
+        {"dist": "uniform", "low", "high"}
+        {"dist": "triangular", "low", "mode", "high"}
+        {"dist": "fixed", "value"}
+    """
+    dist = spec.get("dist", "normal")
+    if dist == "normal":
+        values = spec["mean"] + spec["std"] * z
+        if "low" in spec or "high" in spec:
+            values = np.clip(values, spec.get("low", -np.inf), spec.get("high", np.inf))
+        return values
+    if dist == "lognormal":
+        return np.exp(spec["mu"] + spec["sigma"] * z)
+    if dist == "fixed":
+        return np.full(z.shape, float(spec["value"]))
+
+    u = np.clip(ndtr(z), 1e-12, 1 - 1e-12)
+    if dist == "uniform":
+        return spec["low"] + (spec["high"] - spec["low"]) * u
+    if dist == "triangular":
+        low, mode, high = spec["low"], spec["mode"], spec["high"]
+        if not low <= mode <= high:
+            raise ValueError(f"Triangular distribution needs low <= mode <= high, got {low}, {mode}, {high}.")
+        if high == low:
+            return np.full(z.shape, float(low))
+        split = (mode - low) / (high - low)
+        return np.where(
+            u < split,
+            low + np.sqrt(u * (high - low) * (mode - low)),
+            high - np.sqrt((1 - u) * (high - low) * (high - mode))
+        )
+    raise ValueError(f"Unsupported distribution: {dist}")
+
+
+def _correlation_matrix(correlation) -> np.ndarray:
+    """
+    Builds the parameter correlation matrix from a full matrix or a
+    {(param_a, param_b): rho} dict (unlisted pairs are uncorrelated).
+    """
+    k = len(SIMULATED_PARAMS)
+    if correlation is None:
+        return np.eye(k)
+    if isinstance(correlation, dict):
+        matrix = np.eye(k)
+        for (a, b), rho in correlation.items():
+            i, j = SIMULATED_PARAMS.index(a), SIMULATED_PARAMS.index(b)
+            matrix[i, j] = matrix[j, i] = rho
+        return matrix
+    matrix = np.asarray(correlation, dtype=np.float64)
+    if matrix.shape != (k, k):
+        raise ValueError(f"Correlation matrix must be {k}x{k} in the order {SIMULATED_PARAMS}.")
+    return matrix
+
+
+def default_distributions(inputs: dict, wacc: float = 0.10, terminal_growth: float = 0.03) -> dict:
+    """
+    Normal distributions centred on a company's base assumptions.
+    """
+    centres = {
+        "revenue_growth": inputs.get("revenue_growth") or 0.0,
+        "ebitda_margin": inputs.get("ebitda_margin") or 0.0,
+        "capex_pct": inputs.get("capex_pct") or 0.0,
+        "wacc": wacc,
+        "terminal_growth": terminal_growth,
+    }
+    return {
+        name: {"dist": "normal", "mean": float(centre), "std": DEFAULT_STD[name]}
+        for name, centre in centres.items()
+    }
+
+
+class StreamingHistogram:
+    """
+    Fixed-bin histogram with under/overflow tracking, updated chunk by chunk.
+
+    Bin edges are set from the first chunk (its 0.1%-99.9% range, widened by
+    half on each side); quantiles are interpolated from the cumulative counts.
+    Mean and variance are merged across chunks without keeping the sample.
+    """
+
+    def __init__(self, bins: int = 2048):
+        self.bins = bins
+        self.edges = None
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+
+        if self.edges is None:
+            low, high = np.quantile(values, [0.001, 0.999])
+            pad = 0.5 * (high - low) or max(abs(low), 1.0) * 0.5
+            self.edges = np.linspace(low - pad, high + pad, self.bins + 1)
+
+        counts, _ = np.histogram(values, bins=self.edges)
+        self.counts += counts
+        self.underflow += int(np.count_nonzero(values < self.edges[0]))
+        self.overflow += int(np.count_nonzero(values > self.edges[-1]))
+
+        # Chan et al. parallel merge of mean / M2
+        n, chunk_mean = values.size, values.mean()
+        delta = chunk_mean - self.mean
+        total = self.count + n
+        self._m2 += ((values - chunk_mean) ** 2).sum() + delta ** 2 * self.count * n / total
+        self.mean += delta * n / total
+        self.count = total
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self._m2 / self.count)) if self.count else float("nan")
+
+    def quantiles(self, qs) -> dict:
+        if not self.count:
+            return {q: None for q in qs}
+        # Tails outside the edges are spread between the observed min/max and the edge
+        edges = np.concatenate([[min(self.min, self.edges[0])], self.edges, [max(self.max, self.edges[-1])]])
+        counts = np.concatenate([[self.underflow], self.counts, [self.overflow]])
+        cumulative = np.concatenate([[0], np.cumsum(counts)]) / self.count
+        return {q: float(np.interp(q, cumulative, edges)) for q in qs}
+
+
+def simulate_dcf(
+    inputs: dict,
+    distributions: dict = None,
+    correlation=None,
+    n_paths: int = 1_000_000,
+    chunk_size: int = 100_000,
+    years: int = 5,
+    quantiles=(0.05, 0.25, 0.5, 0.75, 0.95),
+    bins: int = 2048,
+    include_histogram: bool = True,
+    seed: int = None
+) -> dict:
+    """
+    Monte Carlo DCF: draws revenue_growth, ebitda_margin, capex_pct, WACC and
+    terminal growth (optionally correlated through a Gaussian copula) and values
+    every path with the batch forecast and DCF, chunk by chunk.
+
+    Only streaming statistics are kept, so memory is bounded by chunk_size
+    regardless of n_paths.
+
+    Args:
+        inputs (dict): Base assumptions (revenue_base, depreciation_pct, nwc_pct, tax_rate, ...)
+        distributions (dict): Per-parameter specs (see _transform); missing ones use
+            default_distributions around the base inputs
+        correlation: Correlation matrix or {(param_a, param_b): rho} dict
+        n_paths (int): Total number of simulated paths
+        chunk_size (int): Paths evaluated per array pass
+        years (int): Forecast horizon
+        quantiles: Quantile levels to report
+        bins (int): Histogram resolution
+        include_histogram (bool): Return histogram edges/counts
+        seed (int): RNG seed
+
+    Returns:
+        dict: Path counts, mean/std/min/max, quantiles and (optionally) the histogram
+    """
+    specs = default_distributions(inputs)
+    specs.update(distributions or {})
+
+    try:
+        cholesky = np.linalg.cholesky(_correlation_matrix(correlation))
+    except np.linalg.LinAlgError:
+        raise ValueError("Correlation matrix must be positive definite.")
+
+    fixed = {k: inputs.get(k) for k in FIXED_INPUTS}
+    rng = np.random.default_rng(seed)
+    stats = StreamingHistogram(bins=bins)
+    invalid = 0
+
+    for start in range(0, n_paths, chunk_size):
+        size = min(chunk_size, n_paths - start)
+        z = rng.standard_normal((size, len(SIMULATED_PARAMS))) @ cholesky.T
+        draws = {name: _transform(z[:, i], specs[name]) for i, name in enumerate(SIMULATED_PARAMS)}
+
+        forecast = forecast_3_statement_batch(
+            revenue_growth=draws["revenue_growth"],
+            ebitda_margin=draws["ebitda_margin"],
+            capex_pct=draws["capex_pct"],
+            years=years,
+            **fixed
+        )
+        values = discounted_cash_flow_batch(forecast["fcf"], draws["wacc"], draws["terminal_growth"])
+
+        finite = np.isfinite(values)
+        invalid += int(size - np.count_nonzero(finite))
+        stats.update(values[finite])
+
+    return _summarize(stats, n_paths, invalid, quantiles, include_histogram)
+
+
+def _summarize(stats: StreamingHistogram, n_paths: int, invalid: int, quantiles, include_histogram: bool) -> dict:
+    summary = {
+        "n_paths": n_paths,
+        "n_valid": stats.count,
+        "n_invalid": invalid,
+        "mean": float(stats.mean) if stats.count else None,
+        "std": stats.std if stats.count else None,
+        "min": float(stats.min) if stats.count else None,
+        "max": float(stats.max) if stats.count else None,
+        "quantiles": stats.quantiles(quantiles),
+    }
+    if include_histogram and stats.edges is not None:
+        summary["histogram"] = {"edges": stats.edges.tolist(), "counts": stats.counts.tolist(),
+                                "underflow": stats.underflow, "overflow": stats.overflow}
+    return summary
+
+
+def simulate_universe(
+    companies: list[dict],
+    n_paths: int = 20_000,
+    wacc: float = 0.10,
+    terminal_growth: float = 0.03,
+    correlation=None,
+    chunk_size: int = 50_000,
+    years: int = 5,
+    quantiles=(0.05, 0.25, 0.5, 0.75, 0.95),
+    bins: int = 2048,
+    include_histogram: bool = False,
+    seed: int = None
+) -> list[dict]:
+    """
+    Valuation ranges for every company under default_distributions; histograms
+    are left out unless requested.
+
+    Companies are simulated together: each pass stacks the paths of as many
+    companies as fit in chunk_size and runs one batch forecast and DCF over
+    all of them. This removes the per-company call overhead, which matters
+    when n_paths is small (about 1.7x faster at 1,000 paths each); with tens
+    of thousands of paths per company the array passes dominate either way.
+    When n_paths alone exceeds chunk_size, each company goes through
+    simulate_dcf to keep memory bounded.
+
+    Returns:
+        list[dict]: {"name", **simulate_dcf summary} per company
+    """
+    options = dict(correlation=correlation, chunk_size=chunk_size, years=years, quantiles=quantiles,
+                   bins=bins, include_histogram=include_histogram)
+    if n_paths > chunk_size:
+        # One child seed per company, so companies draw independent paths as in the batched case
+        seeds = np.random.SeedSequence(seed).spawn(len(companies))
+        return [
+            {"name": company.get("name"),
+             **simulate_dcf(company, distributions=default_distributions(company, wacc=wacc,
+                                                                         terminal_growth=terminal_growth),
+                            n_paths=n_paths, seed=company_seed, **options)}
+            for company, company_seed in zip(companies, seeds)
+        ]
+
+    try:
+        cholesky = np.linalg.cholesky(_correlation_matrix(correlation))
+    except np.linalg.LinAlgError:
+        raise ValueError("Correlation matrix must be positive definite.")
+
+    rng = np.random.default_rng(seed)
+    per_pass = max(1, chunk_size // n_paths)
+    results = []
+    for start in range(0, len(companies), per_pass):
+        block = companies[start:start + per_pass]
+        specs = [default_distributions(company, wacc=wacc, terminal_growth=terminal_growth) for company in block]
+
+        # One row of paths per company, flattened company-major: (len(block) * n_paths)
+        z = rng.standard_normal((len(block) * n_paths, len(SIMULATED_PARAMS))) @ cholesky.T
+        # default_distributions differ between companies only in their means
+        draws = {
+            name: _transform(z[:, i], {**specs[0][name], "mean": np.repeat([s[name]["mean"] for s in specs], n_paths)})
+            for i, name in enumerate(SIMULATED_PARAMS)
+        }
+        # Missing inputs become 0.0, which the batch forecast replaces with its default as for None
+        fixed = {k: np.repeat(np.array([c.get(k) or 0.0 for c in block], dtype=np.float64), n_paths)
+                 for k in FIXED_INPUTS}
+
+        forecast = forecast_3_statement_batch(
+            revenue_growth=draws["revenue_growth"],
+            ebitda_margin=draws["ebitda_margin"],
+            capex_pct=draws["capex_pct"],
+            years=years,
+            **fixed
+        )
+        values = discounted_cash_flow_batch(forecast["fcf"], draws["wacc"], draws["terminal_growth"])
+
+        for company, row in zip(block, values.reshape(len(block), n_paths)):
+            finite = np.isfinite(row)
+            stats = StreamingHistogram(bins=bins)
+            stats.update(row[finite])
+            summary = _summarize(stats, n_paths, int(n_paths - np.count_nonzero(finite)), quantiles,
+                                 include_histogram)
+            results.append({"name": company.get("name"), **summary})
+    return results
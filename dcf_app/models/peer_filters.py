@@ -0,0 +1,140 @@
+import logging
+import numpy as np
+
+# Numeric columns that get a sorted index for range filters
+RANGE_COLUMNS = ["revenue_base", "ev_ebitda", "pe_ratio"]
+
+logger = logging.getLogger(__name__)
+
+
+def _label(value) -> str:
+    return value.strip().lower() if isinstance(value, str) else ""
+
+
+def _number(value) -> float:
+    return float(value) if isinstance(value, (int, float, np.number)) else np.nan
+
+
+def build_filter_index(peer_data: list[dict], positions=None) -> dict:
+    """
+    Attribute indexes over the rows of a peer matrix, built once per universe.
+
+    Sector and industry get one boolean row bitmap per value; revenue and the
+    valuation multiples are kept as sorted (value, row) arrays so a range is
+    two binary searches. Missing and non-finite values never match a range.
+
+    Args:
+        peer_data (list[dict]): Universe records
+        positions (np.ndarray): Matrix row -> index into peer_data (default: every record)
+
+    Returns:
+        dict: "n_rows", "sector"/"industry" {label: bool mask} and
+        "ranges" {column: (sorted values, rows)}
+    """
+    positions = np.arange(len(peer_data)) if positions is None else np.asarray(positions)
+    rows = [peer_data[i] for i in positions]
+    n_rows = len(rows)
+
+    bitmaps = {}
+    for field in ("sector", "industry"):
+        labels = np.array([_label(r.get(field)) for r in rows], dtype=object)
+        bitmaps[field] = {label: labels == label for label in set(labels) if label}
+
+    ranges = {}
+    for column in RANGE_COLUMNS:
+        values = np.array([_number(r.get(column)) for r in rows], dtype=np.float64)
+        finite = np.flatnonzero(np.isfinite(values))
+        order = finite[np.argsort(values[finite], kind="stable")]
+        ranges[column] = (values[order], order)
+
+    return {"n_rows": n_rows, "sector": bitmaps["sector"], "industry": bitmaps["industry"], "ranges": ranges}
+
+
+def _range_mask(filter_index: dict, column: str, low=None, high=None) -> np.ndarray:
+    values, rows = filter_index["ranges"][column]
+    start = 0 if low is None else np.searchsorted(values, low, side="left")
+    stop = len(values) if high is None else np.searchsorted(values, high, side="right")
+    mask = np.zeros(filter_index["n_rows"], dtype=bool)
+    mask[rows[start:stop]] = True
+    return mask
+
+
+def candidate_rows(filter_index: dict, sector=None, industry=None, revenue_range=None,
+                   multiple_ranges: dict = None):
+    """
+    Matrix rows passing every given filter, so similarity is only computed
+    over the candidates.
+
+    Args:
+        filter_index (dict): From build_filter_index
+        sector (str): Keep one sector (case-insensitive)
+        industry (str): Keep one industry (case-insensitive)
+        revenue_range (tuple): Inclusive (low, high) revenue_base bounds; either may be None
+        multiple_ranges (dict): {column: (low, high)} for ev_ebitda / pe_ratio,
+            e.g. {"ev_ebitda": (3, 30)}
+
+    Returns:
+        np.ndarray: Sorted candidate rows, or None when no filter is set
+    """
+    masks = []
+    if sector:
+        masks.append(filter_index["sector"].get(_label(sector), np.zeros(filter_index["n_rows"], dtype=bool)))
+    if industry:
+        masks.append(filter_index["industry"].get(_label(industry), np.zeros(filter_index["n_rows"], dtype=bool)))
+    if revenue_range:
+        masks.append(_range_mask(filter_index, "revenue_base", *revenue_range))
+    for column, bounds in (multiple_ranges or {}).items():
+        if bounds:
+            masks.append(_range_mask(filter_index, column, *bounds))
+
+    if not masks:
+        return None
+    # Start from the smallest filter so the intersection touches the fewest rows
+    masks.sort(key=lambda m: int(m.sum()))
+    mask = masks[0].copy()
+    for m in masks[1:]:
+        mask &= m
+    return np.flatnonzero(mask)
+
+
+def resolve_peer_filters(peer_filters: dict, target_company: dict) -> dict:
+    """
+    Turns target-relative filter options into candidate_rows arguments.
+
+    Args:
+        peer_filters (dict): Any of "sector", "industry", "same_sector",
+            "same_industry", "revenue_range", "revenue_band" ((low, high)
+            multiples of the target's revenue_base) and "multiple_ranges";
+            target-relative options the target has no value for are
+            skipped with a warning
+        target_company (dict): Target record
+
+    Returns:
+        dict: Keyword arguments for candidate_rows
+    """
+    peer_filters = peer_filters or {}
+    sector = peer_filters.get("sector")
+    industry = peer_filters.get("industry")
+    target_name = target_company.get("name")
+    for option, field in (("same_sector", "sector"), ("same_industry", "industry")):
+        if peer_filters.get(option) and not _label(target_company.get(field)):
+            logger.warning("%s ignored: target %s has no %s", option, target_name, field)
+    if peer_filters.get("same_sector"):
+        sector = target_company.get("sector") or sector
+    if peer_filters.get("same_industry"):
+        industry = target_company.get("industry") or industry
+
+    revenue_range = peer_filters.get("revenue_range")
+    band = peer_filters.get("revenue_band")
+    revenue = _number(target_company.get("revenue_base"))
+    if band and np.isfinite(revenue):
+        revenue_range = (revenue * band[0], revenue * band[1])
+    elif band:
+        logger.warning("revenue_band ignored: target %s has no revenue_base", target_name)
+
+    return {
+        "sector": sector,
+        "industry": industry,
+        "revenue_range": revenue_range,
+        "multiple_ranges": peer_filters.get("multiple_ranges"),
+    }
@@ -1,21 +1,32 @@
-from sentence_transformers import SentenceTransformer, util
-from dcf_app.utils.loader import load_company_data, create_company_vector
+from dcf_app.utils.loader import (
+    load_company_data, create_company_vector, create_description_vectors, description_vector_key,
+    numeric_features, _combine_vector, load_peer_universe, PEER_UNIVERSE_CSV
+)
+from dcf_app.utils import loader
 from dcf_app.utils.helpers import validate_vector
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import numpy as np
-import torch
+from dcf_app.utils.lru import LRUCache
+from dcf_app.models.similarity import (
+    stack_peer_vectors, normalize_rows, cosine_scores, weighted_cosine_scores, top_k_indices
+)
+from dcf_app.models.ann_index import IVFIndex
+from dcf_app.models.peer_filters import build_filter_index
+from dcf_app.models.quantized_index import QuantizedMatrix
+from dcf_app.utils.embedding_store import get_description_store, company_keys
+from dcf_app.utils.profiling import span, count
+from dcf_app.services.nlp_service import get_encoder
 import os
+import numpy as np
 
-# Initialize model and cache settings
-model = SentenceTransformer('all-MiniLM-L6-v2')
-VECTOR_CACHE_DIR = "vector_cache"
-FORCE_REGENERATE_VECTORS = True
+# The embedding model is loaded lazily by dcf_app.services.nlp_service
+
+# load_matching_universe results per (path, encoder), with the file stamp they were built from
+_matching_universes = LRUCache(maxsize=4)
 
 
 
 def prepare_vectors(company_name=None, target_peer=None,
                     fallback_description=None, fallback_revenue=None, fallback_ebitda_margin=None,
-                    desc_weight=0.85):  # NEW
+                    desc_weight=0.85, batch_size=64):  # NEW
 
     print(f"\n📥 DEBUG: Calling load_company_data('{company_name}')")
     target_vector, peer_data = load_company_data(
@@ -45,65 +56,281 @@ def prepare_vectors(company_name=None, target_peer=None,
     if not validate_vector(target_vector):
         raise ValueError(f"Generated target vector for '{company_name}' is invalid.")
 
-    # ✅ Define thread-safe vector caching function
-    def cache_peer_vector(peer):
-        name = peer.get("name", "").strip()
-        safe_name = name.replace("/", "_").replace(",", "").replace(":", "").replace("\\", "_").replace("|", "")
-        vector_path = os.path.join(VECTOR_CACHE_DIR, f"{safe_name}.npy")
+    attach_peer_vectors(peer_data, desc_weight=desc_weight, batch_size=batch_size)
 
-        if os.path.exists(vector_path):
-            try:
-                peer["vector"] = np.load(vector_path)
-            except Exception:
-                peer["vector"] = None
-        else:
-            vector = create_company_vector(peer, desc_weight=desc_weight)
+    return target_vector, peer_data
 
-            if validate_vector(vector):
-                np.save(vector_path, vector)
-                peer["vector"] = vector
+
+def attach_description_vectors(peer_data, batch_size=64):
+    """
+    Sets peer["desc_vector"] (raw description embedding) for every peer.
+    Stored embeddings come from the description store when their recorded
+    description_vector_key matches; the rest are encoded in one batch and
+    written to the store.
+    """
+    with span("embeddings"):
+        # ✅ Load stored embeddings as zero-copy views into the memory-mapped store
+        store = get_description_store()
+        missing, missing_keys = [], []
+        for peer in peer_data:
+            key = description_vector_key(peer)
+            row = store.row_for_company(peer)
+            if row >= 0 and store.fingerprint_for(peer) == key:
+                peer["desc_vector"] = store.matrix[row]
             else:
-                peer["vector"] = None
+                peer["desc_vector"] = None
+                missing.append(peer)
+                missing_keys.append(key)
+
+        count("store_hits", len(peer_data) - len(missing))
+        count("store_misses", len(missing))
+        print(f"🧠 {len(peer_data) - len(missing)} stored vectors, {len(missing)} to compute")
 
-    # ✅ Parallel execution
-    with ThreadPoolExecutor(max_workers=8) as executor:
-        futures = {executor.submit(cache_peer_vector, peer): peer for peer in peer_data}
-        for future in as_completed(futures):
-            peer = futures[future]
+        # ✅ Encode missing descriptions in one batched pass
+        for peer, vector in zip(missing, create_description_vectors(missing, batch_size=batch_size)):
+            peer["desc_vector"] = vector
+
+        # ✅ Write new and recomputed embeddings to the store in one update
+        new = [i for i, p in enumerate(missing) if p["desc_vector"] is not None and company_keys(p)]
+        if new:
             try:
-                future.result()
-            except Exception as e:
-                print(f"❌ Error caching vector for {peer.get('name')}: {e}")
+                store.upsert_companies([missing[i] for i in new], [missing[i]["desc_vector"] for i in new],
+                                       fingerprints=[missing_keys[i] for i in new])
+            except ValueError as e:
+                print(f"❌ Could not store new vectors: {e}")
+
+
+def attach_peer_vectors(peer_data, desc_weight=0.85, batch_size=64):
+    """
+    Sets peer["vector"] (weighted description embedding plus numerics) for
+    every peer. Only description embeddings are stored, so a new desc_weight
+    costs no encoding.
+    """
+    attach_description_vectors(peer_data, batch_size=batch_size)
+    with span("combine_vectors"):
+        for peer in peer_data:
+            desc_vector = peer["desc_vector"]
+            peer["vector"] = None if desc_vector is None else _combine_vector(peer, desc_vector, desc_weight=desc_weight)
+
+
+def build_peer_features(peer_data, quantize=None) -> dict:
+    """
+    Separate description and numeric feature matrices for query-time
+    weighting (see find_closest_peers_weighted). Peers without a description
+    embedding or with missing numerics are left out.
+
+    Args:
+        peer_data (list[dict]): Universe records with "desc_vector" attached
+        quantize (str): Also keep an "int8" or "float16" copy of the
+            description matrix for a first-pass scan with exact re-ranking
+
+    Returns:
+        dict: "desc" (n x dim) raw embeddings, "num" (n x 3) numerics, their
+        squared row norms "desc_sq"/"num_sq", "positions" (row -> index
+        into peer_data), "filters" (build_filter_index over the rows) and,
+        when quantize is set, "desc_quantized"
+    """
+    desc_rows, num_rows, positions = [], [], []
+    for i, peer in enumerate(peer_data):
+        desc_vector = peer.get("desc_vector")
+        if desc_vector is None:
+            continue
+        numerics = numeric_features(peer)
+        if numerics is None:
+            continue
+        desc_rows.append(desc_vector)
+        num_rows.append(numerics)
+        positions.append(i)
+
+    dim = desc_rows[0].shape[0] if desc_rows else 0
+    desc = np.ascontiguousarray(np.vstack(desc_rows), dtype=np.float32) if desc_rows else np.empty((0, dim), np.float32)
+    num = np.ascontiguousarray(np.vstack(num_rows), dtype=np.float32) if num_rows else np.empty((0, 3), np.float32)
+    positions = np.asarray(positions, dtype=np.int64)
+    features = {
+        "desc": desc,
+        "num": num,
+        "desc_sq": np.einsum("ij,ij->i", desc, desc),
+        "num_sq": np.einsum("ij,ij->i", num, num),
+        "positions": positions,
+        "filters": build_filter_index(peer_data, positions),
+    }
+    if quantize:
+        features["desc_quantized"] = QuantizedMatrix(desc, dtype=quantize)
+    return features
 
-    return target_vector, peer_data
 
+def build_peer_matrix(peer_data, dim=None):
+    """
+    Stacks and L2-normalizes the peer vectors once so repeated searches over
+    the same universe skip the per-peer conversion.
 
-def find_closest_peers(target_vector, peer_data, top_k=5,
-                       target_name=None, min_similarity=0.0):
-    similarities = []
+    Returns:
+        tuple: (normalized float32 matrix, row -> index into peer_data)
+    """
+    with span("build_matrix"):
+        matrix, positions = stack_peer_vectors(peer_data, dim=dim)
+        return normalize_rows(matrix), positions
 
-    for peer in peer_data:
-        name = peer.get("name", "UNKNOWN")
-        vector = peer.get("vector")
-        is_self = (name.strip().lower() == target_name.strip().lower()) if target_name else False
-        is_valid_vector = validate_vector(vector)
 
-        if is_self or not is_valid_vector:
-            continue
+def load_matching_universe(path=PEER_UNIVERSE_CSV, batch_size=64, quantize=None):
+    """
+    Loads the universe with description embeddings attached plus its feature
+    matrices, so many pipeline runs (at any desc_weight) can share one copy
+    (see run_peer_match_pipeline's peer_universe argument).
 
-        try:
-            similarity = util.cos_sim(
-                torch.tensor([target_vector], dtype=torch.float32),
-                torch.tensor([vector], dtype=torch.float32)
-            )[0][0].item()
+    Returns:
+        tuple: (peer_data, peer_features)
+    """
+    peer_data = load_peer_universe(path)
+    attach_description_vectors(peer_data, batch_size=batch_size)
+    return peer_data, build_peer_features(peer_data, quantize=quantize)
 
-            if similarity >= min_similarity:
-                similarities.append((peer, similarity))
-        except Exception as e:
-            print(f"❌ Error computing similarity for {name}: {e}")
 
-    top_peers = sorted(similarities, key=lambda x: x[1], reverse=True)[:top_k]
-    return top_peers
+def get_matching_universe(path=None, batch_size=64):
+    """
+    load_matching_universe memoized per (path, encoder) and rebuilt when the
+    file's mtime or size changes, so repeated runs share one universe and
+    its filter index. Callers must not modify it.
+
+    Args:
+        path (str): Universe file (default: loader.PEER_UNIVERSE_CSV)
+
+    Returns:
+        tuple: (peer_data, peer_features)
+    """
+    path = os.path.abspath(path or loader.PEER_UNIVERSE_CSV)
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    key = (path, get_encoder().model_id)
+
+    cached = _matching_universes.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    universe = load_matching_universe(path, batch_size=batch_size)
+    _matching_universes.put(key, (stamp, universe))
+    return universe
+
+
+def build_peer_index(peer_data, dim=None, **index_params):
+    """
+    Builds the normalized peer matrix plus an IVF approximate index over it.
+
+    Returns:
+        tuple: (peer_matrix, index) to pass to find_closest_peers
+    """
+    peer_matrix = build_peer_matrix(peer_data, dim=dim)
+    return peer_matrix, IVFIndex(**index_params).fit(peer_matrix[0])
+
+
+def find_closest_peers(target_vector, peer_data, top_k=5,
+                       target_name=None, min_similarity=0.0, peer_matrix=None,
+                       index=None, n_probe=None, candidate_rows=None, quantized=None, rerank=100):
+    if not validate_vector(target_vector):
+        print("❌ Invalid target vector; cannot compute similarities.")
+        return []
+
+    target_vector = np.asarray(target_vector, dtype=np.float32)
+    if peer_matrix is None:
+        peer_matrix = build_peer_matrix(peer_data, dim=target_vector.shape[0])
+    matrix, positions = peer_matrix
+
+    if matrix.shape[0] == 0 or matrix.shape[1] != target_vector.shape[0]:
+        return []
+
+    with span("similarity"):
+        # Exact search scores every row; attribute filters (candidate_rows, see
+        # peer_filters.candidate_rows) and an ANN index narrow the rows first
+        rows = index.candidates(target_vector, n_probe=n_probe) if index is not None else None
+        if candidate_rows is not None:
+            rows = candidate_rows if rows is None else np.intersect1d(rows, candidate_rows, assume_unique=True)
+
+        # A quantized copy of the matrix (QuantizedMatrix) picks a short list that
+        # is re-ranked exactly in float32
+        if quantized is not None:
+            approx = (quantized if rows is None else quantized[rows]) @ normalize_rows(target_vector)
+            shortlist = top_k_indices(approx, max(rerank, top_k + 1))
+            rows = shortlist if rows is None else np.asarray(rows)[shortlist]
+
+        if rows is None:
+            rows = np.arange(matrix.shape[0])
+            scores = cosine_scores(target_vector, matrix, normalized=True)
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+            scores = cosine_scores(target_vector, matrix[rows], normalized=True)
+        count("candidates_scored", rows.shape[0])
+
+        return _select_peers(scores, rows, positions, peer_data, top_k, target_name, min_similarity)
+
+
+def find_closest_peers_weighted(target_company, peer_data, peer_features, desc_weight=0.85, top_k=5,
+                                target_name=None, min_similarity=0.0, candidate_rows=None, rerank=100):
+    """
+    Peer search over separately stored description and numeric features, with
+    desc_weight applied at query time (see weighted_cosine_scores). Scores
+    match find_closest_peers over vectors built with the same desc_weight.
+
+    Args:
+        target_company (dict): Target record; its "desc_vector" is used if set,
+            otherwise the description is embedded (or read from the cache)
+        peer_data (list[dict]): Universe records
+        peer_features (dict): From build_peer_features(peer_data)
+        desc_weight (float): Description weight for this query
+        candidate_rows (np.ndarray): Only score these feature rows (from
+            peer_filters.candidate_rows over peer_features["filters"])
+        rerank (int): With a "desc_quantized" feature matrix, candidates
+            re-scored exactly after the quantized first pass
+
+    Returns:
+        list: (peer, similarity) tuples, best first
+    """
+    desc_vector = target_company.get("desc_vector")
+    if desc_vector is None:
+        desc_vector = create_description_vectors([target_company])[0]
+    numerics = numeric_features(target_company)
+    if desc_vector is None or numerics is None or peer_features["desc"].shape[0] == 0:
+        print("❌ Invalid target vector; cannot compute similarities.")
+        return []
+    if peer_features["desc"].shape[1] != np.shape(desc_vector)[0]:
+        return []
+
+    with span("similarity"):
+        rows = None if candidate_rows is None else np.asarray(candidate_rows, dtype=np.int64)
+        if peer_features.get("desc_quantized") is not None:
+            features = _feature_rows(peer_features, rows, desc_key="desc_quantized")
+            approx = weighted_cosine_scores(desc_vector, numerics, features, desc_weight)
+            shortlist = top_k_indices(approx, max(rerank, top_k + 1))
+            rows = shortlist if rows is None else rows[shortlist]
+
+        scores = weighted_cosine_scores(desc_vector, numerics, _feature_rows(peer_features, rows), desc_weight)
+        if rows is None:
+            rows = np.arange(scores.shape[0])
+        count("candidates_scored", rows.shape[0])
+        return _select_peers(scores, rows, peer_features["positions"], peer_data, top_k, target_name, min_similarity)
+
+
+def _feature_rows(peer_features, rows, desc_key="desc"):
+    """The scoring inputs of weighted_cosine_scores, restricted to rows (None = all)."""
+    features = {k: peer_features[k] for k in ("num", "desc_sq", "num_sq")}
+    features["desc"] = peer_features[desc_key]
+    if rows is None:
+        return features
+    return {k: v[rows] for k, v in features.items()}
+
+
+def _select_peers(scores, rows, positions, peer_data, top_k, target_name, min_similarity):
+    # Self-exclusion and similarity threshold as masks over the candidates
+    mask = scores >= min_similarity
+    if target_name:
+        target_key = target_name.strip().lower()
+        is_self = np.fromiter(
+            (peer_data[positions[r]].get("name", "UNKNOWN").strip().lower() == target_key for r in rows),
+            dtype=bool, count=rows.shape[0]
+        )
+        mask &= ~is_self
+
+    best = top_k_indices(scores, top_k, mask=mask)
+    return [(peer_data[positions[rows[i]]], float(scores[i])) for i in best]
 
 
 def apply_peer_multiples(target_company: dict, peers: list, multiple_type: str = "ev_ebitda") -> dict:
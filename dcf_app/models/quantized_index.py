@@ -0,0 +1,148 @@
+import time
+import numpy as np
+from dcf_app.models.similarity import normalize_rows, top_k_indices
+
+QUANTIZED_DTYPES = ("int8", "float16")
+
+
+class QuantizedMatrix:
+    """
+    Compact copy of an embedding matrix for the first-pass similarity scan.
+
+    "int8" stores each row as symmetric 8-bit codes with one float32 scale per
+    row (about 4x smaller than float32); "float16" halves the size. Products
+    are computed in float32 over cache-sized row blocks, so only one small
+    block is expanded at a time. int8 scans are faster than float32 once the
+    matrix no longer fits in cache; numpy's float16 conversion is slow, so
+    float16 only saves memory. Scores are approximate: re-rank a short candidate
+    list against the float32 rows for exact results (see find_closest_peers).
+
+    Supports `quantized @ query` and row selection `quantized[rows]`, so it
+    can stand in for the float32 matrix in the scoring helpers.
+    """
+
+    def __init__(self, matrix: np.ndarray = None, dtype: str = "int8", block_size: int = 512):
+        if dtype not in QUANTIZED_DTYPES:
+            raise ValueError(f"Unsupported quantized dtype '{dtype}'; use one of {QUANTIZED_DTYPES}.")
+        self.dtype = dtype
+        self.block_size = block_size
+        self.codes = None
+        self.scales = None
+        if matrix is not None:
+            self.fit(matrix)
+
+    def fit(self, matrix: np.ndarray) -> "QuantizedMatrix":
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if self.dtype == "float16":
+            self.codes = matrix.astype(np.float16)
+            self.scales = None
+        else:
+            max_abs = np.abs(matrix).max(axis=1) if matrix.shape[0] else np.empty(0, np.float32)
+            self.scales = (np.maximum(max_abs, 1e-12) / 127.0).astype(np.float32)
+            self.codes = np.clip(np.rint(matrix / self.scales[:, None]), -127, 127).astype(np.int8)
+        return self
+
+    @property
+    def shape(self) -> tuple:
+        return self.codes.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    def __getitem__(self, rows) -> "QuantizedMatrix":
+        subset = QuantizedMatrix(dtype=self.dtype, block_size=self.block_size)
+        subset.codes = self.codes[rows]
+        subset.scales = self.scales[rows] if self.scales is not None else None
+        return subset
+
+    def __matmul__(self, query) -> np.ndarray:
+        return self.dot(query)
+
+    def dot(self, query) -> np.ndarray:
+        """Approximate float32 dot product of every stored row with the query."""
+        query = np.asarray(query, dtype=np.float32)
+        out = np.empty(self.codes.shape[0], dtype=np.float32)
+        for start in range(0, self.codes.shape[0], self.block_size):
+            stop = start + self.block_size
+            out[start:stop] = self.codes[start:stop].astype(np.float32) @ query
+        if self.scales is not None:
+            out *= self.scales
+        return out
+
+
+def evaluate_quantization(matrix: np.ndarray, dtype: str = "int8", top_k: int = 10, rerank: int = 100,
+                          queries: np.ndarray = None, n_queries: int = 200, seed: int = 0) -> dict:
+    """
+    Measures what quantizing a (row-normalized) peer matrix saves and costs
+    against exact float32 search over the same rows.
+
+    Args:
+        matrix (np.ndarray): (n x dim) peer matrix
+        dtype (str): "int8" or "float16"
+        top_k (int): k for recall@k
+        rerank (int): Candidates re-scored in float32 after the quantized pass
+        queries (np.ndarray): Query vectors (defaults to a sample of rows)
+        n_queries (int): Sample size when queries are not given
+
+    Returns:
+        dict: Memory of both representations, recall@k of the quantized pass
+        alone and after re-ranking, and per-query timings
+    """
+    matrix = normalize_rows(matrix)
+    quantized = QuantizedMatrix(matrix, dtype=dtype)
+    if queries is None:
+        rng = np.random.default_rng(seed)
+        queries = matrix[rng.choice(matrix.shape[0], min(n_queries, matrix.shape[0]), replace=False)]
+    queries = normalize_rows(np.atleast_2d(queries))
+    rerank = max(rerank, top_k)
+
+    start = time.perf_counter()
+    exact = [set(top_k_indices(matrix @ q, top_k).tolist()) for q in queries]
+    exact_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    first_pass, reranked = [], []
+    for q in queries:
+        approx = quantized @ q
+        first_pass.append(set(top_k_indices(approx, top_k).tolist()))
+        shortlist = top_k_indices(approx, rerank)
+        best = top_k_indices(matrix[shortlist] @ q, top_k)
+        reranked.append(set(shortlist[best].tolist()))
+    quantized_seconds = time.perf_counter() - start
+
+    total = sum(len(e) for e in exact)
+
+    def recall(found):
+        return sum(len(e & f) for e, f in zip(exact, found)) / total if total else 1.0
+
+    return {
+        "dtype": dtype,
+        "rows": matrix.shape[0],
+        "dim": matrix.shape[1],
+        "float32_bytes": int(matrix.nbytes),
+        "quantized_bytes": int(quantized.nbytes),
+        "memory_saved": 1.0 - quantized.nbytes / matrix.nbytes if matrix.nbytes else 0.0,
+        "top_k": top_k,
+        "rerank": rerank,
+        "first_pass_recall_at_k": recall(first_pass),
+        "recall_at_k": recall(reranked),
+        "n_queries": len(queries),
+        "exact_ms_per_query": 1000 * exact_seconds / len(queries),
+        "quantized_ms_per_query": 1000 * quantized_seconds / len(queries),
+    }
+
+
+if __name__ == "__main__":
+    from dcf_app.utils.embedding_store import get_description_store
+
+    store = get_description_store()
+    if len(store) == 0:
+        print("⚠️ Embedding store is empty; run the peer matcher first.")
+    else:
+        for kind in QUANTIZED_DTYPES:
+            for shortlist_size in (20, 50, 100):
+                print(evaluate_quantization(store.matrix, dtype=kind, rerank=shortlist_size))
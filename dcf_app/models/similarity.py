@@ -0,0 +1,167 @@
+import numpy as np
+
+
+def stack_peer_vectors(peer_data: list[dict], dim: int = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Stacks the peer vectors into one contiguous float32 matrix.
+
+    Peers without a usable vector (missing, non-float, NaN/inf or of the wrong
+    dimension) are left out of the matrix.
+
+    Args:
+        peer_data (list[dict]): Peer records carrying a "vector" entry
+        dim (int): Expected vector length (defaults to the first valid vector's length)
+
+    Returns:
+        tuple: (matrix of shape (n_valid, dim), row -> index into peer_data)
+    """
+    rows = []
+    positions = []
+    for i, peer in enumerate(peer_data):
+        vector = peer.get("vector")
+        if vector is None:
+            continue
+        vector = np.asarray(vector)
+        if vector.ndim != 1 or vector.dtype.kind != "f":
+            continue
+        if dim is None:
+            dim = vector.shape[0]
+        if vector.shape[0] != dim:
+            continue
+        rows.append(vector)
+        positions.append(i)
+
+    if not rows:
+        return np.empty((0, dim or 0), dtype=np.float32), np.empty(0, dtype=np.int64)
+
+    matrix = np.ascontiguousarray(np.vstack(rows), dtype=np.float32)
+    finite = np.isfinite(matrix).all(axis=1)
+    return matrix[finite], np.asarray(positions, dtype=np.int64)[finite]
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    L2-normalizes each row of a matrix (zero rows stay zero).
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def cosine_scores(target_vector, matrix: np.ndarray, normalized: bool = False) -> np.ndarray:
+    """
+    Cosine similarity between one target vector and every row of a matrix.
+
+    Args:
+        target_vector: Query vector
+        matrix (np.ndarray): Peer matrix, one vector per row
+        normalized (bool): Set when the matrix rows are already unit length
+
+    Returns:
+        np.ndarray: One float32 score per row
+    """
+    query = normalize_rows(np.asarray(target_vector, dtype=np.float32))
+    if not normalized:
+        matrix = normalize_rows(matrix)
+    return matrix @ query
+
+
+def weighted_cosine_scores(query_desc, query_num, features: dict, desc_weight: float) -> np.ndarray:
+    """
+    Cosine similarity of the weighted vectors [w * desc, (1 - w) * num]
+    without building them: the two precomputed similarity terms (description
+    dot products and numeric dot products) are combined with the weights, and
+    the norms come from the stored squared norms.
+
+    Gives the same scores as cosine_scores over concatenated vectors, for any
+    desc_weight, with no re-encoding.
+
+    Args:
+        query_desc: Raw description embedding of the target
+        query_num: Numeric features of the target
+        features (dict): Peer features from build_peer_features ("desc", "num",
+            "desc_sq", "num_sq")
+        desc_weight (float): Weight w of the description part
+
+    Returns:
+        np.ndarray: One float32 score per feature row
+    """
+    w_desc, w_num = np.float32(desc_weight) ** 2, np.float32(1 - desc_weight) ** 2
+    query_desc = np.asarray(query_desc, dtype=np.float32)
+    query_num = np.asarray(query_num, dtype=np.float32)
+
+    dots = w_desc * (features["desc"] @ query_desc) + w_num * (features["num"] @ query_num)
+    peer_norms = np.sqrt(w_desc * features["desc_sq"] + w_num * features["num_sq"])
+    query_norm = np.sqrt(w_desc * (query_desc @ query_desc) + w_num * (query_num @ query_num))
+    return dots / np.maximum(peer_norms * query_norm, 1e-12)
+
+
+def top_k_indices(scores: np.ndarray, top_k: int, mask: np.ndarray = None) -> np.ndarray:
+    """
+    Indices of the top_k highest scores, best first, using a partial sort.
+
+    Args:
+        scores (np.ndarray): One score per candidate
+        top_k (int): Number of indices to return
+        mask (np.ndarray): Optional boolean array; False entries are never returned
+
+    Returns:
+        np.ndarray: Indices into scores, sorted by descending score
+    """
+    candidates = np.flatnonzero(mask) if mask is not None else np.arange(scores.shape[0])
+    if top_k <= 0 or candidates.size == 0:
+        return np.empty(0, dtype=np.int64)
+
+    candidate_scores = scores[candidates]
+    if candidates.size > top_k:
+        part = np.argpartition(-candidate_scores, top_k - 1)[:top_k]
+    else:
+        part = np.arange(candidates.size)
+
+    order = part[np.argsort(-candidate_scores[part], kind="stable")]
+    return candidates[order]
+
+
+def blocked_top_k(matrix: np.ndarray, top_k: int, min_similarity: float = -1.0,
+                  block_size: int = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    All-pairs top-k neighbours of every row, computed in row blocks so only a
+    (block_size x n) score matrix is alive at a time. A row never matches itself.
+
+    Args:
+        matrix (np.ndarray): (n x dim) matrix with unit-length rows
+        top_k (int): Neighbours per row
+        min_similarity (float): Scores below this are not returned
+        block_size (int): Rows per matmul (default keeps each block near 64 MB)
+
+    Returns:
+        tuple: (indices, scores), each (n x top_k) and best first; slots without a
+        neighbour hold index -1 and score NaN
+    """
+    n = matrix.shape[0]
+    top_k = max(0, min(top_k, n - 1))
+    block_size = block_size or max(1, (1 << 24) // max(n, 1))
+
+    indices = np.full((n, top_k), -1, dtype=np.int64)
+    scores = np.full((n, top_k), np.nan, dtype=np.float32)
+    if top_k == 0:
+        return indices, scores
+
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        block = matrix[start:stop] @ matrix.T
+        rows = np.arange(stop - start)
+        block[rows, start + rows] = -np.inf
+        block[block < min_similarity] = -np.inf
+
+        part = np.argpartition(-block, top_k - 1, axis=1)[:, :top_k]
+        part_scores = np.take_along_axis(block, part, axis=1)
+        order = np.argsort(-part_scores, axis=1, kind="stable")
+        best = np.take_along_axis(part, order, axis=1)
+        best_scores = np.take_along_axis(part_scores, order, axis=1)
+
+        found = np.isfinite(best_scores)
+        indices[start:stop] = np.where(found, best, -1)
+        scores[start:stop] = np.where(found, best_scores, np.nan)
+
+    return indices, scores
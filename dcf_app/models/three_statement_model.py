@@ -1,3 +1,80 @@
+import numpy as np
+
+FORECAST_FIELDS = ("revenue", "ebitda", "depreciation", "ebit", "nopat", "capex", "change_nwc", "fcf")
+
+
+def _assumption(values, default: float) -> np.ndarray:
+    """
+    Converts one assumption (scalar or per-company sequence) to a float array.
+    Missing (None) and zero entries take the default, mirroring `value or default`.
+    """
+    arr = np.asarray(values if values is not None else default)
+    if arr.dtype == object:
+        arr = np.array([default if v is None else v for v in arr.ravel()], dtype=np.float64).reshape(arr.shape)
+    arr = arr.astype(np.float64)
+    if default:
+        arr = np.where(arr == 0, default, arr)
+    return np.atleast_1d(arr)
+
+
+def forecast_3_statement_batch(
+    revenue_base,
+    revenue_growth,
+    ebitda_margin,
+    capex_pct,
+    depreciation_pct,
+    nwc_pct,
+    tax_rate,
+    interest_expense=0.0,
+    debt=0.0,
+    years: int = 5
+) -> dict:
+    """
+    Forecasts N companies (or N scenarios) at once.
+
+    Each assumption may be a scalar or a length-N array; scalars are broadcast
+    across all companies.
+
+    Returns:
+        dict: {"revenue", "ebitda", "depreciation", "ebit", "nopat", "capex",
+               "change_nwc", "fcf"} -> (N x years) np.ndarray
+    """
+    revenue_base = _assumption(revenue_base, 0.0)
+    revenue_growth = _assumption(revenue_growth, 0.0)
+    ebitda_margin = _assumption(ebitda_margin, 0.0)
+    depreciation_pct = _assumption(depreciation_pct, 0.0)
+    capex_pct = _assumption(capex_pct, 0.0)
+    nwc_pct = _assumption(nwc_pct, 0.0)
+    tax_rate = _assumption(tax_rate, 0.21)  # assume standard US corp tax
+
+    n = np.broadcast_shapes(revenue_base.shape, revenue_growth.shape, ebitda_margin.shape,
+                            depreciation_pct.shape, capex_pct.shape, nwc_pct.shape, tax_rate.shape)
+
+    def column(arr):
+        return np.broadcast_to(arr, n)[:, None]
+
+    periods = np.arange(1, years + 1)
+    revenue = column(revenue_base) * (1 + column(revenue_growth)) ** periods
+    ebitda = revenue * column(ebitda_margin)
+    depreciation = revenue * column(depreciation_pct)
+    ebit = ebitda - depreciation
+    nopat = ebit * (1 - column(tax_rate))
+    capex = revenue * column(capex_pct)
+    change_nwc = revenue * column(nwc_pct)
+    fcf = nopat + depreciation - capex - change_nwc
+
+    return {
+        "revenue": revenue,
+        "ebitda": ebitda,
+        "depreciation": depreciation,
+        "ebit": ebit,
+        "nopat": nopat,
+        "capex": capex,
+        "change_nwc": change_nwc,
+        "fcf": fcf
+    }
+
+
 def forecast_3_statement(
     revenue_base: float,
     revenue_growth: float,
@@ -14,39 +91,12 @@ def forecast_3_statement(
     Forecasts income statement, balance sheet, and cash flow statement to produce FCF.
     Returns a dictionary of yearly outputs including revenue, EBIT, NOPAT, D&A, CapEx, ∆NWC, and FCF.
     """
+    batch = forecast_3_statement_batch(
+        revenue_base, revenue_growth, ebitda_margin, capex_pct,
+        depreciation_pct, nwc_pct, tax_rate, years=years
+    )
 
-    # Defensive defaults in case any critical input is None
-    revenue_base = revenue_base or 0.0
-    revenue_growth = revenue_growth or 0.0
-    ebitda_margin = ebitda_margin or 0.0
-    depreciation_pct = depreciation_pct or 0.0
-    capex_pct = capex_pct or 0.0
-    nwc_pct = nwc_pct or 0.0
-    tax_rate = tax_rate or 0.21  # assume standard US corp tax
-
-    results = []
-    revenue = revenue_base
-
-    for _ in range(years):
-        revenue *= (1 + revenue_growth)
-        ebitda = revenue * ebitda_margin
-        depreciation = revenue * depreciation_pct
-        ebit = ebitda - depreciation
-        nopat = ebit * (1 - tax_rate)
-        capex = revenue * capex_pct
-        change_nwc = revenue * nwc_pct
-        fcf = nopat + depreciation - capex - change_nwc
-
-        results.append({
-            "revenue": revenue,
-            "ebitda": ebitda,
-            "depreciation": depreciation,
-            "ebit": ebit,
-            "nopat": nopat,
-            "capex": capex,
-            "change_nwc": change_nwc,
-            "fcf": fcf
-        })
-
-    return results
-
+    return [
+        {field: float(batch[field][0, year]) for field in FORECAST_FIELDS}
+        for year in range(years)
+    ]
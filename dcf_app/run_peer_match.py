@@ -1,11 +1,20 @@
 import argparse
+import asyncio
 import json
+import logging
 import os
 from colorama import Fore, Style
 import csv
 
 
 from dcf_app.services.peer_matcher_service import run_peer_match_pipeline
+from dcf_app.services.batch_valuation import run_universe_valuation
+from dcf_app.services.parallel_runner import run_watchlist, read_tickers_file
+from dcf_app.services.async_pipeline import run_peer_match_pipeline_async
+from dcf_app.models.dcf_generator import run_sensitivity_analysis, sensitivity_to_frame
+from dcf_app.services.nlp_service import use_encoder, ENCODERS
+from dcf_app.utils.profiling import format_report
+from dcf_app.services.valuation_client import ValuationClient, service_url, SERVICE_URL_ENV_VAR
 
 def parse_range(s):
     try:
@@ -17,6 +26,20 @@ def parse_range(s):
         raise argparse.ArgumentTypeError("Ranges must be two floats separated by a comma (e.g. 0.08,0.12)")
 
 
+def peer_filters_from_args(args):
+    """Peer pre-filter options from the CLI flags (None when no filter is set)."""
+    peer_filters = {
+        "sector": args.sector,
+        "industry": args.industry,
+        "same_sector": args.same_sector,
+        "same_industry": args.same_industry,
+        "revenue_range": args.revenue_range,
+        "revenue_band": args.revenue_band,
+        "multiple_ranges": {args.multiple_type: args.multiple_range} if args.multiple_range else None,
+    }
+    return {k: v for k, v in peer_filters.items() if v} or None
+
+
 def main():
     print(f"{Fore.CYAN}🚀 RUN_PEER_MATCH.PY STARTED{Style.RESET_ALL}")
 
@@ -35,6 +58,21 @@ def main():
         default="ev_ebitda",
         help="Type of peer multiple to use for valuation"
     )
+    parser.add_argument("--sector", type=str, help="Only consider peers in this sector (e.g. Technology)")
+    parser.add_argument("--industry", type=str, help="Only consider peers in this industry")
+    parser.add_argument("--same_sector", action="store_true", help="Only consider peers in the target's sector")
+    parser.add_argument("--same_industry", action="store_true", help="Only consider peers in the target's industry")
+    parser.add_argument("--revenue_range", type=parse_range, help="Peer revenue bounds (e.g. 1e8,5e9)")
+    parser.add_argument(
+        "--revenue_band",
+        type=parse_range,
+        help="Peer revenue as multiples of the target's revenue (e.g. 0.5,2)"
+    )
+    parser.add_argument(
+        "--multiple_range",
+        type=parse_range,
+        help="Only consider peers whose --multiple_type is in this range (e.g. 3,30)"
+    )
     parser.add_argument(
         "--export_peers",
         action="store_true",
@@ -42,6 +80,12 @@ def main():
     )
     parser.add_argument("--wacc_range", type=parse_range, help="WACC range for sensitivity (e.g. 0.08,0.12)")
     parser.add_argument("--terminal_growth_range", type=parse_range, help="Terminal growth range (e.g. 0.02,0.04)")
+    parser.add_argument(
+        "--sensitivity_points",
+        type=int,
+        default=100,
+        help="Grid points per axis for the WACC x terminal growth sensitivity matrix"
+    )
     parser.add_argument(
         "--export_json",
         type=str,
@@ -65,25 +109,174 @@ def main():
         help="Optional terminal EV/EBITDA multiple for exit-based terminal value"
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        "--monte_carlo_paths",
+        type=int,
+        help="Number of Monte Carlo paths for a DCF valuation range (e.g. 1000000)"
+    )
+
+    parser.add_argument(
+        "--all_companies",
+        action="store_true",
+        help="Value every company in the peer universe in one batch pass"
+    )
+    parser.add_argument(
+        "--batch_output",
+        type=str,
+        default="results/universe_valuations.csv",
+        help="Where --all_companies writes its results table"
+    )
+
+    parser.add_argument(
+        "--tickers-file", "--tickers_file",
+        dest="tickers_file",
+        type=str,
+        help="File with one ticker or company name per line; values them across a process pool"
+    )
+    parser.add_argument("--processes", type=int, help="Worker processes for --tickers-file (default: CPU count)")
+    parser.add_argument("--torch_threads", type=int, default=1, help="Torch/BLAS threads per worker process")
+    parser.add_argument(
+        "--output_jsonl",
+        type=str,
+        help="Append each --tickers-file result to this JSON Lines file as it finishes"
+    )
 
-    result = run_peer_match_pipeline(
-        company_name=args.company_name,
-        wacc=args.wacc,
-        terminal_growth=args.terminal_growth,
-        dcf_weight=args.dcf_weight,
-        top_n_peers=args.top_n_peers,
-        min_similarity=args.min_similarity,
-        verbose=args.verbose,
-        #output_json=args.output_json,
-        multiple_type=args.multiple_type,
-        #export_peers=args.export_peers,
-       # wacc_range=args.wacc_range,
-        #terminal_growth_range=args.terminal_growth_range,
-    desc_weight=args.desc_weight,
+    parser.add_argument(
+        "--encoder",
+        choices=sorted(ENCODERS),
+        help="Description embedding backend (default: $DCF_ENCODER or sentence-transformer)"
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Use the model-free hashing encoder (no torch or model download)"
+    )
 
+    parser.add_argument(
+        "--async_pipeline",
+        action="store_true",
+        help="Overlap the yfinance lookup, embedding load and DCF (asyncio pipeline)"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print time per stage and cache hit/miss counts after the run"
+    )
+    parser.add_argument(
+        "--service_url",
+        type=str,
+        default=service_url(),
+        help=f"Send requests to a running valuation service (python -m dcf_app.services.valuation_service) "
+             f"instead of loading the model and universe here (default: ${SERVICE_URL_ENV_VAR})"
     )
 
+    args = parser.parse_args()
+    # Per-peer diagnostics (cache hits, missing fields) are debug-level log records
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING,
+                        format="%(levelname)s %(name)s: %(message)s")
+    if args.fast or args.encoder:
+        use_encoder("hashing" if args.fast else args.encoder)
+    peer_filters = peer_filters_from_args(args)
+    client = ValuationClient(args.service_url) if args.service_url else None
+
+    if args.tickers_file:
+        company_names = read_tickers_file(args.tickers_file)
+        print(f"{Fore.CYAN}📋 Valuing {len(company_names)} companies from {args.tickers_file}{Style.RESET_ALL}")
+        if client:
+            results = client.batch(
+                company_names,
+                wacc=args.wacc,
+                terminal_growth=args.terminal_growth,
+                dcf_weight=args.dcf_weight,
+                top_n_peers=args.top_n_peers,
+                min_similarity=args.min_similarity,
+                multiple_type=args.multiple_type,
+                desc_weight=args.desc_weight,
+                exit_multiple=args.exit_multiple,
+                peer_filters=peer_filters,
+            )
+        else:
+            results = run_watchlist(
+                company_names,
+                processes=args.processes,
+                torch_threads=args.torch_threads,
+                wacc=args.wacc,
+                terminal_growth=args.terminal_growth,
+                dcf_weight=args.dcf_weight,
+                top_n_peers=args.top_n_peers,
+                min_similarity=args.min_similarity,
+                multiple_type=args.multiple_type,
+                desc_weight=args.desc_weight,
+                exit_multiple=args.exit_multiple,
+                peer_filters=peer_filters,
+            )
+        for result in results:
+            line = json.dumps(result)
+            print(line, flush=True)
+            if args.output_jsonl:
+                with open(args.output_jsonl, "a") as f:
+                    f.write(line + "\n")
+        return
+
+    if args.all_companies:
+        table = run_universe_valuation(
+            wacc=args.wacc,
+            terminal_growth=args.terminal_growth,
+            dcf_weight=args.dcf_weight,
+            top_n_peers=args.top_n_peers,
+            min_similarity=args.min_similarity,
+            multiple_type=args.multiple_type,
+            desc_weight=args.desc_weight,
+        )
+        os.makedirs(os.path.dirname(args.batch_output) or ".", exist_ok=True)
+        table.to_csv(args.batch_output, index=False)
+        print(f"{Fore.GREEN}📁 Valued {len(table)} companies → {args.batch_output}{Style.RESET_ALL}")
+        return
+
+    if client:
+        result = client.pipeline(
+            args.company_name,
+            wacc=args.wacc,
+            terminal_growth=args.terminal_growth,
+            dcf_weight=args.dcf_weight,
+            top_n_peers=args.top_n_peers,
+            min_similarity=args.min_similarity,
+            multiple_type=args.multiple_type,
+            desc_weight=args.desc_weight,
+            exit_multiple=args.exit_multiple,
+            monte_carlo_paths=args.monte_carlo_paths,
+            peer_filters=peer_filters,
+        )
+    elif args.async_pipeline:
+        result = asyncio.run(run_peer_match_pipeline_async(
+            args.company_name,
+            wacc=args.wacc,
+            terminal_growth=args.terminal_growth,
+            dcf_weight=args.dcf_weight,
+            top_n_peers=args.top_n_peers,
+            min_similarity=args.min_similarity,
+            multiple_type=args.multiple_type,
+            desc_weight=args.desc_weight,
+            exit_multiple=args.exit_multiple,
+            monte_carlo_paths=args.monte_carlo_paths,
+            peer_filters=peer_filters,
+        ))
+    else:
+        result = run_peer_match_pipeline(
+            company_name=args.company_name,
+            wacc=args.wacc,
+            terminal_growth=args.terminal_growth,
+            dcf_weight=args.dcf_weight,
+            top_n_peers=args.top_n_peers,
+            min_similarity=args.min_similarity,
+            verbose=args.verbose,
+            multiple_type=args.multiple_type,
+            desc_weight=args.desc_weight,
+            exit_multiple=args.exit_multiple,
+            monte_carlo_paths=args.monte_carlo_paths,
+            peer_filters=peer_filters,
+        )
+
     if result is None:
         print(f"{Fore.RED}❌ Peer match pipeline failed or returned no results.{Style.RESET_ALL}")
         return
@@ -91,6 +284,9 @@ def main():
     print(f"\n{Fore.YELLOW}📊 FINAL OUTPUT SUMMARY:{Style.RESET_ALL}")
     print(json.dumps(result, indent=2))
 
+    if args.profile:
+        print(f"\n{Fore.YELLOW}{format_report(result['timing'])}{Style.RESET_ALL}")
+
     if args.output_json:
         os.makedirs("results", exist_ok=True)
         output_path = "results/output_summary.json"
@@ -98,6 +294,23 @@ def main():
             json.dump(result, f, indent=2)
         print(f"{Fore.GREEN}📝 Results saved to {output_path}{Style.RESET_ALL}")
 
+    # ✅ Sensitivity grid over the requested WACC / terminal growth ranges
+    if args.wacc_range and args.terminal_growth_range:
+        if client:
+            sensitivity = client.sensitivity(args.wacc_range, args.terminal_growth_range, fcfs=result["fcfs"],
+                                             num_points=args.sensitivity_points)
+        else:
+            sensitivity = run_sensitivity_analysis(
+                result["fcfs"],
+                wacc_range=args.wacc_range,
+                terminal_growth_range=args.terminal_growth_range,
+                num_points=args.sensitivity_points
+            )
+        os.makedirs("results", exist_ok=True)
+        sens_path = "results/sensitivity_matrix.csv"
+        sensitivity_to_frame(sensitivity).to_csv(sens_path)
+        print(f"{Fore.GREEN}📝 Sensitivity matrix saved to {sens_path}{Style.RESET_ALL}")
+
     # ✅ Export full peer results to separate files if requested
     if args.export_json and "peers" in result:
         export_output = {
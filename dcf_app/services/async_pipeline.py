@@ -0,0 +1,122 @@
+import asyncio
+import contextvars
+from functools import partial
+from dcf_app.models.peer_matcher import get_matching_universe, find_closest_peers_weighted
+from dcf_app.models.peer_filters import candidate_rows, resolve_peer_filters
+from dcf_app.services.peer_matcher_service import run_target_dcf, combine_with_peers
+from dcf_app.utils.loader import load_peer_universe, load_fallback_target, create_description_vectors, PEER_UNIVERSE_CSV
+from dcf_app.utils.embedding_store import company_keys, normalize_key
+from dcf_app.utils.universe_store import KEY_COLUMNS, NUMERIC_COLUMNS
+from dcf_app.utils.profiling import with_timing
+
+
+def _find_target(records, company_name):
+    key = normalize_key(company_name)
+    return next((r for r in records if key in company_keys(r)), None)
+
+
+@with_timing
+async def run_peer_match_pipeline_async(
+    company_name,
+    wacc=0.10,
+    terminal_growth=0.03,
+    dcf_weight=0.5,
+    top_n_peers=5,
+    min_similarity=0.0,
+    multiple_type="ev_ebitda",
+    fallback_description=None,
+    fallback_revenue=None,
+    fallback_ebitda_margin=None,
+    desc_weight=0.85,
+    exit_multiple=None,
+    monte_carlo_paths=None,
+    peer_universe=None,
+    peer_filters=None,
+    universe_path=PEER_UNIVERSE_CSV,
+    executor=None,
+):
+    """
+    run_peer_match_pipeline with its independent stages overlapped.
+
+    The universe and its stored embeddings load in the background while the
+    target's fundamentals are read from the universe's numeric columns or,
+    for a new ticker, fetched from yfinance. The DCF starts as soon as the
+    fundamentals arrive, a new target's description is encoded alongside,
+    and only peer matching waits for the embeddings. Blocking work (file
+    and network I/O, encoding, matching, DCF) runs in the executor, so the
+    latency is roughly that of the slowest stage rather than their sum.
+
+    Args:
+        peer_universe (tuple): Preloaded (peer_data, peer_features) from
+            load_matching_universe; skips loading
+        universe_path (str): Universe to use when peer_universe is not given;
+            loaded through get_matching_universe, so repeated runs share it
+        executor (concurrent.futures.Executor): Where blocking stages run
+            (default: the event loop's thread pool)
+
+    Other arguments are as for run_peer_match_pipeline.
+
+    Returns:
+        dict: The same result dict as run_peer_match_pipeline, or None
+    """
+    loop = asyncio.get_running_loop()
+
+    # Each stage runs in a copy of this context, so its spans reach the run's profile
+    def run(fn, *args, **kwargs):
+        return loop.run_in_executor(executor, partial(contextvars.copy_context().run, fn, *args, **kwargs))
+
+    print("🚀 RUN_PEER_MATCH_PIPELINE_ASYNC STARTED")
+
+    # ✅ Embeddings load in the background (once per universe file, as for the sync
+    # filtered path); fundamentals come from the cheap numeric columns
+    if peer_universe is None:
+        universe_task = run(get_matching_universe, universe_path)
+        records = await run(load_peer_universe, universe_path, columns=KEY_COLUMNS + NUMERIC_COLUMNS)
+    else:
+        universe_task = loop.create_future()
+        universe_task.set_result(peer_universe)
+        records = peer_universe[0]
+
+    target_company = _find_target(records, company_name)
+    in_universe = target_company is not None
+    if not in_universe:
+        target_company = await run(
+            load_fallback_target, company_name, fallback_description, fallback_revenue, fallback_ebitda_margin
+        )
+    if not target_company:
+        print(f"❌ Target company '{company_name}' not found in peer data, and no fallback provided.")
+        return None
+
+    # ✅ DCF starts now; a new target's description is encoded while the universe finishes loading
+    dcf_task = run(run_target_dcf, target_company, wacc=wacc, terminal_growth=terminal_growth,
+                   exit_multiple=exit_multiple, monte_carlo_paths=monte_carlo_paths)
+    encode_task = None if in_universe else run(create_description_vectors, [target_company])
+
+    peer_data, peer_features = await universe_task
+    if in_universe:
+        target_company = _find_target(peer_data, company_name)
+    else:
+        target_company["desc_vector"] = (await encode_task)[0]
+
+    rows = None
+    if peer_filters:
+        rows = candidate_rows(peer_features["filters"], **resolve_peer_filters(peer_filters, target_company))
+
+    top_peers = await run(
+        find_closest_peers_weighted,
+        target_company,
+        peer_data,
+        peer_features,
+        desc_weight=desc_weight,
+        top_k=top_n_peers,
+        target_name=target_company.get("name"),
+        min_similarity=min_similarity,
+        candidate_rows=rows
+    )
+    if not top_peers:
+        print("❌ No similar peers found.")
+        return None
+
+    dcf = await dcf_task
+    return combine_with_peers(company_name, target_company, top_peers, dcf,
+                              dcf_weight=dcf_weight, multiple_type=multiple_type)
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+from dcf_app.models.peer_matcher import attach_peer_vectors, build_peer_matrix
+from dcf_app.models.similarity import blocked_top_k
+from dcf_app.models.three_statement_model import forecast_3_statement_batch
+from dcf_app.models.dcf_model import discounted_cash_flow_batch
+from dcf_app.utils.loader import load_peer_universe, PEER_UNIVERSE_CSV
+
+DCF_INPUT_KEYS = [
+    "revenue_base", "revenue_growth", "ebitda_margin", "capex_pct",
+    "depreciation_pct", "nwc_pct", "tax_rate"
+]
+VALID_MULTIPLE_RANGE = (3, 30)
+
+
+def _column(companies: list[dict], key: str) -> np.ndarray:
+    """One numeric field across companies; missing or non-numeric values become NaN."""
+    values = [c.get(key) for c in companies]
+    return np.array([v if isinstance(v, (int, float, np.number)) else np.nan for v in values], dtype=np.float64)
+
+
+def _masked_median(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Row-wise median over masked entries; NaN for rows with no valid entry."""
+    masked = np.where(mask, values, np.nan)
+    has_any = mask.any(axis=1)
+    medians = np.full(values.shape[0], np.nan)
+    if has_any.any():
+        medians[has_any] = np.nanmedian(masked[has_any], axis=1)
+    return medians
+
+
+def peer_multiple_values(companies: list[dict], peer_indices: np.ndarray,
+                         multiple_type: str = "ev_ebitda") -> dict:
+    """
+    Vectorized apply_peer_multiples over every company at once.
+
+    Args:
+        companies (list[dict]): Universe records
+        peer_indices (np.ndarray): (n x k) peer rows per company, -1 for empty slots
+        multiple_type (str): 'ev_ebitda' or 'pe_ratio'
+
+    Returns:
+        dict: "median_multiple", "target_metric", "implied_value" arrays (NaN when unavailable)
+    """
+    if multiple_type == "ev_ebitda":
+        target_metric = _column(companies, "ebitda_margin") * _column(companies, "revenue_base")
+    elif multiple_type == "pe_ratio":
+        target_metric = _column(companies, "earnings")
+    else:
+        raise ValueError("Unsupported multiple type.")
+
+    multiples = _column(companies, multiple_type)
+    peer_multiples = np.where(peer_indices >= 0, multiples[np.maximum(peer_indices, 0)], np.nan)
+    low, high = VALID_MULTIPLE_RANGE
+    valid = (peer_multiples >= low) & (peer_multiples <= high)
+
+    median_multiple = _masked_median(peer_multiples, valid)
+    implied_value = median_multiple * target_metric
+
+    return {
+        "median_multiple": np.round(median_multiple, 2),
+        "target_metric": np.round(target_metric, 2),
+        "implied_value": np.round(implied_value, 2),
+    }
+
+
+def combine_valuation_arrays(dcf_values: np.ndarray, peer_values: np.ndarray,
+                             dcf_weight: float = 0.5) -> np.ndarray:
+    """Vectorized combine_valuations: weighted blend, or whichever value exists."""
+    blended = np.round(dcf_values * dcf_weight + peer_values * (1 - dcf_weight), 2)
+    return np.where(np.isnan(dcf_values), peer_values,
+                    np.where(np.isnan(peer_values), dcf_values, blended))
+
+
+def run_universe_valuation(
+    universe_path=PEER_UNIVERSE_CSV,
+    wacc=0.10,
+    terminal_growth=0.03,
+    dcf_weight=0.5,
+    top_n_peers=5,
+    min_similarity=0.0,
+    multiple_type="ev_ebitda",
+    desc_weight=0.85,
+    block_size=None,
+    batch_size=64,
+) -> pd.DataFrame:
+    """
+    Values every company in the universe in one pass.
+
+    The universe is loaded and embedded once, peers for all companies come from
+    blocked all-pairs similarity, and the DCF and peer-multiple valuations run
+    as array operations over the whole universe.
+
+    Returns:
+        pd.DataFrame: One row per company with DCF, peer and combined valuations
+        plus the chosen peers and their similarities
+    """
+    companies = load_peer_universe(universe_path)
+    print(f"📊 Batch valuation over {len(companies)} companies")
+
+    attach_peer_vectors(companies, desc_weight=desc_weight, batch_size=batch_size)
+    matrix, positions = build_peer_matrix(companies)
+
+    # Peers for every company, mapped back from matrix rows to universe rows
+    peer_rows, peer_scores = blocked_top_k(matrix, top_n_peers, min_similarity=min_similarity,
+                                           block_size=block_size)
+    peer_indices = np.full((len(companies), peer_rows.shape[1]), -1, dtype=np.int64)
+    similarities = np.full(peer_indices.shape, np.nan, dtype=np.float32)
+    peer_indices[positions] = np.where(peer_rows >= 0, positions[np.maximum(peer_rows, 0)], -1)
+    similarities[positions] = peer_scores
+
+    # DCF for every company (missing inputs take the forecast defaults, as in the pipeline)
+    inputs = {key: [c.get(key) for c in companies] for key in DCF_INPUT_KEYS}
+    fcfs = forecast_3_statement_batch(**inputs)["fcf"]
+    dcf_values = discounted_cash_flow_batch(fcfs, wacc, terminal_growth)
+
+    # Peer multiples and blend; companies without peers get no peer value
+    peer_result = peer_multiple_values(companies, peer_indices, multiple_type=multiple_type)
+    peer_values = peer_result["implied_value"]
+    combined = combine_valuation_arrays(dcf_values, peer_values, dcf_weight=dcf_weight)
+
+    names = [c.get("name") for c in companies]
+    return pd.DataFrame({
+        "ticker": [c.get("ticker") for c in companies],
+        "name": names,
+        "dcf_value": dcf_values,
+        "peer_value": peer_values,
+        "combined_valuation": combined,
+        "median_multiple": peer_result["median_multiple"],
+        "target_metric": peer_result["target_metric"],
+        "top_peers": ["; ".join(names[j] for j in row if j >= 0) for row in peer_indices],
+        "top_similarities": ["; ".join(f"{s:.4f}" for s in row if np.isfinite(s)) for row in similarities],
+    })
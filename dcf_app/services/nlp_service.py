@@ -0,0 +1,134 @@
+import os
+import re
+import threading
+import time
+import zlib
+import numpy as np
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+_model = None
+_model_lock = threading.Lock()
+_load_seconds = None
+
+
+def _load_model(model_name: str):
+    # Imported here so modules that never encode don't pay for torch
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def get_model():
+    """
+    Returns the process-wide sentence-transformer model, loading it on first use.
+    Safe to call from several threads; only one of them loads the model.
+    """
+    global _model, _load_seconds
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                start = time.perf_counter()
+                model = _load_model(MODEL_NAME)
+                _load_seconds = time.perf_counter() - start
+                _model = model
+                print(f"🧠 Loaded embedding model '{MODEL_NAME}' in {_load_seconds:.2f}s")
+    return _model
+
+
+def model_load_seconds():
+    """Seconds the model took to load, or None if it has not been loaded yet."""
+    return _load_seconds
+
+
+def is_model_loaded() -> bool:
+    return _model is not None
+
+
+class SentenceTransformerEncoder:
+    """Encoder backed by the shared sentence-transformer model (see get_model)."""
+
+    model_id = MODEL_NAME
+
+    def load(self):
+        get_model()
+        return self
+
+    def encode(self, texts: list[str], batch_size: int = 64) -> np.ndarray:
+        return np.asarray(get_model().encode(list(texts), batch_size=batch_size), dtype=np.float32)
+
+
+class HashingEncoder:
+    """
+    Model-free encoder: word unigrams and bigrams are hashed into a fixed
+    number of signed buckets, weighted by 1 + log(term frequency) and
+    L2-normalized. Needs no weights, download or torch, so it suits fast
+    mode, benchmarks and tests. There is no corpus-level IDF: an embedding
+    depends only on its own text, so cached vectors stay valid as the
+    universe changes.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self.model_id = f"hashing-{dim}"
+
+    def load(self):
+        return self
+
+    def _embed(self, text: str) -> np.ndarray:
+        tokens = _TOKEN_PATTERN.findall(str(text).lower())
+        terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if not terms:
+            return vector
+
+        hashes = np.fromiter((zlib.crc32(t.encode("utf-8")) for t in terms), dtype=np.uint32, count=len(terms))
+        buckets, counts = np.unique(hashes, return_counts=True)
+        signs = np.where(buckets & 0x80000000, -1.0, 1.0).astype(np.float32)
+        np.add.at(vector, buckets % self.dim, signs * (1.0 + np.log(counts)).astype(np.float32))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def encode(self, texts: list[str], batch_size: int = 64) -> np.ndarray:
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+        return np.vstack([self._embed(t) for t in texts])
+
+
+ENCODERS = {
+    "sentence-transformer": SentenceTransformerEncoder,
+    "hashing": HashingEncoder,
+}
+# Backend used when get_encoder() is called without a name; set by use_encoder / --fast
+ENCODER_ENV_VAR = "DCF_ENCODER"
+DEFAULT_ENCODER = "sentence-transformer"
+
+_encoders = {}
+
+
+def get_encoder(name: str = None):
+    """
+    Process-wide encoder instance. Every encoder has a model_id (part of the
+    description cache key) and a batch encode(texts, batch_size) returning a
+    (len(texts) x dim) float32 array.
+
+    Args:
+        name (str): "sentence-transformer" or "hashing" (default: $DCF_ENCODER,
+            else the sentence-transformer)
+    """
+    name = name or os.environ.get(ENCODER_ENV_VAR) or DEFAULT_ENCODER
+    if name not in ENCODERS:
+        raise ValueError(f"Unknown encoder '{name}'; use one of {sorted(ENCODERS)}.")
+    with _model_lock:
+        if name not in _encoders:
+            _encoders[name] = ENCODERS[name]()
+        return _encoders[name]
+
+
+def use_encoder(name: str):
+    """
+    Makes name the default encoder for this process and any worker processes
+    it starts (through the environment).
+    """
+    get_encoder(name)
+    os.environ[ENCODER_ENV_VAR] = name
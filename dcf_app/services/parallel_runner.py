@@ -0,0 +1,156 @@
+import os
+import sys
+from multiprocessing import Pool, shared_memory
+import numpy as np
+from threadpoolctl import threadpool_limits
+from dcf_app.models.peer_matcher import attach_peer_vectors, build_peer_matrix, find_closest_peers
+from dcf_app.models.peer_filters import build_filter_index, candidate_rows, resolve_peer_filters
+from dcf_app.services.peer_matcher_service import value_target_with_peers
+from dcf_app.utils.loader import load_peer_universe, create_company_vector, load_fallback_target, PEER_UNIVERSE_CSV
+from dcf_app.utils.helpers import validate_vector
+
+# Per-worker state, set once by _init_worker
+_worker = {}
+
+
+def read_tickers_file(path: str) -> list[str]:
+    """One ticker or company name per line; blank lines and '#' comments are ignored."""
+    with open(path, "r") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def _limit_threads(torch_threads: int):
+    # numpy's BLAS is already loaded here, so its pool is resized directly; the
+    # environment only reaches libraries loaded later in this worker (e.g. torch)
+    _worker["thread_limits"] = threadpool_limits(limits=torch_threads)
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(torch_threads)
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(torch_threads)
+
+
+def _init_worker(shm_name, shape, dtype, positions, peers, torch_threads, options):
+    _limit_threads(torch_threads)
+
+    shm = shared_memory.SharedMemory(name=shm_name)  # Attach only; the parent unlinks it
+    _worker["shm"] = shm
+    _worker["matrix"] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _worker["positions"] = positions
+    _worker["peers"] = peers
+    _worker["options"] = options
+    _worker["filters"] = build_filter_index(peers, positions) if options.get("peer_filters") else None
+    _worker["row_of"] = {
+        key: row
+        for row, i in enumerate(positions)
+        for key in (str(peers[i].get("name", "")).strip().lower(), str(peers[i].get("ticker", "")).strip().lower())
+        if key
+    }
+
+
+def _value_one(company_name: str) -> dict:
+    peers = _worker["peers"]
+    positions = _worker["positions"]
+    matrix = _worker["matrix"]
+    options = _worker["options"]
+
+    row = _worker["row_of"].get(company_name.strip().lower())
+    if row is not None:
+        target_company = peers[positions[row]]
+        target_vector = matrix[row]
+    else:
+        # Not in the universe: build the target as the single-name pipeline does
+        # and embed it in this worker
+        target_company = load_fallback_target(company_name)
+        if not target_company:
+            return {"company_name": company_name, "error": "Target not found in universe or yfinance."}
+        target_vector = create_company_vector(target_company, desc_weight=options["desc_weight"])
+        if not validate_vector(target_vector):
+            return {"company_name": company_name, "error": "Could not build target vector."}
+
+    rows = None
+    if _worker["filters"] is not None:
+        rows = candidate_rows(_worker["filters"], **resolve_peer_filters(options["peer_filters"], target_company))
+
+    top_peers = find_closest_peers(
+        target_vector,
+        peers,
+        top_k=options["top_n_peers"],
+        target_name=target_company.get("name"),
+        min_similarity=options["min_similarity"],
+        peer_matrix=(matrix, positions),
+        candidate_rows=rows
+    )
+    if not top_peers:
+        return {"company_name": company_name, "error": "No similar peers found."}
+
+    return value_target_with_peers(
+        company_name,
+        target_company,
+        top_peers,
+        wacc=options["wacc"],
+        terminal_growth=options["terminal_growth"],
+        dcf_weight=options["dcf_weight"],
+        multiple_type=options["multiple_type"],
+        exit_multiple=options["exit_multiple"],
+    )
+
+
+def _safe_value_one(company_name: str) -> dict:
+    try:
+        return _value_one(company_name)
+    except Exception as e:
+        return {"company_name": company_name, "error": str(e)}
+
+
+def run_watchlist(
+    company_names: list[str],
+    processes: int = None,
+    torch_threads: int = 1,
+    universe_path=PEER_UNIVERSE_CSV,
+    wacc=0.10,
+    terminal_growth=0.03,
+    dcf_weight=0.5,
+    top_n_peers=5,
+    min_similarity=0.0,
+    multiple_type="ev_ebitda",
+    desc_weight=0.85,
+    exit_multiple=None,
+    peer_filters=None,
+):
+    """
+    Values a watchlist across a process pool, yielding each result as soon as
+    its worker finishes (completion order, not input order).
+
+    The universe is loaded and embedded once in the parent; the normalized
+    embedding matrix lives in shared memory and workers attach to it without
+    copying. Each worker's BLAS/torch thread count is capped at torch_threads.
+    peer_filters (see resolve_peer_filters) narrow each target's candidates.
+    """
+    peers = load_peer_universe(universe_path)
+    attach_peer_vectors(peers, desc_weight=desc_weight)
+    matrix, positions = build_peer_matrix(peers)
+    for peer in peers:
+        peer.pop("vector", None)  # Workers read vectors from shared memory
+
+    shm = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+    try:
+        np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=shm.buf)[:] = matrix
+        options = {
+            "wacc": wacc,
+            "terminal_growth": terminal_growth,
+            "dcf_weight": dcf_weight,
+            "top_n_peers": top_n_peers,
+            "min_similarity": min_similarity,
+            "multiple_type": multiple_type,
+            "desc_weight": desc_weight,
+            "exit_multiple": exit_multiple,
+            "peer_filters": peer_filters,
+        }
+        init_args = (shm.name, matrix.shape, matrix.dtype.str, positions, peers, torch_threads, options)
+
+        with Pool(processes=processes, initializer=_init_worker, initargs=init_args) as pool:
+            for result in pool.imap_unordered(_safe_value_one, company_names):
+                yield result
+    finally:
+        shm.close()
+        shm.unlink()
@@ -1,10 +1,18 @@
 import os
 import json
-from dcf_app.models.peer_matcher import prepare_vectors, find_closest_peers, apply_peer_multiples
+from dcf_app.models.peer_matcher import (
+    prepare_vectors, find_closest_peers, find_closest_peers_weighted, apply_peer_multiples, get_matching_universe
+)
+from dcf_app.models.peer_filters import candidate_rows, resolve_peer_filters
+from dcf_app.utils.loader import load_fallback_target
+from dcf_app.utils.embedding_store import company_keys, normalize_key
 from dcf_app.models.dcf_generator import run_dcf_from_inputs, generate_forecasted_fcfs
+from dcf_app.models.monte_carlo import simulate_dcf, default_distributions
 from dcf_app.utils.valuation import combine_valuations
+from dcf_app.utils.profiling import span, with_timing
 
 
+@with_timing
 def run_peer_match_pipeline(
     company_name,
     wacc=0.10,
@@ -19,9 +27,34 @@ def run_peer_match_pipeline(
     fallback_ebitda_margin=None,
     desc_weight=0.85,
     exit_multiple=None,
+    monte_carlo_paths=None,
+    peer_universe=None,
+    peer_filters=None,
 ):
     print("🚀 RUN_PEER_MATCH_PIPELINE STARTED")
 
+    # Reuse an already loaded and embedded universe (e.g. a cached app resource);
+    # filtered runs use the memoized universe, whose filter index is built once
+    if peer_universe is None and peer_filters:
+        peer_universe = get_matching_universe()
+    if peer_universe is not None:
+        return _run_on_universe(
+            company_name, peer_universe,
+            wacc=wacc,
+            terminal_growth=terminal_growth,
+            dcf_weight=dcf_weight,
+            top_n_peers=top_n_peers,
+            min_similarity=min_similarity,
+            multiple_type=multiple_type,
+            fallback_description=fallback_description,
+            fallback_revenue=fallback_revenue,
+            fallback_ebitda_margin=fallback_ebitda_margin,
+            desc_weight=desc_weight,
+            exit_multiple=exit_multiple,
+            monte_carlo_paths=monte_carlo_paths,
+            peer_filters=peer_filters,
+        )
+
     # Load target company and peer data (with optional fallback)
     target_vector, peer_data = prepare_vectors(
         company_name,
@@ -58,8 +91,97 @@ def run_peer_match_pipeline(
         print("❌ No similar peers found.")
         return None
 
-    peer_companies = [peer for peer, _ in top_peers]
+    return value_target_with_peers(
+        company_name,
+        target_company,
+        top_peers,
+        wacc=wacc,
+        terminal_growth=terminal_growth,
+        dcf_weight=dcf_weight,
+        multiple_type=multiple_type,
+        exit_multiple=exit_multiple,
+        monte_carlo_paths=monte_carlo_paths,
+    )
+
+
+def _run_on_universe(company_name, peer_universe, top_n_peers=5, min_similarity=0.0,
+                     fallback_description=None, fallback_revenue=None, fallback_ebitda_margin=None,
+                     desc_weight=0.85, peer_filters=None, **valuation_args):
+    """
+    Pipeline over a preloaded (peer_data, peer_features) universe from
+    load_matching_universe. desc_weight is applied at query time, and the
+    universe is only read, never modified, so it can be shared between
+    concurrent callers. peer_filters (see resolve_peer_filters) are answered
+    from the universe's filter index before any similarity is computed.
+    """
+    peer_data, peer_features = peer_universe
+
+    key = normalize_key(company_name)
+    target_company = next((p for p in peer_data if key in company_keys(p)), None)
+    if target_company is None:
+        target_company = load_fallback_target(
+            company_name, fallback_description, fallback_revenue, fallback_ebitda_margin
+        )
+    if not target_company:
+        print(f"❌ Target company '{company_name}' not found in peer data, and no fallback provided.")
+        return None
+
+    rows = None
+    if peer_filters:
+        rows = candidate_rows(peer_features["filters"], **resolve_peer_filters(peer_filters, target_company))
+        print(f"🔎 {len(rows)} of {len(peer_features['positions'])} peers pass the filters")
 
+    top_peers = find_closest_peers_weighted(
+        target_company,
+        peer_data,
+        peer_features,
+        desc_weight=desc_weight,
+        top_k=top_n_peers,
+        target_name=target_company.get("name"),
+        min_similarity=min_similarity,
+        candidate_rows=rows
+    )
+    if not top_peers:
+        print("❌ No similar peers found.")
+        return None
+
+    return value_target_with_peers(company_name, target_company, top_peers, **valuation_args)
+
+
+def value_target_with_peers(
+    company_name,
+    target_company,
+    top_peers,
+    wacc=0.10,
+    terminal_growth=0.03,
+    dcf_weight=0.5,
+    multiple_type="ev_ebitda",
+    exit_multiple=None,
+    monte_carlo_paths=None,
+):
+    """
+    DCF, peer-multiple and combined valuation of a target whose peers are
+    already chosen; returns the pipeline result dict.
+    """
+    dcf = run_target_dcf(
+        target_company,
+        wacc=wacc,
+        terminal_growth=terminal_growth,
+        exit_multiple=exit_multiple,
+        monte_carlo_paths=monte_carlo_paths,
+    )
+    return combine_with_peers(company_name, target_company, top_peers, dcf,
+                              dcf_weight=dcf_weight, multiple_type=multiple_type)
+
+
+def run_target_dcf(target_company, wacc=0.10, terminal_growth=0.03, exit_multiple=None, monte_carlo_paths=None):
+    """
+    The peer-independent half of the valuation: DCF, exit-multiple terminal
+    value and optional Monte Carlo range, from the target's fundamentals only.
+
+    Returns:
+        dict: "dcf_value", "terminal_info", "fcfs", "exit_terminal_value", "monte_carlo"
+    """
     # DCF valuation
     inputs = {
         "revenue_base": target_company.get("revenue_base"),
@@ -72,18 +194,18 @@ def run_peer_match_pipeline(
     }
 
     # DCF valuation (with terminal value unpacking)
-    value, terminal_info = run_dcf_from_inputs(
-        inputs,
-        wacc=wacc,
-        terminal_growth=terminal_growth,
-        exit_multiple=exit_multiple
-    )
+    with span("dcf"):
+        value, terminal_info = run_dcf_from_inputs(
+            inputs,
+            wacc=wacc,
+            terminal_growth=terminal_growth,
+            exit_multiple=exit_multiple
+        )
 
-    fcf_forecast = {
-        "valuation": value,
-        "fcfs": generate_forecasted_fcfs(inputs)
-    }
-    dcf_value = fcf_forecast["valuation"]
+        fcf_forecast = {
+            "valuation": value,
+            "fcfs": generate_forecasted_fcfs(inputs)
+        }
 
     # ✅ Compute terminal value via Exit Multiple
     exit_terminal_value = None
@@ -96,8 +218,38 @@ def run_peer_match_pipeline(
         except Exception as e:
             print(f"❌ Error computing exit-based terminal value: {e}")
 
+    # Optional Monte Carlo valuation range around the point estimate
+    monte_carlo = None
+    if monte_carlo_paths:
+        with span("monte_carlo"):
+            monte_carlo = simulate_dcf(
+                inputs,
+                distributions=default_distributions(inputs, wacc=wacc, terminal_growth=terminal_growth),
+                n_paths=monte_carlo_paths,
+                include_histogram=False
+            )
+
+    return {
+        "dcf_value": fcf_forecast["valuation"],
+        "terminal_info": terminal_info,
+        "fcfs": fcf_forecast["fcfs"],
+        "exit_terminal_value": exit_terminal_value,
+        "monte_carlo": monte_carlo,
+    }
+
+
+def combine_with_peers(company_name, target_company, top_peers, dcf, dcf_weight=0.5, multiple_type="ev_ebitda"):
+    """
+    Adds the peer-multiple valuation to a run_target_dcf result and blends
+    the two; returns the pipeline result dict.
+    """
+    peer_companies = [peer for peer, _ in top_peers]
+    dcf_value = dcf["dcf_value"]
+    exit_terminal_value = dcf["exit_terminal_value"]
+
     # Peer-based valuation
-    peer_result = apply_peer_multiples(target_company, peer_companies, multiple_type=multiple_type)
+    with span("peer_multiples"):
+        peer_result = apply_peer_multiples(target_company, peer_companies, multiple_type=multiple_type)
     peer_value = peer_result.get("implied_value")
 
     # Combine valuations
@@ -110,7 +262,9 @@ def run_peer_match_pipeline(
         "combined_valuation": final_value,
         "exit_terminal_value": round(exit_terminal_value,
                                      2) if exit_terminal_value else None,
-        "terminal_info": terminal_info,
+        "terminal_info": dcf["terminal_info"],
+        "fcfs": dcf["fcfs"],
+        "monte_carlo": dcf["monte_carlo"],
         "peer_result": peer_result,
         "top_peers": [
             {
@@ -122,6 +276,3 @@ def run_peer_match_pipeline(
             for peer, score in top_peers
         ]
     }
-
-
-
@@ -0,0 +1,136 @@
+import os
+import numpy as np
+import pandas as pd
+from dcf_app.utils.loader import load_peer_universe, create_description_vectors, description_vector_key, PEER_UNIVERSE_CSV
+from dcf_app.utils.embedding_store import get_description_store, company_keys
+from dcf_app.utils.helpers import validate_vector
+from dcf_app.utils.universe_store import convert_csv_to_parquet
+
+SNAPSHOT_KEY = "ticker"
+
+
+def _same(a, b) -> bool:
+    """Field equality that treats missing values (None/NaN) as equal."""
+    a_missing = a is None or (isinstance(a, float) and np.isnan(a))
+    b_missing = b is None or (isinstance(b, float) and np.isnan(b))
+    if a_missing or b_missing:
+        return a_missing and b_missing
+    if isinstance(a, (int, float, np.number)) and isinstance(b, (int, float, np.number)):
+        return bool(np.isclose(float(a), float(b), rtol=1e-9, atol=0.0))
+    return a == b
+
+
+def diff_snapshots(old_records: list[dict], new_records: list[dict], key: str = SNAPSHOT_KEY) -> dict:
+    """
+    Compares two universe snapshots row by row on their key column.
+
+    Returns:
+        dict: "added", "removed", "changed" (any field differs) and "unchanged"
+        key lists, plus "changed_fields" {key: [field, ...]}
+    """
+    old = {r[key]: r for r in old_records if isinstance(r.get(key), str)}
+    new = {r[key]: r for r in new_records if isinstance(r.get(key), str)}
+
+    changed, unchanged, changed_fields = [], [], {}
+    for k in new.keys() & old.keys():
+        fields = [f for f in new[k].keys() | old[k].keys()
+                  if f != "vector" and not _same(new[k].get(f), old[k].get(f))]
+        if fields:
+            changed.append(k)
+            changed_fields[k] = sorted(fields)
+        else:
+            unchanged.append(k)
+
+    return {
+        "added": [k for k in new if k not in old],
+        "removed": [k for k in old if k not in new],
+        "changed": sorted(changed),
+        "unchanged": sorted(unchanged),
+        "changed_fields": changed_fields,
+    }
+
+
+def _write_snapshot(records: list[dict], path: str):
+    """Atomically replaces the universe CSV (and its Parquet copy, if there is one)."""
+    df = pd.DataFrame([{k: v for k, v in r.items() if k != "vector"} for r in records])
+    tmp_path = f"{path}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+    parquet_path = os.path.splitext(path)[0] + ".parquet"
+    if os.path.exists(parquet_path):
+        convert_csv_to_parquet(path, parquet_path)
+
+
+def refresh_universe(new_records: list[dict], universe_path: str = PEER_UNIVERSE_CSV, store=None,
+                     batch_size: int = 64) -> dict:
+    """
+    Applies a fresh universe snapshot incrementally.
+
+    The snapshot is diffed against the stored universe by ticker, and only
+    companies whose description key changed (see description_vector_key) or
+    that have no stored embedding are re-embedded; changed fundamentals alone
+    need no encoding. Their rows in the description store are overwritten in
+    place and new companies are appended. The universe file is then replaced with the
+    new snapshot, so the cost scales with what changed rather than with the
+    size of the universe.
+
+    Args:
+        new_records (list[dict]): Full new snapshot, one dict per company
+        universe_path (str): Stored universe CSV to diff against and replace
+        store (EmbeddingStore): Store to update (default: the shared description store)
+        batch_size (int): Encoding batch size
+
+    Returns:
+        dict: Diff counts plus "embedded" (vectors recomputed) and "failed"
+    """
+    if store is None:
+        store = get_description_store()
+
+    old_records = load_peer_universe(universe_path) if os.path.exists(universe_path) else []
+    diff = diff_snapshots(old_records, new_records)
+    touched = set(diff["added"]) | set(diff["changed"])
+
+    stale, stale_fingerprints = [], []
+    current, current_fingerprints = [], []
+    for record in new_records:
+        if not company_keys(record):
+            continue
+        fingerprint = description_vector_key(record)
+        stored = store.fingerprint_for(record)
+        if store.row_for_company(record) < 0:
+            needs_embedding = True
+        elif stored is not None:
+            needs_embedding = stored != fingerprint
+        else:
+            # Rows stored before fingerprints existed: trust them unless the snapshot changed
+            needs_embedding = record.get(SNAPSHOT_KEY) in touched
+        if needs_embedding:
+            stale.append(record)
+            stale_fingerprints.append(fingerprint)
+        elif stored is None:
+            current.append(record)
+            current_fingerprints.append(fingerprint)
+
+    print(f"🔄 Universe diff: {len(diff['added'])} added, {len(diff['changed'])} changed, "
+          f"{len(diff['removed'])} removed; re-embedding {len(stale)} companies")
+
+    vectors = create_description_vectors(stale, batch_size=batch_size)
+    valid = [i for i, v in enumerate(vectors) if v is not None and validate_vector(v)]
+    if valid:
+        store.upsert_companies([stale[i] for i in valid], [vectors[i] for i in valid],
+                               fingerprints=[stale_fingerprints[i] for i in valid])
+    if current:
+        store.set_fingerprints(current, current_fingerprints)
+
+    _write_snapshot(new_records, universe_path)
+    print(f"✅ Universe refreshed → {universe_path}")
+
+    return {
+        "added": len(diff["added"]),
+        "removed": len(diff["removed"]),
+        "changed": len(diff["changed"]),
+        "unchanged": len(diff["unchanged"]),
+        "embedded": len(valid),
+        "failed": len(stale) - len(valid),
+    }
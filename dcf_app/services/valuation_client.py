@@ -0,0 +1,64 @@
+import json
+import os
+import urllib.error
+import urllib.request
+
+SERVICE_URL_ENV_VAR = "DCF_SERVICE_URL"
+DEFAULT_SERVICE_URL = "http://127.0.0.1:8765"
+
+
+class ValuationClient:
+    """
+    Thin client for the valuation service (dcf_app.services.valuation_service).
+    Uses only the standard library, so callers never load the model or the
+    universe themselves.
+    """
+
+    def __init__(self, url: str = None, timeout: float = 60.0):
+        self.url = (url or service_url() or DEFAULT_SERVICE_URL).rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, path: str, payload: dict = None):
+        data = None if payload is None else json.dumps(payload).encode("utf-8")
+        request = urllib.request.Request(self.url + path, data=data, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", e.reason)
+            except ValueError:
+                message = e.reason
+            if e.code < 500:
+                raise ValueError(f"Valuation service rejected {path}: {message}") from None
+            raise RuntimeError(f"Valuation service failed on {path}: {message}") from None
+
+    def health(self) -> dict:
+        return self._request("/health")
+
+    def pipeline(self, company_name: str, **options) -> dict:
+        """run_peer_match_pipeline on the service; returns its result dict or None."""
+        return self._request("/pipeline", {"company_name": company_name, **options})
+
+    def batch(self, companies: list[str], **options) -> list[dict]:
+        """One pipeline result (or {"company_name", "error"}) per company, in order."""
+        return self._request("/batch", {"companies": list(companies), **options})
+
+    def sensitivity(self, wacc_range, terminal_growth_range, fcfs=None, **options) -> dict:
+        """
+        run_sensitivity_analysis on the service, over fcfs or, when omitted,
+        over a pipeline run for options["company_name"].
+        """
+        payload = {"wacc_range": list(wacc_range), "terminal_growth_range": list(terminal_growth_range), **options}
+        if fcfs is not None:
+            payload["fcfs"] = list(fcfs)
+        return self._request("/sensitivity", payload)
+
+    def reload(self) -> dict:
+        """Makes the service re-read its universe file."""
+        return self._request("/reload", {})
+
+
+def service_url() -> str:
+    """The configured service URL ($DCF_SERVICE_URL), or None to run locally."""
+    return os.environ.get(SERVICE_URL_ENV_VAR) or None
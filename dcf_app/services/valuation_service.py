@@ -0,0 +1,290 @@
+import argparse
+import json
+import logging
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from dcf_app.models.peer_matcher import load_matching_universe
+from dcf_app.models.dcf_generator import run_sensitivity_analysis
+from dcf_app.services.peer_matcher_service import run_peer_match_pipeline
+from dcf_app.services.nlp_service import get_encoder, use_encoder, ENCODERS
+from dcf_app.utils.loader import PEER_UNIVERSE_CSV
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Largest sensitivity grid a request may ask for, in points per axis
+MAX_SENSITIVITY_POINTS = 200
+
+# Pipeline arguments a request may set and the JSON shape of each (see _KINDS);
+# the universe always comes from the service
+PIPELINE_OPTIONS = {
+    "company_name": "string",
+    "wacc": "number",
+    "terminal_growth": "number",
+    "dcf_weight": "number",
+    "top_n_peers": "integer",
+    "min_similarity": "number",
+    "multiple_type": "string",
+    "fallback_description": "string",
+    "fallback_revenue": "number",
+    "fallback_ebitda_margin": "number",
+    "desc_weight": "number",
+    "exit_multiple": "number",
+    "monte_carlo_paths": "integer",
+    "peer_filters": "object",
+}
+PEER_FILTER_OPTIONS = {
+    "sector": "string",
+    "industry": "string",
+    "same_sector": "boolean",
+    "same_industry": "boolean",
+    "revenue_range": "range",
+    "revenue_band": "pair",
+    "multiple_ranges": "object",
+}
+SENSITIVITY_OPTIONS = {
+    "wacc_range": "pair",
+    "terminal_growth_range": "pair",
+    "step": "number",
+    "num_points": "integer",
+    "fcfs": "numbers",
+}
+
+
+def _is_number(value) -> bool:
+    """A finite JSON number (Python's json also reads NaN and Infinity)."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    try:
+        return math.isfinite(value)
+    except OverflowError:  # An integer too large for a float
+        return False
+
+
+# Shape name -> (description for errors, check); None always passes and means "use the default"
+_KINDS = {
+    "string": ("a string", lambda v: isinstance(v, str)),
+    "boolean": ("true or false", lambda v: isinstance(v, bool)),
+    "integer": ("an integer", lambda v: isinstance(v, int) and not isinstance(v, bool)),
+    "number": ("a number", _is_number),
+    "object": ("a JSON object", lambda v: isinstance(v, dict)),
+    "numbers": ("a list of numbers", lambda v: isinstance(v, list) and all(_is_number(x) for x in v)),
+    "pair": ("a [low, high] pair of numbers", lambda v: isinstance(v, list) and len(v) == 2
+             and all(_is_number(x) for x in v)),
+    "range": ("a [low, high] pair of numbers or nulls", lambda v: isinstance(v, list) and len(v) == 2
+              and all(x is None or _is_number(x) for x in v)),
+}
+
+logger = logging.getLogger(__name__)
+
+
+class ValuationService:
+    """
+    Keeps the encoder and the embedded peer universe resident, so each
+    request only pays for matching and valuation. The universe is read-only
+    while serving; reload() builds a new one and swaps it in.
+    """
+
+    def __init__(self, universe_path: str = PEER_UNIVERSE_CSV, batch_size: int = 64):
+        self.universe_path = universe_path
+        self.batch_size = batch_size
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.encoder = get_encoder()
+        self.encoder.load()
+        self.reload()
+
+    def reload(self) -> dict:
+        """Re-reads the universe (e.g. after universe_refresh) and swaps it in."""
+        start = time.perf_counter()
+        universe = load_matching_universe(self.universe_path, batch_size=self.batch_size)
+        with self._lock:
+            self.universe = universe
+            self.loaded_at = time.time()
+        print(f"✅ Loaded {len(universe[0])} companies in {time.perf_counter() - start:.2f}s")
+        return self.health()
+
+    def call(self, method: str, *args):
+        """Runs one endpoint method and counts the request."""
+        with self._lock:
+            self.requests += 1
+        return getattr(self, method)(*args)
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "companies": len(self.universe[0]),
+            "encoder": self.encoder.model_id,
+            "universe_path": self.universe_path,
+            "loaded_at": self.loaded_at,
+            "requests": self.requests,
+        }
+
+    def pipeline(self, payload: dict) -> dict:
+        """run_peer_match_pipeline over the resident universe; payload holds its arguments."""
+        options = _pipeline_options(payload)
+        if not options.get("company_name"):
+            raise ValueError("company_name is required.")
+        return run_peer_match_pipeline(**options, peer_universe=self.universe)
+
+    def batch(self, payload: dict) -> list[dict]:
+        """
+        Values each of payload["companies"] with the shared pipeline options;
+        failures become {"company_name", "error"} entries, in input order.
+        """
+        companies = payload.get("companies")
+        if not isinstance(companies, list) or not companies or not all(isinstance(c, str) for c in companies):
+            raise ValueError("companies must be a non-empty list of names.")
+        options = _pipeline_options({k: v for k, v in payload.items() if k != "companies"})
+
+        results = []
+        for company_name in companies:
+            result = run_peer_match_pipeline(company_name, **options, peer_universe=self.universe)
+            results.append(result or {"company_name": company_name, "error": "No valuation produced."})
+        return results
+
+    def sensitivity(self, payload: dict) -> dict:
+        """
+        WACC x terminal growth grid (run_sensitivity_analysis) over
+        payload["fcfs"], or over the FCFs of a pipeline run for
+        payload["company_name"] when no FCFs are given.
+        """
+        grid_options = _options({k: v for k, v in payload.items() if k in SENSITIVITY_OPTIONS}, SENSITIVITY_OPTIONS)
+        for key in ("wacc_range", "terminal_growth_range"):
+            if grid_options.get(key) is None:
+                raise ValueError(f"{key} must be {_KINDS['pair'][0]}.")
+            points = _axis_points(grid_options[key], grid_options.get("step"), grid_options.get("num_points"))
+            if points > MAX_SENSITIVITY_POINTS:
+                raise ValueError(f"Sensitivity grids are limited to {MAX_SENSITIVITY_POINTS} points per axis.")
+
+        fcfs = grid_options.pop("fcfs", None)
+        if fcfs is None:
+            result = self.pipeline({k: v for k, v in payload.items() if k not in SENSITIVITY_OPTIONS})
+            if not result:
+                raise ValueError(f"No valuation produced for '{payload.get('company_name')}'.")
+            fcfs = result["fcfs"]
+        return run_sensitivity_analysis(fcfs, **{k: v for k, v in grid_options.items() if v is not None})
+
+
+def _options(payload: dict, allowed: dict) -> dict:
+    """payload checked against allowed ({option: shape}); unknown or malformed options raise ValueError."""
+    unknown = sorted(set(payload) - set(allowed))
+    if unknown:
+        raise ValueError(f"Unknown option(s): {', '.join(unknown)}")
+    for name, value in payload.items():
+        description, check = _KINDS[allowed[name]]
+        if value is not None and not check(value):
+            raise ValueError(f"{name} must be {description}.")
+    return payload
+
+
+def _pipeline_options(payload: dict) -> dict:
+    options = _options(payload, PIPELINE_OPTIONS)
+    peer_filters = _options(options.get("peer_filters") or {}, PEER_FILTER_OPTIONS)
+    _options(peer_filters.get("multiple_ranges") or {}, {"ev_ebitda": "range", "pe_ratio": "range"})
+    for name in ("top_n_peers", "monte_carlo_paths"):
+        if options.get(name) is not None and options[name] < 1:
+            raise ValueError(f"{name} must be at least 1.")
+    return options
+
+
+def _axis_points(bounds: list, step: float = None, num_points: int = None) -> int:
+    """Points run_sensitivity_analysis puts on an axis spanning bounds."""
+    if num_points:
+        return num_points
+    step = 0.01 if step is None else step
+    if step <= 0:
+        raise ValueError("step must be positive.")
+    return max(0, int((bounds[1] - bounds[0]) / step)) + 1
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+class ValuationRequestHandler(BaseHTTPRequestHandler):
+    """JSON in, JSON out; routes map a path to a ValuationService method."""
+
+    GET_ROUTES = {"/health": "health"}
+    POST_ROUTES = {"/pipeline": "pipeline", "/batch": "batch", "/sensitivity": "sensitivity", "/reload": "reload"}
+
+    def do_GET(self):
+        self._dispatch(self.GET_ROUTES, with_payload=False)
+
+    def do_POST(self):
+        self._dispatch(self.POST_ROUTES, with_payload=True)
+
+    def _dispatch(self, routes: dict, with_payload: bool):
+        method = routes.get(self.path.rstrip("/") or "/")
+        if method is None:
+            return self._send(404, {"error": f"Unknown endpoint {self.command} {self.path}"})
+
+        try:
+            args = []
+            if with_payload and method != "reload":
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(payload, dict):
+                    raise ValueError("Request body must be a JSON object.")
+                args.append(payload)
+            body = self.server.service.call(method, *args)
+        except ValueError as e:  # Rejected requests, including malformed JSON (json.JSONDecodeError)
+            return self._send(400, {"error": str(e)})
+        except Exception as e:
+            logger.exception("%s %s failed", self.command, self.path)
+            return self._send(500, {"error": str(e)})
+        self._send(200, body)
+
+    def _send(self, status: int, body):
+        data = json.dumps(body, default=_json_default).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+def create_server(service: ValuationService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """HTTP server for service; port 0 picks a free port (see server.server_address)."""
+    server = ThreadingHTTPServer((host, port), ValuationRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve peer matching and valuation over HTTP/JSON")
+    parser.add_argument("--host", type=str, default=DEFAULT_HOST, help="Interface to bind (default: localhost)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument("--universe", type=str, default=PEER_UNIVERSE_CSV, help="Peer universe to keep loaded")
+    parser.add_argument("--encoder", choices=sorted(ENCODERS),
+                        help="Description embedding backend (default: $DCF_ENCODER or sentence-transformer)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    if args.encoder:
+        use_encoder(args.encoder)
+
+    server = create_server(ValuationService(args.universe), args.host, args.port)
+    host, port = server.server_address[:2]
+    print(f"🚀 Valuation service listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,6 @@ import matplotlib.pyplot as plt
 import json
 import os
 import io
-import yfinance as yf
 import sys
 
 # ✅ Add project root to sys.path
@@ -15,10 +14,71 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 from dcf_app.services.peer_matcher_service import run_peer_match_pipeline
+from dcf_app.services.nlp_service import get_encoder
+from dcf_app.models.peer_matcher import get_matching_universe
+from dcf_app.utils.loader import PEER_UNIVERSE_CSV
+from dcf_app.models.dcf_generator import run_sensitivity_analysis, sensitivity_to_frame
+from dcf_app.utils.yf_cache import get_ticker_info
+from dcf_app.services.valuation_client import ValuationClient, service_url
 
 # ✅ Paths
-RESULTS_PATH = "results/output_summary.json"
 SENS_PATH = "results/sensitivity_matrix.csv"
+SENS_GRID_POINTS = 100
+
+
+# ✅ Process-wide resources: built once per server process and shared by all sessions
+# The backend follows $DCF_ENCODER (e.g. "hashing" for the model-free fast mode)
+@st.cache_resource(show_spinner="Loading embedding model...")
+def load_model():
+    return get_encoder().load()
+
+
+# Not a cache_resource: get_matching_universe is memoized on the file's mtime and size,
+# so a refreshed universe file is picked up without restarting the server
+def load_universe(path=PEER_UNIVERSE_CSV):
+    load_model()
+    return get_matching_universe(path)
+
+
+def universe_stamp(path=PEER_UNIVERSE_CSV):
+    """(mtime_ns, size) of the universe file, or None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+# ✅ Pipeline results memoized in memory per parameter set (no shared results file)
+@st.cache_data(show_spinner="Running valuation...", max_entries=256)
+def run_valuation(ticker, description, revenue, ebitda_margin, wacc=0.10, terminal_growth=0.03,
+                  dcf_weight=0.5, top_n_peers=5, min_similarity=0.0, multiple_type="ev_ebitda",
+                  desc_weight=0.85, sector=None, universe_version=None):
+    # universe_version (see universe_stamp) is only part of the cache key, so a
+    # refreshed universe file is not answered from results of the old one
+    options = dict(
+        wacc=wacc,
+        terminal_growth=terminal_growth,
+        dcf_weight=dcf_weight,
+        top_n_peers=top_n_peers,
+        min_similarity=min_similarity,
+        multiple_type=multiple_type,
+        fallback_description=description,
+        fallback_revenue=revenue / 1e6 if revenue else None,
+        fallback_ebitda_margin=ebitda_margin,
+        desc_weight=desc_weight,
+        peer_filters={"sector": sector} if sector else None
+    )
+    # ✅ With $DCF_SERVICE_URL set, a running valuation service (model and universe warm) does the work
+    if service_url():
+        run_result = ValuationClient().pipeline(ticker, **options)
+    else:
+        run_result = run_peer_match_pipeline(company_name=ticker, verbose=False, peer_universe=load_universe(),
+                                             **options)
+    if run_result:
+        run_result["ticker"] = ticker
+    return run_result
+
 
 # ✅ UI setup
 st.set_page_config(page_title="AI-Powered DCF & Peer Valuation", layout="wide")
@@ -28,21 +88,19 @@ st.title("📊 AI-Powered DCF & Peer Valuation Dashboard")
 st.sidebar.header("🔧 Controls")
 st.sidebar.markdown("Adjust inputs below or rerun the backend to refresh results.")
 ticker_input = st.sidebar.text_input("🔎 Lookup by Ticker (e.g. AAPL)", value="").upper()
+# Weighting is applied at query time over stored embeddings, so changing it never re-encodes
+desc_weight = st.sidebar.slider("Description Weight", 0.0, 1.0, 0.85, step=0.05)
+same_sector = st.sidebar.checkbox("Same-sector peers only", value=False)
 
-# ✅ Clear stale results if no ticker is typed
-if not ticker_input:
-    result = {}
-elif os.path.exists(RESULTS_PATH):
-    with open(RESULTS_PATH, "r") as f:
-        result = json.load(f)
-else:
-    result = {}
+# ✅ Results live in this session only; cleared when the ticker changes or is removed
+if st.session_state.get("result", {}).get("ticker") != ticker_input:
+    st.session_state.pop("result", None)
 
 # ✅ Show company info
+info = {}
 if ticker_input:
     try:
-        ticker = yf.Ticker(ticker_input)
-        info = ticker.info
+        info = get_ticker_info(ticker_input)
         st.sidebar.markdown(f"**Company:** {info.get('shortName', 'N/A')}")
         st.sidebar.markdown(f"**Sector:** {info.get('sector', 'N/A')}")
         st.sidebar.markdown(f"**Industry:** {info.get('industry', 'N/A')}")
@@ -50,11 +108,9 @@ if ticker_input:
     except Exception as e:
         st.sidebar.error(f"Failed to fetch info for {ticker_input}: {e}")
 
-# ✅ Run pipeline if new ticker
-if ticker_input:
+# ✅ Run pipeline (a cache hit unless the ticker or parameters changed)
+if ticker_input and info:
     try:
-        ticker_obj = yf.Ticker(ticker_input)
-        info = ticker_obj.info
         short_name = info.get("shortName", ticker_input)
         description = info.get("longBusinessSummary", "")
         revenue = info.get("totalRevenue")
@@ -63,41 +119,21 @@ if ticker_input:
         if short_name and description and revenue and ebitda_margin:
             st.sidebar.success(f"Running valuation for {short_name}...")
 
-            # Only run if not already saved
-            if result.get("ticker") != ticker_input:
-                run_result = run_peer_match_pipeline(
-                    company_name=ticker_input,
-                    wacc=0.10,
-                    terminal_growth=0.03,
-                    dcf_weight=0.5,
-                    top_n_peers=5,
-                    min_similarity=0.0,
-                    verbose=False,
-                    multiple_type="ev_ebitda",
-                    fallback_description=description,
-                    fallback_revenue=revenue / 1e6 if revenue else None,
-                    fallback_ebitda_margin=ebitda_margin
-                )
-                if run_result:
-                    run_result["ticker"] = ticker_input  # ✅ Save for comparison
-                    print("🪵 Keys in run_result:", run_result.keys())
-                    print("🪵 Terminal Value Info Preview:",
-                          run_result.get("terminal_value_info"))
-
-                    with open(RESULTS_PATH, "w") as f:
-                        print("🪵 Keys in run_result:", run_result.keys())
-                        print("🪵 Terminal Value Info Preview:",
-                              run_result.get("terminal_value_info"))
-
-                        json.dump(run_result, f, indent=2)
-                    st.rerun()
-                else:
-                    st.sidebar.error("❌ Pipeline failed to produce results.")
+            run_result = run_valuation(ticker_input, description, revenue, ebitda_margin,
+                                       desc_weight=desc_weight,
+                                       sector=info.get("sector") if same_sector else None,
+                                       universe_version=universe_stamp())
+            if run_result:
+                st.session_state["result"] = run_result
+            else:
+                st.sidebar.error("❌ Pipeline failed to produce results.")
         else:
             st.sidebar.warning("⚠️ Missing data for this ticker. Try another.")
     except Exception as e:
         st.sidebar.error(f"Pipeline failed: {e}")
 
+result = st.session_state.get("result", {})
+
 # ✅ Load results for display
 company_name = result.get("company_name", "N/A")
 dcf_value = result.get("dcf_value", 0)
@@ -139,10 +175,24 @@ else:
 
 # Sensitivity Heatmap
 st.subheader("🔥 DCF Sensitivity Heatmap (WACC ↓ vs TGR →)")
-if os.path.exists(SENS_PATH):
+if result.get("fcfs"):
+    sensitivity = run_sensitivity_analysis(
+        result["fcfs"],
+        wacc_range=wacc_range,
+        terminal_growth_range=tgr_range,
+        num_points=SENS_GRID_POINTS
+    )
+    sens_df = sensitivity_to_frame(sensitivity)
+elif os.path.exists(SENS_PATH):
     sens_df = pd.read_csv(SENS_PATH, index_col=0)
+else:
+    sens_df = None
+
+if sens_df is not None:
     fig, ax = plt.subplots(figsize=(10, 6))
-    sns.heatmap(sens_df, annot=True, fmt=".0f", cmap="YlGnBu", ax=ax)
+    small_grid = sens_df.size <= 100
+    sns.heatmap(sens_df, annot=small_grid, fmt=".0f", cmap="YlGnBu", ax=ax,
+                xticklabels=small_grid or 10, yticklabels=small_grid or 10)
     st.pyplot(fig)
 else:
     st.warning("No sensitivity_matrix.csv found. Run with --wacc_range and --terminal_growth_range.")
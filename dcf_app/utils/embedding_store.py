@@ -0,0 +1,247 @@
+import os
+import re
+import json
+import threading
+import numpy as np
+from dcf_app.services.nlp_service import get_encoder, MODEL_NAME
+
+VECTOR_CACHE_DIR = "vector_cache"
+DESCRIPTION_STORE_NAME = "descriptions"
+
+
+def normalize_key(key) -> str:
+    """Lookup keys are case- and whitespace-insensitive."""
+    return str(key).strip().lower()
+
+
+def company_keys(company: dict) -> list[str]:
+    """Name and ticker aliases under which a company's row is indexed."""
+    keys = []
+    for field in ("ticker", "name"):
+        value = company.get(field)
+        if isinstance(value, str) and value.strip():
+            keys.append(normalize_key(value))
+    return keys
+
+
+class EmbeddingStore:
+    """
+    Consolidated embedding store: one float32 matrix file opened with np.memmap
+    plus a JSON index mapping name/ticker keys to matrix rows.
+
+    New vectors are appended to the end of the matrix file. Rows of companies
+    whose inputs changed are overwritten in place (see upsert_companies); the
+    index keeps a fingerprint of the inputs each row was computed from.
+    """
+
+    def __init__(self, directory: str = VECTOR_CACHE_DIR, name: str = DESCRIPTION_STORE_NAME):
+        self.directory = directory
+        self.matrix_path = os.path.join(directory, f"{name}.f32")
+        self.index_path = os.path.join(directory, f"{name}.index.json")
+        self._lock = threading.RLock()
+        self._matrix = None
+        self.dim = None
+        self.rows = 0
+        self.keys = {}
+        self.fingerprints = {}
+        self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "r") as f:
+            index = json.load(f)
+        self.dim = index.get("dim")
+        self.rows = index.get("rows", 0)
+        self.keys = index.get("keys", {})
+        self.fingerprints = index.get("fingerprints", {})
+
+        # Drop rows written by an append that crashed before its index update
+        if self.dim and os.path.exists(self.matrix_path):
+            expected = self.rows * self.dim * 4
+            if os.path.getsize(self.matrix_path) > expected:
+                with open(self.matrix_path, "r+b") as f:
+                    f.truncate(expected)
+
+    def _save_index(self):
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"dim": self.dim, "rows": self.rows, "keys": self.keys,
+                       "fingerprints": self.fingerprints}, f)
+        os.replace(tmp_path, self.index_path)
+
+    def __len__(self):
+        return self.rows
+
+    def __contains__(self, key):
+        return normalize_key(key) in self.keys
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Read-only (rows x dim) memmap over the whole store."""
+        with self._lock:
+            if self._matrix is None:
+                if self.rows == 0:
+                    return np.empty((0, self.dim or 0), dtype=np.float32)
+                self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r",
+                                         shape=(self.rows, self.dim))
+            return self._matrix
+
+    def row_for(self, key) -> int:
+        return self.keys.get(normalize_key(key), -1)
+
+    def rows_for(self, keys) -> np.ndarray:
+        """Row index per key, -1 where the key is not stored."""
+        return np.fromiter((self.row_for(k) for k in keys), dtype=np.int64)
+
+    def get(self, key):
+        """Zero-copy view of the stored vector for key, or None."""
+        row = self.row_for(key)
+        return None if row < 0 else self.matrix[row]
+
+    def get_company(self, company: dict):
+        """Stored vector for a company looked up by ticker, then name."""
+        row = self.row_for_company(company)
+        return None if row < 0 else self.matrix[row]
+
+    def append(self, vectors, keys_per_row: list[list[str]]) -> list[int]:
+        """
+        Appends vectors to the matrix file and indexes each under its keys.
+
+        Args:
+            vectors: Sequence of 1-D vectors (or a 2-D array)
+            keys_per_row (list[list[str]]): Aliases to index each new row under
+
+        Returns:
+            list[int]: Row index assigned to each vector
+        """
+        block = np.asarray(vectors, dtype=np.float32)
+        if block.size == 0:
+            return []
+        if block.ndim == 1:
+            block = block[None, :]
+        if len(keys_per_row) != block.shape[0]:
+            raise ValueError("Need one key list per appended vector.")
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(block.shape[1])
+            elif block.shape[1] != self.dim:
+                raise ValueError(f"Vector dimension {block.shape[1]} does not match store dimension {self.dim}.")
+
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.matrix_path, "ab") as f:
+                f.write(np.ascontiguousarray(block, dtype="<f4").tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            new_rows = list(range(self.rows, self.rows + block.shape[0]))
+            for row, keys in zip(new_rows, keys_per_row):
+                for key in keys:
+                    self.keys[normalize_key(key)] = row
+            self.rows += block.shape[0]
+            self._save_index()
+            self._matrix = None  # Re-map on next access to pick up the new rows
+
+        return new_rows
+
+    def append_companies(self, companies: list[dict], vectors) -> list[int]:
+        """Appends one vector per company, indexed by its ticker and name."""
+        return self.append(vectors, [company_keys(c) for c in companies])
+
+    def row_for_company(self, company: dict) -> int:
+        for key in company_keys(company):
+            row = self.keys.get(key, -1)
+            if row >= 0:
+                return row
+        return -1
+
+    def fingerprint_for(self, company: dict):
+        """Fingerprint stored with a company's row, or None."""
+        row = self.row_for_company(company)
+        return self.fingerprints.get(str(row)) if row >= 0 else None
+
+    def update_rows(self, rows, vectors):
+        """
+        Overwrites existing rows of the matrix file in place.
+        Open memmap views see the new values.
+        """
+        block = np.asarray(vectors, dtype=np.float32).reshape(len(rows), -1)
+        with self._lock:
+            if block.shape[0] and block.shape[1] != self.dim:
+                raise ValueError(f"Vector dimension {block.shape[1]} does not match store dimension {self.dim}.")
+            with open(self.matrix_path, "r+b") as f:
+                for row, vector in zip(rows, block):
+                    if not 0 <= row < self.rows:
+                        raise IndexError(f"Row {row} is not in the store.")
+                    f.seek(row * self.dim * 4)
+                    f.write(np.ascontiguousarray(vector, dtype="<f4").tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+    def upsert_companies(self, companies: list[dict], vectors, fingerprints: list[str] = None) -> list[int]:
+        """
+        Stores one vector per company: rows of known companies are overwritten
+        in place, unknown companies are appended. Fingerprints are recorded
+        only after the vectors are on disk, so an interrupted update is redone
+        on the next refresh.
+
+        Returns:
+            list[int]: Row of each company
+        """
+        fingerprints = fingerprints or [None] * len(companies)
+        with self._lock:
+            rows = [self.row_for_company(c) for c in companies]
+            existing = [i for i, row in enumerate(rows) if row >= 0]
+            new = [i for i, row in enumerate(rows) if row < 0]
+
+            if existing:
+                self.update_rows([rows[i] for i in existing], [vectors[i] for i in existing])
+                # Keep every alias (e.g. a renamed company) pointing at the row
+                for i in existing:
+                    for key in company_keys(companies[i]):
+                        self.keys[key] = rows[i]
+            if new:
+                for i, row in zip(new, self.append_companies([companies[i] for i in new], [vectors[i] for i in new])):
+                    rows[i] = row
+
+            for row, fingerprint in zip(rows, fingerprints):
+                if fingerprint is not None:
+                    self.fingerprints[str(row)] = fingerprint
+            self._save_index()
+        return rows
+
+    def set_fingerprints(self, companies: list[dict], fingerprints: list[str]):
+        """Records fingerprints for companies whose stored rows are already current."""
+        with self._lock:
+            for company, fingerprint in zip(companies, fingerprints):
+                row = self.row_for_company(company)
+                if row >= 0:
+                    self.fingerprints[str(row)] = fingerprint
+            self._save_index()
+
+
+_stores = {}
+_store_lock = threading.Lock()
+
+
+def get_embedding_store(name: str) -> EmbeddingStore:
+    """Process-wide store over VECTOR_CACHE_DIR, one per store name."""
+    with _store_lock:
+        if name not in _stores:
+            _stores[name] = EmbeddingStore(name=name)
+        return _stores[name]
+
+
+def get_description_store() -> EmbeddingStore:
+    """
+    Process-wide store of raw description embeddings (see
+    attach_description_vectors). Each encoder other than the default
+    sentence-transformer gets its own store, so switching backends never
+    overwrites the other's rows.
+    """
+    model_id = get_encoder().model_id
+    if model_id == MODEL_NAME:
+        return get_embedding_store(DESCRIPTION_STORE_NAME)
+    return get_embedding_store(f"{DESCRIPTION_STORE_NAME}_{re.sub(r'[^a-z0-9]+', '_', model_id.lower())}")
+
@@ -1,56 +1,80 @@
 import os
 import json
-import yfinance as yf
-from sentence_transformers import SentenceTransformer
+import hashlib
+import logging
 import numpy as np
 import pandas as pd
-from dcf_app.utils.vector_cache import get_cached_vector, set_cached_vector
+from dcf_app.utils.vector_cache import get_cached_vector, set_cached_vector, save_vector_cache
 from dcf_app.utils.helpers import validate_vector
+from dcf_app.services.nlp_service import get_encoder
+from dcf_app.utils.yf_cache import get_ticker_info
+from dcf_app.utils.universe_store import load_universe_records
+from dcf_app.utils.profiling import span, count
 PEER_UNIVERSE_CSV = os.path.join(os.path.dirname(__file__), "..", "data", "peer_universe.csv")
 
+NUMERIC_KEYS = ["revenue_growth", "ebitda_margin", "capex_pct"]
+# Bump whenever the way description embeddings are built changes, so old cache entries are never reused
+VECTOR_FEATURE_VERSION = 2
 
+# Per-company messages go through logging (debug level) rather than print, so they cost nothing on the hot path
+logger = logging.getLogger(__name__)
 
 
-# Load model once at module level
-model = SentenceTransformer('all-MiniLM-L6-v2')
+def description_vector_key(company: dict, model_id: str = None) -> str:
+    """
+    Content-addressed cache key for a company's raw description embedding.
 
-
-def create_company_vector(company: dict, use_numerics: bool = True, desc_weight: float = 0.85) -> np.ndarray:
+    The key hashes the description text, the embedding model (default: the
+    active encoder's model_id, see get_encoder) and the feature version.
+    desc_weight and the numerics are applied after the lookup, so changing
+    them never needs a new embedding, while a changed description or model
+    is a miss rather than a stale hit.
+    """
     name = company.get("name", "").strip()
-
-    cached = get_cached_vector(name)
-    if cached and validate_vector(cached):
-        print(f"🧠 Loaded cached vector for: {name}")
-        return np.array(cached)
-
-    print(f"⚙️ Computing new vector for: {name}")
     description = company.get("description", name)
+    payload = {
+        "version": VECTOR_FEATURE_VERSION,
+        "model": model_id or get_encoder().model_id,
+        "description": hashlib.sha256(str(description).encode("utf-8")).hexdigest(),
+    }
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"v{VECTOR_FEATURE_VERSION}:{digest}"
+
+
+def numeric_features(company: dict):
+    """
+    Z-scored numeric features (NUMERIC_KEYS) of one company, or None if any is missing.
+    """
+    name = company.get("name", "").strip()
     try:
-        desc_vector = model.encode(description)
+        numerics = np.array([float(company.get(k, 0.0)) for k in NUMERIC_KEYS], dtype=np.float32)
+
+        if np.any(np.isnan(numerics)):
+            logger.debug("Skipping %s due to NaNs in numeric inputs: %s", name, numerics)
+            return None
+
+        # Normalize numerics (z-score)
+        return (numerics - numerics.mean()) / (numerics.std() + 1e-6)
     except Exception as e:
-        print(f"❌ Failed to encode description for {name}: {e}")
+        logger.warning("Error processing numerics for %s: %s", name, e)
         return None
 
+
+def _combine_vector(company: dict, desc_vector, use_numerics: bool = True, desc_weight: float = 0.85):
+    """
+    Weights a description embedding and appends the z-scored numerics.
+    Returns None if the result is not a valid vector.
+    """
+    name = company.get("name", "").strip()
+
     if not use_numerics:
         if validate_vector(desc_vector):
-            set_cached_vector(name, desc_vector.tolist())
             return np.array(desc_vector)
-        else:
-            print(f"❌ Invalid description-only vector for {name}")
-            return None
-
-    numeric_keys = ["revenue_growth", "ebitda_margin", "capex_pct"]
-    try:
-        numerics = np.array([float(company.get(k, 0.0)) for k in numeric_keys], dtype=np.float32)
-
-        if np.any(np.isnan(numerics)):
-            print(f"⚠️ Skipping {name} due to NaNs in numeric inputs: {numerics}")
-            return None
+        logger.warning("Invalid description-only vector for %s", name)
+        return None
 
-        # Normalize numerics (z-score)
-        numerics = (numerics - numerics.mean()) / (numerics.std() + 1e-6)
-    except Exception as e:
-        print(f"❌ Error processing numerics for {name}: {e}")
+    numerics = numeric_features(company)
+    if numerics is None:
         return None
 
     try:
@@ -61,15 +85,155 @@ def create_company_vector(company: dict, use_numerics: bool = True, desc_weight:
 
         combined = np.concatenate([scaled_desc, scaled_num])
         if not validate_vector(combined):
-            print(f"❌ Combined vector is invalid for {name}")
+            logger.warning("Combined vector is invalid for %s", name)
             return None
 
-        set_cached_vector(name, combined.tolist())
-        return np.array(combined)
+        return combined
+
+    except Exception as e:
+        logger.warning("Vector combination error for %s: %s", name, e)
+        return None
+
 
+def create_description_vector(company: dict):
+    """Raw description embedding of one company (cached), or None."""
+    name = company.get("name", "").strip()
+    key = description_vector_key(company)
+
+    cached = get_cached_vector(key)
+    if cached is not None and validate_vector(cached):
+        count("vector_cache_hits")
+        logger.debug("Loaded cached vector for: %s", name)
+        return np.array(cached)
+
+    count("vector_cache_misses")
+    logger.debug("Computing new vector for: %s", name)
+    description = company.get("description", name)
+    try:
+        with span("encode"):
+            desc_vector = get_encoder().encode([description])[0]
+        count("encoded")
     except Exception as e:
-        print(f"❌ Vector combination error for {name}: {e}")
+        logger.error("Failed to encode description for %s: %s", name, e)
+        return None
+
+    if not validate_vector(desc_vector):
+        return None
+    set_cached_vector(key, desc_vector.tolist())
+    return desc_vector
+
+
+def create_company_vector(company: dict, use_numerics: bool = True, desc_weight: float = 0.85) -> np.ndarray:
+    desc_vector = create_description_vector(company)
+    if desc_vector is None:
         return None
+    return _combine_vector(company, desc_vector, use_numerics=use_numerics, desc_weight=desc_weight)
+
+
+def encode_descriptions(descriptions: list[str], batch_size: int = 64) -> np.ndarray:
+    """
+    Encodes many descriptions in batched calls to the active encoder.
+
+    Duplicate texts are encoded once and texts are sorted by length so each
+    batch pads to a similar size; rows come back in the input order.
+
+    Args:
+        descriptions (list[str]): Texts to encode
+        batch_size (int): Number of texts per model call
+
+    Returns:
+        np.ndarray: (len(descriptions) x dim) float32 embeddings
+    """
+    unique = list(dict.fromkeys(descriptions))
+    if not unique:
+        return np.empty((0, 0), dtype=np.float32)
+
+    encoder = get_encoder()
+    by_length = sorted(range(len(unique)), key=lambda i: len(unique[i]))
+    embeddings = None
+    with span("encode"):
+        for start in range(0, len(by_length), batch_size):
+            rows = by_length[start:start + batch_size]
+            batch = encoder.encode([unique[i] for i in rows], batch_size=batch_size)
+            batch = np.asarray(batch, dtype=np.float32)
+            if embeddings is None:
+                embeddings = np.empty((len(unique), batch.shape[1]), dtype=np.float32)
+            embeddings[rows] = batch
+    count("encoded", len(unique))
+
+    position = {text: i for i, text in enumerate(unique)}
+    return embeddings[[position[text] for text in descriptions]]
+
+
+def create_description_vectors(companies: list[dict], batch_size: int = 64) -> list:
+    """
+    Raw description embeddings for many companies.
+
+    Cached embeddings (keyed by description_vector_key) are reused; the
+    remaining descriptions are encoded in one batched pass and written to the
+    cache together.
+
+    Returns:
+        list: One float32 embedding (or None) per company, in input order
+    """
+    vectors = [None] * len(companies)
+    keys = [description_vector_key(c) for c in companies]
+    pending = []
+    for i, company in enumerate(companies):
+        name = company.get("name", "").strip()
+        cached = get_cached_vector(keys[i])
+        if cached is not None and validate_vector(cached):
+            vectors[i] = np.array(cached)
+            continue
+
+        description = company.get("description", name)
+        if isinstance(description, str):
+            pending.append((i, description))
+        else:
+            logger.warning("Failed to encode description for %s: not text", name)
+
+    count("vector_cache_hits", len(companies) - len(pending))
+    count("vector_cache_misses", len(pending))
+    if not pending:
+        return vectors
+
+    print(f"⚙️ Encoding {len(pending)} descriptions in batches of {batch_size}")
+    try:
+        embeddings = encode_descriptions([d for _, d in pending], batch_size=batch_size)
+    except Exception as e:
+        print(f"❌ Failed to encode descriptions: {e}")
+        return vectors
+
+    new_entries = {}
+    for (i, _), desc_vector in zip(pending, embeddings):
+        if validate_vector(desc_vector):
+            vectors[i] = desc_vector
+            new_entries[keys[i]] = desc_vector
+
+    if new_entries:
+        save_vector_cache(new_entries)
+        print(f"💾 Cached {len(new_entries)} new vectors")
+
+    return vectors
+
+
+def create_company_vectors(companies: list[dict], use_numerics: bool = True,
+                           desc_weight: float = 0.85, batch_size: int = 64) -> list:
+    """
+    Batch variant of create_company_vector: description embeddings come from
+    create_description_vectors, then desc_weight and the numerics are applied.
+    A new desc_weight therefore costs no encoding.
+
+    Returns:
+        list: One vector (or None) per company, in input order
+    """
+    desc_vectors = create_description_vectors(companies, batch_size=batch_size)
+    return [
+        None if desc_vector is None
+        else _combine_vector(company, desc_vector, use_numerics=use_numerics, desc_weight=desc_weight)
+        for company, desc_vector in zip(companies, desc_vectors)
+    ]
+
 
 def load_financial_metrics() -> dict:
     path = "data/company_metrics.csv"
@@ -81,8 +245,8 @@ def load_financial_metrics() -> dict:
 
 def try_yfinance_scrape(ticker: str) -> dict:
     try:
-        yf_ticker = yf.Ticker(ticker)
-        info = yf_ticker.info
+        with span("fetch_target"):
+            info = get_ticker_info(ticker)
         print(f"🌐 Pulled data from yfinance for {ticker}")
 
         return {
@@ -106,39 +270,63 @@ def load_company_data(company_name, fallback_description=None, fallback_revenue=
     if not os.path.exists(PEER_UNIVERSE_CSV):
         raise FileNotFoundError(f"Missing file: {PEER_UNIVERSE_CSV}")
 
-    df = pd.read_csv(PEER_UNIVERSE_CSV)
-    peers = df.to_dict(orient="records")
+    peers = load_peer_universe(PEER_UNIVERSE_CSV)
 
     # Try to find target in static universe
     target = next((p for p in peers if p.get("name", "").strip().lower() == company_name.strip().lower()), None)
 
-    # If not found, try using yfinance
     if not target:
-        try:
-            ticker = yf.Ticker(company_name)
-            info = ticker.info
-            description = info.get("longBusinessSummary", "")
-            revenue = info.get("totalRevenue", fallback_revenue)
-            margin = info.get("ebitdaMargins", fallback_ebitda_margin)
-
-            if description and revenue and margin:
-                target = {
-                    "name": company_name,
-                    "description": description,
-                    "revenue_base": revenue,
-                    "ebitda_margin": margin,
-                    "revenue_growth": 0.08,
-                    "capex_pct": 0.04,
-                    "nwc_pct": 0.03,
-                    "depreciation_pct": 0.05,
-                    "tax_rate": 0.21,
-                    "ev_ebitda": 16.0,
-                    "pe_ratio": 22.0
-                }
-                peers.append(target)
-                print(f"✅ Pulled fallback target data from yfinance for {company_name}")
-        except Exception as e:
-            print(f"❌ yfinance failed: {e}")
+        target = load_fallback_target(company_name, fallback_description, fallback_revenue, fallback_ebitda_margin)
+        if target:
+            peers.append(target)
+
+    # Compute target vector if description exists
+    if target and "vector" not in target and "description" in target:
+        with span("encode"):
+            target["vector"] = get_encoder().encode([target["description"]])[0]
+        count("encoded")
+
+    print(f"🔍 Loading peer universe from: {PEER_UNIVERSE_CSV}")
+
+    return target["vector"], peers
+
+
+def load_fallback_target(company_name, fallback_description=None, fallback_revenue=None, fallback_ebitda_margin=None):
+    """
+    Builds a target that is not in the universe: from yfinance first, then
+    from the manually provided fallback fields. Returns None if neither works.
+    """
+    with span("fetch_target"):
+        return _load_fallback_target(company_name, fallback_description, fallback_revenue, fallback_ebitda_margin)
+
+
+def _load_fallback_target(company_name, fallback_description, fallback_revenue, fallback_ebitda_margin):
+    target = None
+
+    # Try using yfinance
+    try:
+        info = get_ticker_info(company_name)
+        description = info.get("longBusinessSummary", "")
+        revenue = info.get("totalRevenue", fallback_revenue)
+        margin = info.get("ebitdaMargins", fallback_ebitda_margin)
+
+        if description and revenue and margin:
+            target = {
+                "name": company_name,
+                "description": description,
+                "revenue_base": revenue,
+                "ebitda_margin": margin,
+                "revenue_growth": 0.08,
+                "capex_pct": 0.04,
+                "nwc_pct": 0.03,
+                "depreciation_pct": 0.05,
+                "tax_rate": 0.21,
+                "ev_ebitda": 16.0,
+                "pe_ratio": 22.0
+            }
+            print(f"✅ Pulled fallback target data from yfinance for {company_name}")
+    except Exception as e:
+        print(f"❌ yfinance failed: {e}")
 
     # If still not found, use manual fallback
     if not target and fallback_description and fallback_revenue and fallback_ebitda_margin:
@@ -155,20 +343,17 @@ def load_company_data(company_name, fallback_description=None, fallback_revenue=
             "ev_ebitda": 16.0,
             "pe_ratio": 22.0
         }
-        peers.append(target)
         print(f"✅ Using manually provided fallback data for {company_name}")
 
-    # Compute target vector if description exists
-    if target and "vector" not in target and "description" in target:
-        target["vector"] = model.encode(target["description"])
+    return target
 
-    print(f"🔍 Loading peer universe from: {PEER_UNIVERSE_CSV}")
-
-    return target["vector"], peers
 
 
 
-
-def load_peer_universe(path="data/peer_universe.csv"):
-    df = pd.read_csv(path)
-    return df.to_dict(orient="records")
+def load_peer_universe(path="data/peer_universe.csv", columns=None):
+    """
+    Universe rows as dicts, read through the memoized CSV/Parquet loader.
+    Pass columns (e.g. KEY_COLUMNS + NUMERIC_COLUMNS) to skip descriptions.
+    """
+    with span("load_universe"):
+        return load_universe_records(path, columns=columns)
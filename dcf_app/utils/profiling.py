@@ -0,0 +1,123 @@
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# The profile collecting spans and counters for the current run (None = not profiling)
+_current = ContextVar("dcf_profile", default=None)
+
+
+class Profile:
+    """
+    Wall-clock time per named stage plus event counters for one run.
+    Safe to update from several threads (e.g. an executor running stages).
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}    # name -> [seconds, calls]
+        self.counters = {}  # name -> count
+        self._lock = threading.Lock()
+
+    def add_time(self, name: str, seconds: float):
+        with self._lock:
+            stage = self.stages.setdefault(name, [0.0, 0])
+            stage[0] += seconds
+            stage[1] += 1
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self) -> dict:
+        """
+        Returns:
+            dict: "total_seconds", "stages" {name: {"seconds", "calls"}} (slowest
+            first) and "counters" {name: count}; JSON-serializable
+        """
+        with self._lock:
+            stages = sorted(self.stages.items(), key=lambda item: -item[1][0])
+            return {
+                "total_seconds": round(time.perf_counter() - self.started, 6),
+                "stages": {name: {"seconds": round(s, 6), "calls": calls} for name, (s, calls) in stages},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+
+@contextmanager
+def profiled():
+    """
+    Collects spans and counters recorded in this context (and in executor
+    calls made with contextvars.copy_context) into a Profile. Nested use
+    joins the enclosing profile.
+    """
+    profile = _current.get()
+    if profile is not None:
+        yield profile
+        return
+
+    profile = Profile()
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str):
+    """Times the enclosed block as stage name; a no-op when not profiling."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_time(name, time.perf_counter() - start)
+
+
+def count(name: str, n: int = 1):
+    """Adds n to a counter of the current profile (no-op when not profiling)."""
+    profile = _current.get()
+    if profile is not None and n:
+        profile.count(name, n)
+
+
+def format_report(report: dict) -> str:
+    """Profile report as an aligned text table."""
+    lines = [f"⏱️ Total {report['total_seconds'] * 1000:.1f} ms"]
+    for name, stage in report["stages"].items():
+        lines.append(f"   {name:<24} {stage['seconds'] * 1000:>10.1f} ms  ({stage['calls']} calls)")
+    for name, value in report["counters"].items():
+        lines.append(f"   {name:<24} {value:>10}")
+    return "\n".join(lines)
+
+
+def with_timing(fn):
+    """
+    Runs fn (sync or async) under profiled() and adds the report to its
+    result dict as result["timing"].
+    """
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            with profiled() as profile:
+                result = await fn(*args, **kwargs)
+            if isinstance(result, dict):
+                result["timing"] = profile.report()
+            return result
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with profiled() as profile:
+            result = fn(*args, **kwargs)
+        if isinstance(result, dict):
+            result["timing"] = profile.report()
+        return result
+    return wrapper
@@ -0,0 +1,130 @@
+import os
+import sys
+import pandas as pd
+from dcf_app.utils.lru import LRUCache
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; CSV universes still load through pandas
+    pa = None
+
+TEXT_COLUMNS = ["ticker", "name", "description", "sector", "industry"]
+NUMERIC_COLUMNS = [
+    "revenue_base", "revenue_growth", "ebitda_margin", "ev_ebitda", "pe_ratio", "earnings",
+    "capex_pct", "depreciation_pct", "nwc_pct", "tax_rate"
+]
+# Everything except the long description text
+KEY_COLUMNS = ["ticker", "name", "sector", "industry"]
+
+# (path, columns) -> ((mtime_ns, size), DataFrame)
+_frames = LRUCache(maxsize=32)
+
+
+def universe_schema(columns) -> "pa.Schema":
+    """Typed Arrow schema for the given universe columns (unknown columns are strings)."""
+    return pa.schema([
+        (c, pa.float64() if c in NUMERIC_COLUMNS else pa.string())
+        for c in columns
+    ])
+
+
+def resolve_universe_path(path: str) -> str:
+    """
+    Prefers a sibling .parquet over a .csv universe when it is at least as new,
+    so converting once switches every loader over.
+    """
+    root, ext = os.path.splitext(path)
+    if ext.lower() == ".csv" and pa is not None:
+        parquet_path = root + ".parquet"
+        if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(path):
+            return parquet_path
+    return path
+
+
+def _read(path: str, columns: list[str] = None) -> pd.DataFrame:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        if pa is None:
+            raise ImportError("pyarrow is required to read Parquet universes.")
+        available = pq.read_schema(path).names
+        table = pq.read_table(path, columns=[c for c in columns if c in available] if columns else None)
+        return table.to_pandas()
+
+    if pa is not None:
+        types = {c: pa.float64() if c in NUMERIC_COLUMNS else pa.string() for c in TEXT_COLUMNS + NUMERIC_COLUMNS}
+        convert = pa_csv.ConvertOptions(column_types=types)
+        if columns:
+            header = pd.read_csv(path, nrows=0).columns
+            include = [c for c in columns if c in header]
+            # Arrow reads every column for include_columns=[]
+            if not include:
+                return pd.DataFrame()
+            convert.include_columns = include
+        return pa_csv.read_csv(path, convert_options=convert).to_pandas()
+
+    usecols = (lambda c: c in columns) if columns else None
+    dtypes = {c: "float64" for c in NUMERIC_COLUMNS}
+    return pd.read_csv(path, usecols=usecols, dtype=dtypes)
+
+
+def load_universe_frame(path: str, columns: list[str] = None) -> pd.DataFrame:
+    """
+    Universe as a typed DataFrame, memoized per (path, columns) and reloaded
+    when the file's mtime or size changes.
+
+    Args:
+        path (str): .csv or .parquet universe (a newer sibling .parquet is preferred)
+        columns (list[str]): Only load these columns (e.g. KEY_COLUMNS + NUMERIC_COLUMNS
+            to skip descriptions); columns missing from the file are ignored
+
+    Returns:
+        pd.DataFrame: Shared cached frame; do not modify it in place
+    """
+    path = os.path.abspath(resolve_universe_path(path))
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    key = (path, tuple(columns) if columns else None)
+
+    cached = _frames.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    df = _read(path, list(columns) if columns else None)
+    _frames.put(key, (stamp, df))
+    return df
+
+
+def load_universe_records(path: str, columns: list[str] = None) -> list[dict]:
+    """
+    Universe rows as fresh dicts (callers may attach vectors to them).
+    """
+    return load_universe_frame(path, columns=columns).to_dict(orient="records")
+
+
+def convert_csv_to_parquet(csv_path: str, parquet_path: str = None) -> str:
+    """
+    Writes a typed Parquet copy of a CSV universe next to it.
+
+    Returns:
+        str: Path of the Parquet file
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required to write Parquet universes.")
+    parquet_path = parquet_path or os.path.splitext(csv_path)[0] + ".parquet"
+
+    header = pd.read_csv(csv_path, nrows=0).columns.tolist()
+    schema = universe_schema(header)
+    table = pa_csv.read_csv(
+        csv_path,
+        convert_options=pa_csv.ConvertOptions(column_types={f.name: f.type for f in schema})
+    )
+    pq.write_table(table, parquet_path)
+    print(f"📦 Wrote {table.num_rows} companies → {parquet_path}")
+    return parquet_path
+
+
+if __name__ == "__main__":
+    from dcf_app.utils.loader import PEER_UNIVERSE_CSV
+    convert_csv_to_parquet(sys.argv[1] if len(sys.argv) > 1 else PEER_UNIVERSE_CSV)
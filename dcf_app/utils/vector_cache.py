@@ -1,28 +1,113 @@
-import json
+import logging
 import os
+import sqlite3
+import threading
+import numpy as np
+from dcf_app.utils.lru import LRUCache
+
+CACHE_DB_PATH = "data/vector_cache.sqlite"
+
+logger = logging.getLogger(__name__)
+
+
+class VectorCache:
+    """
+    Vector cache with an in-memory LRU front and a SQLite backend.
+
+    Lookups hit the LRU first and fall back to a primary-key lookup; writes
+    upsert a single row in their own transaction, so the file is never
+    rewritten as a whole and concurrent writers cannot clobber each other.
+    """
+
+    def __init__(self, path: str = CACHE_DB_PATH, maxsize: int = 4096):
+        self.path = path
+        self.memory = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS vectors (key TEXT PRIMARY KEY, dim INTEGER, data BLOB)"
+            )
+
+    def get(self, key):
+        """Return the cached float32 vector for key, or None."""
+        vector = self.memory.get(key)
+        if vector is not None:
+            return vector
+
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM vectors WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        vector = np.frombuffer(row[0], dtype=np.float32)
+        self.memory.put(key, vector)
+        return vector
+
+    def set(self, key, vector):
+        self.set_many({key: vector})
+
+    def set_many(self, items: dict):
+        """Upsert several vectors in one transaction."""
+        rows = []
+        for key, vector in items.items():
+            vector = np.array(vector, dtype=np.float32)
+            vector.flags.writeable = False
+            rows.append((key, vector.shape[0], vector.tobytes()))
+            self.memory.put(key, vector)
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vectors (key, dim, data) VALUES (?, ?, ?)", rows
+            )
+
+    def items(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT key, data FROM vectors").fetchall()
+        return [(key, np.frombuffer(data, dtype=np.float32)) for key, data in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_vector_cache() -> VectorCache:
+    """Process-wide cache over CACHE_DB_PATH."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = VectorCache(CACHE_DB_PATH)
+        return _cache
 
-CACHE_PATH = "data/vector_cache.json"
 
 def load_vector_cache():
-    """Load the vector cache JSON file, or return an empty dict if not found."""
-    if not os.path.exists(CACHE_PATH):
-        return {}
-    with open(CACHE_PATH, "r") as f:
-        return json.load(f)
+    """Return every cached vector as a {name: vector} dict."""
+    return dict(get_vector_cache().items())
+
 
 def save_vector_cache(cache):
-    """Save the current cache dictionary to file."""
-    with open(CACHE_PATH, "w") as f:
-        json.dump(cache, f, indent=2)
+    """Upsert every entry of a {name: vector} dict."""
+    get_vector_cache().set_many(cache)
+
 
 def get_cached_vector(company_name):
     """Return vector from cache if available, else None."""
-    cache = load_vector_cache()
-    return cache.get(company_name)
+    return get_vector_cache().get(company_name)
 
-def set_cached_vector(company_name, vector):
-    cache = load_vector_cache()
-    cache[company_name] = vector
-    save_vector_cache(cache)
-    print(f"💾 Cached vector for: {company_name}")
 
+def set_cached_vector(company_name, vector):
+    get_vector_cache().set(company_name, vector)
+    logger.debug("Cached vector for: %s", company_name)
@@ -0,0 +1,223 @@
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+import pandas as pd
+from dcf_app.utils.lru import LRUCache
+
+YF_CACHE_DB_PATH = "data/yf_cache.sqlite"
+
+# Seconds a cached response stays fresh, per data kind
+DEFAULT_TTLS = {
+    "info": 24 * 3600,
+    "quarterly_financials": 7 * 24 * 3600,
+}
+
+
+def _fetch_info(ticker: str) -> dict:
+    import yfinance as yf
+    return yf.Ticker(ticker).info
+
+
+def _fetch_quarterly_financials(ticker: str) -> pd.DataFrame:
+    import yfinance as yf
+    return yf.Ticker(ticker).quarterly_financials
+
+
+DEFAULT_FETCHERS = {
+    "info": _fetch_info,
+    "quarterly_financials": _fetch_quarterly_financials,
+}
+
+
+def _dumps(value) -> str:
+    if isinstance(value, pd.DataFrame):
+        return json.dumps({"frame": value.to_json(orient="split", date_format="iso")})
+    return json.dumps({"value": value}, default=str)
+
+
+def _loads(data: str):
+    payload = json.loads(data)
+    if "frame" in payload:
+        return pd.read_json(io.StringIO(payload["frame"]), orient="split")
+    return payload["value"]
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class YFinanceCache:
+    """
+    Read-through cache for yfinance lookups.
+
+    Responses are kept in an in-memory LRU and in SQLite, each kind with its
+    own TTL. Concurrent misses for the same (kind, ticker) are coalesced: one
+    caller fetches, the others wait for its result. Failed fetches are not cached.
+    """
+
+    def __init__(self, path: str = YF_CACHE_DB_PATH, ttls: dict = None, fetchers: dict = None,
+                 maxsize: int = 1024, clock=time.time):
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.fetchers = {**DEFAULT_FETCHERS, **(fetchers or {})}
+        self.memory = LRUCache(maxsize=maxsize)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "kind TEXT, ticker TEXT, fetched_at REAL, data TEXT, PRIMARY KEY (kind, ticker))"
+            )
+
+    def _fresh(self, kind: str, fetched_at: float) -> bool:
+        return self._clock() - fetched_at < self.ttls[kind]
+
+    def _lookup(self, kind: str, ticker: str):
+        """Return a fresh cached value or None (memory first, then disk)."""
+        key = (kind, ticker)
+        entry = self.memory.get(key)
+        if entry is not None:
+            fetched_at, value = entry
+            if self._fresh(kind, fetched_at):
+                return value
+            self.memory.pop(key)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, data FROM responses WHERE kind = ? AND ticker = ?", (kind, ticker)
+            ).fetchone()
+        if row is None or not self._fresh(kind, row[0]):
+            return None
+
+        value = _loads(row[1])
+        self.memory.put(key, (row[0], value))
+        return value
+
+    def _store(self, kind: str, ticker: str, value):
+        fetched_at = self._clock()
+        self.memory.put((kind, ticker), (fetched_at, value))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (kind, ticker, fetched_at, data) VALUES (?, ?, ?, ?)",
+                (kind, ticker, fetched_at, _dumps(value))
+            )
+
+    def get(self, kind: str, ticker: str):
+        """
+        Cached response of one kind for a ticker, fetching it on a miss.
+
+        Args:
+            kind (str): "info" or "quarterly_financials" (or any kind with a fetcher)
+            ticker (str): Ticker symbol (case-insensitive)
+
+        Returns:
+            The fetched value (dict for info, DataFrame for quarterly financials)
+        """
+        ticker = ticker.strip().upper()
+        value = self._lookup(kind, ticker)
+        if value is not None:
+            return value
+
+        key = (kind, ticker)
+        with self._lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _InFlight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            # Another caller may have finished between our lookup and taking the lead
+            value = self._lookup(kind, ticker)
+            if value is None:
+                value = self.fetchers[kind](ticker)
+                self._store(kind, ticker, value)
+            flight.value = value
+            return value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            flight.done.set()
+
+    def invalidate(self, ticker: str, kind: str = None):
+        """Drop cached responses for a ticker (one kind or all)."""
+        ticker = ticker.strip().upper()
+        kinds = [kind] if kind else list(self.ttls)
+        for k in kinds:
+            self.memory.pop((k, ticker))
+        with self._lock, self._conn:
+            if kind:
+                self._conn.execute("DELETE FROM responses WHERE kind = ? AND ticker = ?", (kind, ticker))
+            else:
+                self._conn.execute("DELETE FROM responses WHERE ticker = ?", (ticker,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedTicker:
+    """
+    Drop-in for the parts of yf.Ticker this app uses (.info, .quarterly_financials),
+    served through the cache.
+    """
+
+    def __init__(self, ticker: str, cache: YFinanceCache = None):
+        self.ticker = ticker
+        self._cache = cache
+
+    @property
+    def cache(self) -> YFinanceCache:
+        return self._cache if self._cache is not None else get_yf_cache()
+
+    @property
+    def info(self) -> dict:
+        return dict(self.cache.get("info", self.ticker))
+
+    @property
+    def quarterly_financials(self) -> pd.DataFrame:
+        return self.cache.get("quarterly_financials", self.ticker).copy()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_yf_cache() -> YFinanceCache:
+    """Process-wide cache over YF_CACHE_DB_PATH."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = YFinanceCache(YF_CACHE_DB_PATH)
+        return _cache
+
+
+def get_ticker_info(ticker: str) -> dict:
+    """Cached yf.Ticker(ticker).info."""
+    return CachedTicker(ticker).info
+
+
+def get_quarterly_financials(ticker: str) -> pd.DataFrame:
+    """Cached yf.Ticker(ticker).quarterly_financials."""
+    return CachedTicker(ticker).quarterly_financials
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from dcf_app.models.ann_index import IVFIndex, evaluate_recall
+from dcf_app.models.peer_matcher import build_peer_index, find_closest_peers
+
+
+def _clustered_matrix(n_clusters=20, per_cluster=50, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim))
+    return np.vstack([c + 0.3 * rng.normal(size=(per_cluster, dim)) for c in centers]).astype(np.float32)
+
+
+def test_full_probe_is_exact():
+    index = IVFIndex(n_lists=10).fit(_clustered_matrix())
+    report = evaluate_recall(index, top_k=10, n_probe=10, n_queries=50)
+    assert report["recall_at_k"] == 1.0
+
+
+def test_partial_probe_keeps_high_recall_with_fewer_candidates():
+    matrix = _clustered_matrix()
+    index = IVFIndex(n_lists=20, n_probe=3).fit(matrix)
+    report = evaluate_recall(index, top_k=5, n_queries=100)
+    assert report["recall_at_k"] >= 0.9
+    assert report["mean_candidates"] < matrix.shape[0] / 2
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    matrix = _clustered_matrix()
+    index = IVFIndex(n_lists=8).fit(matrix)
+    path = str(tmp_path / "ivf.npz")
+    index.save(path)
+
+    loaded = IVFIndex.load(path, matrix)
+    rows, _ = loaded.search(matrix[0], top_k=5)
+    assert rows.tolist() == index.search(matrix[0], top_k=5)[0].tolist()
+
+    with pytest.raises(ValueError):
+        IVFIndex.load(path, matrix[:-1])
+
+
+def test_find_closest_peers_with_index_matches_exact():
+    matrix = _clustered_matrix(n_clusters=5, per_cluster=40, dim=16)
+    peers = [{"name": f"Peer {i}", "vector": v} for i, v in enumerate(matrix)]
+    peer_matrix, index = build_peer_index(peers, n_lists=5)
+
+    exact = find_closest_peers(matrix[0], peers, top_k=5, target_name="Peer 0")
+    approx = find_closest_peers(matrix[0], peers, top_k=5, target_name="Peer 0",
+                                peer_matrix=peer_matrix, index=index, n_probe=5)
+    assert [p["name"] for p, _ in approx] == [p["name"] for p, _ in exact]
+    assert "Peer 0" not in [p["name"] for p, _ in approx]
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from dcf_app.models import peer_matcher
+from dcf_app.services import async_pipeline
+from dcf_app.services.async_pipeline import run_peer_match_pipeline_async
+from dcf_app.services.peer_matcher_service import run_peer_match_pipeline
+
+
+def _fake_attach(companies, **kwargs):
+    rng = np.random.default_rng(1)
+    for company in companies:
+        company["desc_vector"] = rng.normal(size=8).astype(np.float32)
+
+
+def _universe_csv(tmp_path, monkeypatch):
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({
+        "ticker": [f"T{i}" for i in range(10)],
+        "name": [f"Company {i}" for i in range(10)],
+        "description": ["x"] * 10,
+        "sector": ["Technology", "Energy"] * 5,
+        "revenue_base": np.linspace(100, 1000, 10),
+        "revenue_growth": rng.uniform(0, 0.2, 10),
+        "ebitda_margin": rng.uniform(0.1, 0.4, 10),
+        "capex_pct": rng.uniform(0.01, 0.1, 10),
+        "ev_ebitda": np.linspace(5, 20, 10),
+        "pe_ratio": [20.0] * 10,
+    })
+    path = tmp_path / "universe.csv"
+    df.to_csv(path, index=False)
+    monkeypatch.setattr(peer_matcher, "attach_description_vectors", _fake_attach)
+    return str(path)
+
+
+def _after(barrier, fn):
+    """fn that first waits at barrier, i.e. until the barrier's other stages are running too."""
+    def wrapper(*args, **kwargs):
+        barrier.wait()
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def test_async_pipeline_matches_sync_pipeline(tmp_path, monkeypatch):
+    universe = peer_matcher.load_matching_universe(_universe_csv(tmp_path, monkeypatch))
+
+    expected = run_peer_match_pipeline("t3", top_n_peers=4, peer_universe=universe,
+                                       peer_filters={"same_sector": True})
+    result = asyncio.run(run_peer_match_pipeline_async("t3", top_n_peers=4, peer_universe=universe,
+                                                       peer_filters={"same_sector": True}))
+
+    assert result["top_peers"] == expected["top_peers"]
+    assert result["combined_valuation"] == expected["combined_valuation"]
+
+
+def test_async_pipeline_from_universe_path_matches_sync_pipeline(tmp_path, monkeypatch):
+    path = _universe_csv(tmp_path, monkeypatch)
+    loads = []
+    load = peer_matcher.load_matching_universe
+
+    def counting_load(*args, **kwargs):
+        loads.append(args)
+        return load(*args, **kwargs)
+
+    monkeypatch.setattr(peer_matcher, "load_matching_universe", counting_load)
+
+    expected = run_peer_match_pipeline("t3", top_n_peers=4, peer_universe=load(path),
+                                       peer_filters={"same_sector": True})
+    for _ in range(2):
+        # The target's fundamentals come from the projected numeric columns, not the full records
+        result = asyncio.run(run_peer_match_pipeline_async("t3", top_n_peers=4, universe_path=path,
+                                                           peer_filters={"same_sector": True}))
+        assert result["top_peers"] == expected["top_peers"]
+        assert result["fcfs"] == expected["fcfs"]
+        assert result["combined_valuation"] == expected["combined_valuation"]
+    assert len(loads) == 1
+
+
+def test_new_ticker_stages_overlap(tmp_path, monkeypatch):
+    path = _universe_csv(tmp_path, monkeypatch)
+    target = {"name": "NEWCO", "description": "y", "revenue_base": 500.0, "ebitda_margin": 0.25,
+              "revenue_growth": 0.1, "capex_pct": 0.05}
+
+    # Each barrier only opens once all of its stages run at the same time; run
+    # one after another, the first stage times out and breaks it
+    fetch_and_load = threading.Barrier(2, timeout=10)
+    load_dcf_encode = threading.Barrier(3, timeout=10)
+    load = _after(fetch_and_load, _after(load_dcf_encode, peer_matcher.get_matching_universe))
+    monkeypatch.setattr(async_pipeline, "get_matching_universe", load)
+    monkeypatch.setattr(async_pipeline, "load_fallback_target", _after(fetch_and_load, lambda *args: dict(target)))
+    monkeypatch.setattr(async_pipeline, "create_description_vectors",
+                        _after(load_dcf_encode, lambda companies: [np.ones(8, dtype=np.float32)]))
+    monkeypatch.setattr(async_pipeline, "run_target_dcf", _after(load_dcf_encode, async_pipeline.run_target_dcf))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        result = asyncio.run(run_peer_match_pipeline_async("NEWCO", top_n_peers=3, universe_path=path,
+                                                           executor=executor))
+
+    assert result["company_name"] == "NEWCO" and len(result["top_peers"]) == 3
+    assert not fetch_and_load.broken and not load_dcf_encode.broken
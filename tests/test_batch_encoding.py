@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from dcf_app.utils import loader, vector_cache
+
+
+class FakeModel:
+    model_id = "fake-model"
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return np.stack([np.full(4, len(t), dtype=np.float32) for t in texts])
+
+
+@pytest.fixture
+def fake_model(monkeypatch, tmp_path):
+    model = FakeModel()
+    monkeypatch.setattr(loader, "get_encoder", lambda name=None: model)
+    monkeypatch.setattr(vector_cache, "_cache", vector_cache.VectorCache(str(tmp_path / "cache.sqlite")))
+    return model
+
+
+def test_encode_descriptions_dedupes_and_sorts_by_length(fake_model):
+    embeddings = loader.encode_descriptions(["bb", "a", "bb", "cccc", "a"], batch_size=2)
+
+    assert embeddings[:, 0].tolist() == [2, 1, 2, 4, 1]
+    assert fake_model.calls == [["a", "bb"], ["cccc"]]
+
+
+def test_create_company_vectors_reuses_cache(fake_model):
+    companies = [
+        {"name": "A", "description": "alpha", "revenue_growth": 0.1, "ebitda_margin": 0.2, "capex_pct": 0.05},
+        {"name": "B", "description": "beta co", "revenue_growth": 0.2, "ebitda_margin": 0.1, "capex_pct": 0.03},
+        {"name": "C", "description": "gamma", "revenue_growth": float("nan"), "ebitda_margin": 0.1, "capex_pct": 0.0},
+    ]
+    vectors = loader.create_company_vectors(companies, batch_size=8)
+
+    assert [v is not None for v in vectors] == [True, True, False]
+    assert vectors[0].shape == (7,)
+    assert len(fake_model.calls) == 1
+
+    again = loader.create_company_vectors(companies[:2])
+    assert len(fake_model.calls) == 1
+    assert np.allclose(again[1], vectors[1])
+
+
+def test_cache_key_changes_with_description_and_model_only(fake_model):
+    company = {"name": "A", "description": "alpha", "revenue_growth": 0.1, "ebitda_margin": 0.2, "capex_pct": 0.05}
+    base = loader.description_vector_key(company)
+
+    assert loader.description_vector_key(dict(company)) == base
+    assert loader.description_vector_key({**company, "capex_pct": 0.06}) == base
+    assert loader.description_vector_key({**company, "description": "alpha two"}) != base
+    assert loader.description_vector_key(company, model_id="other-model") != base
+
+    # A changed description is a cache miss, not a stale hit
+    loader.create_company_vectors([company])
+    loader.create_company_vectors([{**company, "description": "alpha two"}])
+    assert len(fake_model.calls) == 2
+
+
+def test_new_desc_weight_needs_no_encoding(fake_model):
+    company = {"name": "A", "description": "alpha", "revenue_growth": 0.1, "ebitda_margin": 0.2, "capex_pct": 0.05}
+    heavy = loader.create_company_vectors([company], desc_weight=0.85)[0]
+    light = loader.create_company_vectors([company], desc_weight=0.3)[0]
+
+    assert len(fake_model.calls) == 1
+    assert np.allclose(heavy[:4] / 0.85, light[:4] / 0.3)
+    assert np.allclose(heavy[4:] / 0.15, light[4:] / 0.7)
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+from dcf_app.models.similarity import blocked_top_k, normalize_rows, top_k_indices
+from dcf_app.models.peer_matcher import apply_peer_multiples
+from dcf_app.services import batch_valuation
+
+
+def test_blocked_top_k_matches_per_row_search():
+    rng = np.random.default_rng(0)
+    matrix = normalize_rows(rng.normal(size=(300, 16)))
+    indices, scores = blocked_top_k(matrix, 5, block_size=64)
+
+    for row in (0, 123, 299):
+        scores_row = matrix @ matrix[row]
+        mask = np.ones(300, dtype=bool)
+        mask[row] = False
+        assert indices[row].tolist() == top_k_indices(scores_row, 5, mask=mask).tolist()
+    assert np.all(indices != np.arange(300)[:, None])
+
+
+def test_blocked_top_k_min_similarity_leaves_empty_slots():
+    matrix = normalize_rows(np.array([[1.0, 0.0], [0.9, 0.1], [0.0, 1.0]]))
+    indices, scores = blocked_top_k(matrix, 2, min_similarity=0.5)
+    assert indices[2].tolist() == [-1, -1]
+    assert np.isnan(scores[2]).all()
+
+
+def test_peer_multiples_match_per_company_function():
+    companies = [
+        {"name": "A", "ebitda_margin": 0.2, "revenue_base": 100.0, "ev_ebitda": 10.0},
+        {"name": "B", "ebitda_margin": 0.1, "revenue_base": 50.0, "ev_ebitda": 40.0},
+        {"name": "C", "ebitda_margin": 0.3, "revenue_base": 80.0, "ev_ebitda": 12.0},
+    ]
+    peers = np.array([[1, 2], [0, 2], [1, -1]])
+    batch = batch_valuation.peer_multiple_values(companies, peers)
+
+    for i, row in enumerate(peers):
+        single = apply_peer_multiples(companies[i], [companies[j] for j in row if j >= 0])
+        expected = np.nan if single["implied_value"] is None else single["implied_value"]
+        assert np.isclose(batch["implied_value"][i], expected, equal_nan=True)
+
+
+def test_run_universe_valuation(monkeypatch, tmp_path):
+    rng = np.random.default_rng(1)
+    universe = pd.DataFrame({
+        "ticker": [f"T{i}" for i in range(20)],
+        "name": [f"Company {i}" for i in range(20)],
+        "description": ["x"] * 20,
+        "revenue_base": rng.uniform(100, 1000, 20),
+        "revenue_growth": rng.uniform(0, 0.1, 20),
+        "ebitda_margin": rng.uniform(0.1, 0.3, 20),
+        "ev_ebitda": rng.uniform(5, 20, 20),
+        "pe_ratio": rng.uniform(10, 30, 20),
+    })
+    path = tmp_path / "universe.csv"
+    universe.to_csv(path, index=False)
+
+    def fake_attach(companies, **kwargs):
+        for company in companies:
+            company["vector"] = rng.normal(size=8).astype(np.float32)
+
+    monkeypatch.setattr(batch_valuation, "attach_peer_vectors", fake_attach)
+    table = batch_valuation.run_universe_valuation(str(path), top_n_peers=3)
+
+    assert len(table) == 20
+    assert table["dcf_value"].notna().all()
+    assert table["combined_valuation"].notna().all()
+    assert all(len(p.split("; ")) == 3 for p in table["top_peers"])
+    assert all(name not in peers.split("; ") for name, peers in zip(table["name"], table["top_peers"]))
@@ -0,0 +1,36 @@
+import json
+import numpy as np
+from benchmarks.synthetic_universe import generate_universe, generate_embeddings
+from benchmarks.run_benchmarks import run_benchmarks, compare_runs
+from dcf_app.utils import vector_cache, embedding_store
+
+
+def test_synthetic_universe_is_deterministic():
+    first, second = generate_universe(300, seed=7), generate_universe(300, seed=7)
+
+    assert first.equals(second)
+    assert not first.equals(generate_universe(300, seed=8))
+    assert first["ticker"].is_unique
+    embeddings = generate_embeddings(first, dim=32, seed=7)
+    assert embeddings.shape == (300, 32) and embeddings.dtype == np.float32
+    assert np.array_equal(embeddings, generate_embeddings(second, dim=32, seed=7))
+
+
+def test_run_benchmarks_writes_json_and_compares(tmp_path, monkeypatch):
+    monkeypatch.setenv("DCF_ENCODER", "hashing")
+    monkeypatch.setattr(vector_cache, "_cache", vector_cache.VectorCache(str(tmp_path / "cache.sqlite")))
+    monkeypatch.setattr(embedding_store, "_stores", {})
+    output_dir = tmp_path / "out"
+
+    path = run_benchmarks(sizes=[200], repeat=1, output_dir=str(output_dir), workdir=str(tmp_path))
+    with open(path) as f:
+        report = json.load(f)
+
+    timings = report["sizes"]["200"]
+    assert {"find_closest_peers", "prepare_vectors_warm", "forecast_3_statement", "discounted_cash_flow",
+            "sensitivity_grid", "run_peer_match_pipeline"} <= set(timings)
+    assert all(t["median_ms"] >= 0 for t in timings.values())
+
+    slower = {"sizes": {"200": {name: {**t, "median_ms": t["median_ms"] * 2 + 1} for name, t in timings.items()}}}
+    rows = compare_runs(report, slower)
+    assert rows and all(row["regression"] for row in rows)
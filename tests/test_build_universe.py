@@ -0,0 +1,123 @@
+import json
+import threading
+import pandas as pd
+from dcf_app import build_large_peer_universe as builder
+from dcf_app.utils import yf_cache
+from dcf_app.utils.yf_cache import YFinanceCache
+
+
+def _row(ticker, sector="Technology"):
+    return {
+        "ticker": ticker,
+        "name": f"{ticker} Inc",
+        "description": "Makes things.",
+        "sector": sector,
+        "industry": "Software",
+        "revenue_base": 1e9,
+        "revenue_growth": 0.1,
+        "ebitda_margin": 0.2,
+        "ev_ebitda": 12.0,
+        "pe_ratio": 20.0,
+    }
+
+
+class FakeSource:
+    """Local stand-in for yfinance: records calls, fails the first attempts of some tickers."""
+
+    def __init__(self, flaky=None, broken=None, small=None):
+        self.calls = []
+        self.flaky = dict(flaky or {})
+        self.broken = set(broken or [])
+        self.small = set(small or [])
+        self.lock = threading.Lock()
+
+    def __call__(self, ticker):
+        with self.lock:
+            self.calls.append(ticker)
+            if ticker in self.broken:
+                raise RuntimeError("429 Too Many Requests")
+            if self.flaky.get(ticker, 0) > 0:
+                self.flaky[ticker] -= 1
+                raise RuntimeError("timeout")
+        row = _row(ticker, sector="Energy" if ticker.startswith("E") else "Technology")
+        if ticker in self.small:
+            row["revenue_base"] = 1_000
+        return row
+
+
+def test_build_retries_and_writes_sector_files(tmp_path):
+    source = FakeSource(flaky={"B": 2}, small={"C"})
+    df = builder.build_peer_universe(
+        tickers=["A", "B", "C", "E1"], fetch=source, max_workers=4,
+        requests_per_second=1000, backoff=0, output_dir=str(tmp_path)
+    )
+
+    assert sorted(df["ticker"]) == ["A", "B", "E1"]
+    assert source.calls.count("B") == 3
+    assert len(pd.read_csv(tmp_path / "peer_universe_energy.csv")) == 1
+    assert len(pd.read_csv(tmp_path / "peer_universe_technology.csv")) == 2
+
+
+def test_build_resumes_from_checkpoint(tmp_path):
+    checkpoint = tmp_path / "peer_universe_checkpoint.jsonl"
+    checkpoint.write_text(
+        json.dumps({"ticker": "A", "status": "saved", "row": _row("A")}) + "\n"
+        + json.dumps({"ticker": "B", "status": "error", "row": None}) + "\n"
+        + '{"ticker": "C", "sta'  # torn line from an interrupted run
+    )
+    source = FakeSource(broken={"D"})
+    df = builder.build_peer_universe(
+        tickers=["A", "B", "C", "D"], fetch=source, max_workers=2,
+        requests_per_second=1000, max_retries=1, backoff=0, output_dir=str(tmp_path)
+    )
+
+    assert "A" not in source.calls  # already checkpointed
+    assert sorted(set(source.calls)) == ["B", "C", "D"]
+    assert sorted(df["ticker"]) == ["A", "B", "C"]
+    assert builder.load_checkpoint(str(checkpoint))["D"]["status"] == "error"
+
+
+def test_resume_after_torn_line_keeps_next_record(tmp_path):
+    checkpoint = tmp_path / "peer_universe_checkpoint.jsonl"
+    checkpoint.write_text(
+        json.dumps({"ticker": "A", "status": "saved", "row": _row("A")}) + "\n"
+        + '{"ticker": "B", "sta'  # torn line from an interrupted run
+    )
+    builder.build_peer_universe(
+        tickers=["A", "B"], fetch=FakeSource(), max_workers=1,
+        requests_per_second=1000, backoff=0, output_dir=str(tmp_path)
+    )
+
+    lines = checkpoint.read_text().splitlines()
+    assert lines[1] == '{"ticker": "B", "sta'
+    assert json.loads(lines[2])["ticker"] == "B"
+    assert builder.load_checkpoint(str(checkpoint))["B"]["status"] == "saved"
+
+
+def test_refresh_fetch_bypasses_the_yfinance_cache(tmp_path, monkeypatch):
+    revenue = [1e9]
+    cache = YFinanceCache(str(tmp_path / "yf.sqlite"), fetchers={
+        "info": lambda ticker: {"shortName": ticker, "totalRevenue": revenue[0]},
+        "quarterly_financials": lambda ticker: pd.DataFrame(),
+    })
+    monkeypatch.setattr(yf_cache, "_cache", cache)
+
+    assert builder.fetch_ticker_row("A")["revenue_base"] == 1e9
+    revenue[0] = 2e9
+    assert builder.fetch_ticker_row("A")["revenue_base"] == 1e9  # Still fresh in the cache
+    assert builder.fetch_ticker_row("A", refresh=True)["revenue_base"] == 2e9
+    assert builder.fetch_ticker_row("A")["revenue_base"] == 2e9  # The new response is cached
+
+
+def test_token_bucket_limits_rate():
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    bucket = builder.TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(6):
+        bucket.acquire()
+
+    # Two tokens up front, then one every half second
+    assert abs(now[0] - 2.0) < 1e-9
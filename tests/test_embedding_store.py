@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from dcf_app.utils.embedding_store import EmbeddingStore
+
+
+def test_append_and_lookup_by_name_or_ticker(tmp_path):
+    store = EmbeddingStore(directory=str(tmp_path))
+    companies = [{"name": "Apple Inc.", "ticker": "AAPL"}, {"name": "Microsoft Corp", "ticker": "MSFT"}]
+    vectors = np.arange(8, dtype=np.float32).reshape(2, 4)
+
+    assert store.append_companies(companies, vectors) == [0, 1]
+    assert np.array_equal(store.get("aapl"), vectors[0])
+    assert np.array_equal(store.get(" microsoft corp "), vectors[1])
+    assert store.rows_for(["MSFT", "GOOG"]).tolist() == [1, -1]
+
+    store.append_companies([{"name": "Alphabet", "ticker": "GOOG"}], [np.ones(4)])
+    assert store.matrix.shape == (3, 4)
+
+
+def test_store_reopens_from_disk(tmp_path):
+    EmbeddingStore(directory=str(tmp_path)).append(np.eye(3), [["a"], ["b"], ["c"]])
+
+    reopened = EmbeddingStore(directory=str(tmp_path))
+    assert isinstance(reopened.matrix, np.memmap)
+    assert len(reopened) == 3
+    assert np.array_equal(reopened.get("b"), [0.0, 1.0, 0.0])
+
+
+def test_rejects_dimension_mismatch(tmp_path):
+    store = EmbeddingStore(directory=str(tmp_path))
+    store.append(np.ones((1, 4)), [["a"]])
+    with pytest.raises(ValueError):
+        store.append(np.ones((1, 5)), [["b"]])
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+from dcf_app.models.dcf_model import discounted_cash_flow, discounted_cash_flow_batch
+from dcf_app.models.monte_carlo import simulate_dcf, simulate_universe, StreamingHistogram, _transform
+
+INPUTS = {
+    "revenue_base": 1000.0,
+    "revenue_growth": 0.05,
+    "ebitda_margin": 0.25,
+    "capex_pct": 0.05,
+    "depreciation_pct": 0.04,
+    "nwc_pct": 0.02,
+    "tax_rate": 0.21,
+}
+
+
+def test_batch_dcf_matches_scalar():
+    fcfs = np.array([[100.0, 110.0, 120.0], [50.0, 40.0, 30.0]])
+    values = discounted_cash_flow_batch(fcfs, [0.10, 0.08], [0.03, 0.09])
+
+    assert np.isclose(values[0], discounted_cash_flow(fcfs[0].tolist(), wacc=0.10, terminal_growth=0.03)[0])
+    assert np.isnan(values[1])
+
+
+def test_streaming_quantiles_track_exact_quantiles():
+    rng = np.random.default_rng(0)
+    sample = rng.lognormal(size=200_000)
+    stats = StreamingHistogram(bins=4096)
+    for chunk in np.array_split(sample, 10):
+        stats.update(chunk)
+
+    estimated = stats.quantiles([0.05, 0.5, 0.95])
+    exact = np.quantile(sample, [0.05, 0.5, 0.95])
+    assert np.allclose(list(estimated.values()), exact, rtol=0.01)
+    assert np.isclose(stats.mean, sample.mean()) and np.isclose(stats.std, sample.std())
+
+
+def test_zero_spread_reproduces_point_estimate():
+    fixed = {name: {"dist": "fixed", "value": value} for name, value in
+             [("revenue_growth", 0.05), ("ebitda_margin", 0.25), ("capex_pct", 0.05),
+              ("wacc", 0.10), ("terminal_growth", 0.03)]}
+    summary = simulate_dcf(INPUTS, distributions=fixed, n_paths=1000, chunk_size=300, seed=1)
+
+    from dcf_app.models.dcf_generator import run_dcf_from_inputs
+    point, _ = run_dcf_from_inputs(INPUTS)
+    assert summary["n_valid"] == 1000
+    assert np.isclose(summary["quantiles"][0.5], point, rtol=1e-3)
+
+
+def test_correlated_draws_and_invalid_paths():
+    summary = simulate_dcf(
+        INPUTS,
+        distributions={"wacc": {"dist": "uniform", "low": 0.02, "high": 0.12},
+                       "terminal_growth": {"dist": "fixed", "value": 0.03}},
+        correlation={("revenue_growth", "ebitda_margin"): 0.6},
+        n_paths=50_000, chunk_size=10_000, seed=2
+    )
+    assert summary["n_invalid"] > 0
+    assert summary["n_valid"] + summary["n_invalid"] == 50_000
+    assert sum(summary["histogram"]["counts"]) <= summary["n_valid"]
+
+    z = np.random.default_rng(3).standard_normal(100_000)
+    tri = _transform(z, {"dist": "triangular", "low": 0.0, "mode": 0.2, "high": 1.0})
+    assert tri.min() >= 0.0 and tri.max() <= 1.0
+    assert np.isclose(tri.mean(), 0.4, atol=0.01)
+    assert np.array_equal(_transform(z[:5], {"dist": "triangular", "low": 0.3, "mode": 0.3, "high": 0.3}),
+                          np.full(5, 0.3))
+    with pytest.raises(ValueError, match="low <= mode <= high"):
+        _transform(z, {"dist": "triangular", "low": 0.0, "mode": 2.0, "high": 1.0})
+
+    with pytest.raises(ValueError):
+        simulate_dcf(INPUTS, correlation={("wacc", "terminal_growth"): 1.5}, n_paths=10)
+
+
+def test_simulate_universe():
+    results = simulate_universe([dict(INPUTS, name="A"), dict(INPUTS, name="B", revenue_base=10.0)],
+                                n_paths=5000, seed=0)
+    assert [r["name"] for r in results] == ["A", "B"]
+    assert "histogram" not in results[0]
+    assert results[0]["quantiles"][0.5] > results[1]["quantiles"][0.5]
+
+
+def test_simulate_universe_batches_match_per_company_runs():
+    companies = [dict(INPUTS, name=f"C{i}", revenue_growth=0.02 * i) for i in range(5)]
+    batched = simulate_universe(companies, n_paths=4000, chunk_size=10_000, seed=1)
+    separate = simulate_universe(companies, n_paths=4000, chunk_size=1000, seed=1)  # simulate_dcf per company
+
+    assert [r["name"] for r in batched] == [c["name"] for c in companies]
+    for a, b in zip(batched, separate):
+        assert a["n_paths"] == 4000
+        assert np.isclose(a["mean"], b["mean"], rtol=0.05)
+        assert np.isclose(a["quantiles"][0.5], b["quantiles"][0.5], rtol=0.05)
+
+
+def test_simulate_universe_per_company_runs_draw_independent_paths():
+    companies = [dict(INPUTS, name="A"), dict(INPUTS, name="B")]
+    first = simulate_universe(companies, n_paths=2000, chunk_size=1000, seed=4)
+    again = simulate_universe(companies, n_paths=2000, chunk_size=1000, seed=4)
+
+    assert first[0]["mean"] != first[1]["mean"]
+    assert [r["mean"] for r in first] == [r["mean"] for r in again]
@@ -0,0 +1,57 @@
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dcf_app.services import nlp_service
+
+
+def test_model_is_loaded_once_across_threads(monkeypatch):
+    loads = []
+    gate = threading.Event()
+
+    def fake_load(name):
+        gate.wait(1)
+        loads.append(name)
+        return object()
+
+    monkeypatch.setattr(nlp_service, "_model", None)
+    monkeypatch.setattr(nlp_service, "_load_model", fake_load)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(nlp_service.get_model) for _ in range(8)]
+        gate.set()
+        models = {id(f.result()) for f in futures}
+
+    assert loads == [nlp_service.MODEL_NAME]
+    assert len(models) == 1
+    assert nlp_service.is_model_loaded()
+    assert nlp_service.model_load_seconds() >= 0
+
+
+def test_hashing_encoder_is_deterministic_and_similarity_preserving():
+    encoder = nlp_service.HashingEncoder(dim=256)
+    vectors = encoder.encode([
+        "Cloud software and enterprise data platform",
+        "Enterprise cloud software provider",
+        "Offshore oil and gas drilling contractor",
+        "",
+    ])
+
+    assert vectors.shape == (4, 256) and vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vectors[:3], axis=1), 1.0)
+    assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2]
+    assert not vectors[3].any()
+    assert np.array_equal(nlp_service.HashingEncoder(dim=256).encode(["Enterprise cloud software provider"])[0],
+                          vectors[1])
+
+
+def test_use_encoder_switches_default_and_cache_key(monkeypatch):
+    from dcf_app.utils.loader import description_vector_key
+
+    # setenv records the original value, so teardown also undoes use_encoder's write
+    monkeypatch.setenv(nlp_service.ENCODER_ENV_VAR, nlp_service.DEFAULT_ENCODER)
+    company = {"name": "A", "description": "alpha"}
+    default_key = description_vector_key(company)
+
+    nlp_service.use_encoder("hashing")
+    assert isinstance(nlp_service.get_encoder(), nlp_service.HashingEncoder)
+    assert description_vector_key(company) != default_key
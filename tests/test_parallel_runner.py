@@ -0,0 +1,96 @@
+from multiprocessing import Pool
+import numpy as np
+import pandas as pd
+import pytest
+from threadpoolctl import threadpool_info
+from dcf_app.models import peer_matcher
+from dcf_app.services import parallel_runner
+from dcf_app.services.nlp_service import get_encoder
+from dcf_app.services.peer_matcher_service import run_peer_match_pipeline
+from dcf_app.utils import loader, vector_cache
+
+
+def _fake_attach(companies, **kwargs):
+    rng = np.random.default_rng(0)
+    for company in companies:
+        company["vector"] = rng.normal(size=8).astype(np.float32)
+
+
+def test_run_watchlist_streams_results_from_shared_memory(monkeypatch, tmp_path):
+    universe = pd.DataFrame({
+        "ticker": [f"T{i}" for i in range(12)],
+        "name": [f"Company {i}" for i in range(12)],
+        "description": ["x"] * 12,
+        "revenue_base": np.linspace(100, 1200, 12),
+        "revenue_growth": [0.05] * 12,
+        "ebitda_margin": [0.2] * 12,
+        "ev_ebitda": np.linspace(5, 20, 12),
+        "pe_ratio": [20.0] * 12,
+    })
+    path = tmp_path / "universe.csv"
+    universe.to_csv(path, index=False)
+    monkeypatch.setattr(parallel_runner, "attach_peer_vectors", _fake_attach)
+    monkeypatch.setattr(parallel_runner, "load_fallback_target", lambda name: None)
+
+    results = list(parallel_runner.run_watchlist(
+        ["T1", "company 5", "UNKNOWN"], processes=2, universe_path=str(path), top_n_peers=3
+    ))
+
+    by_name = {r["company_name"]: r for r in results}
+    assert set(by_name) == {"T1", "company 5", "UNKNOWN"}
+    assert "error" in by_name["UNKNOWN"]
+    assert len(by_name["T1"]["top_peers"]) == 3
+    assert "Company 1" not in [p["name"] for p in by_name["T1"]["top_peers"]]
+    assert by_name["company 5"]["dcf_value"] > 0
+
+
+def test_out_of_universe_target_matches_single_run(monkeypatch, tmp_path):
+    universe = pd.DataFrame({
+        "ticker": [f"T{i}" for i in range(6)],
+        "name": [f"Company {i}" for i in range(6)],
+        "description": [f"maker of product line {i}" for i in range(6)],
+        "revenue_base": np.linspace(1e8, 6e8, 6),
+        "revenue_growth": [0.05] * 6,
+        "ebitda_margin": [0.2] * 6,
+        "ev_ebitda": np.linspace(5, 15, 6),
+        "pe_ratio": [20.0] * 6,
+    })
+    path = tmp_path / "universe.csv"
+    universe.to_csv(path, index=False)
+    info = {"longBusinessSummary": "maker of product line 2", "totalRevenue": 3.5e8, "ebitdaMargins": 0.3}
+
+    def fake_attach(companies, **kwargs):
+        for company in companies:
+            company["desc_vector"] = get_encoder().encode([company["description"]])[0]
+
+    monkeypatch.setenv("DCF_ENCODER", "hashing")
+    monkeypatch.setattr(vector_cache, "_cache", vector_cache.VectorCache(str(tmp_path / "cache.sqlite")))
+    monkeypatch.setattr(peer_matcher, "attach_description_vectors", fake_attach)
+    monkeypatch.setattr(loader, "get_ticker_info", lambda ticker: info)
+
+    [watchlist] = parallel_runner.run_watchlist(["NEWCO"], processes=1, universe_path=str(path),
+                                                top_n_peers=6, min_similarity=-1.0)
+    single = run_peer_match_pipeline("NEWCO", top_n_peers=6, min_similarity=-1.0,
+                                     peer_universe=peer_matcher.load_matching_universe(str(path)))
+
+    assert sorted(p["name"] for p in watchlist["top_peers"]) == sorted(p["name"] for p in single["top_peers"])
+    assert watchlist["dcf_value"] == pytest.approx(single["dcf_value"])
+    assert watchlist["peer_value"] == pytest.approx(single["peer_value"])
+    assert watchlist["combined_valuation"] == pytest.approx(single["combined_valuation"])
+
+
+def test_read_tickers_file(tmp_path):
+    path = tmp_path / "watchlist.txt"
+    path.write_text("AAPL\n\n# comment\n MSFT \n")
+    assert parallel_runner.read_tickers_file(str(path)) == ["AAPL", "MSFT"]
+
+
+def _blas_threads():
+    return [pool["num_threads"] for pool in threadpool_info() if pool["user_api"] == "blas"]
+
+
+def test_worker_thread_limit_applies_to_loaded_blas():
+    with Pool(processes=1, initializer=parallel_runner._limit_threads, initargs=(3,)) as pool:
+        threads = pool.apply(_blas_threads)
+
+    assert threads and set(threads) == {3}
@@ -0,0 +1,66 @@
+import logging
+import numpy as np
+from dcf_app.models.peer_filters import build_filter_index, candidate_rows, resolve_peer_filters
+from dcf_app.models.peer_matcher import build_peer_matrix, find_closest_peers
+
+
+def _universe(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    sectors = ["Technology", "Healthcare", "Energy"]
+    peers = []
+    for i in range(n):
+        peers.append({
+            "name": f"Company {i}",
+            "sector": sectors[i % 3],
+            "industry": f"Industry {i % 7}",
+            "revenue_base": float(rng.uniform(1e6, 1e9)),
+            "ev_ebitda": float(rng.uniform(0, 40)) if i % 5 else None,
+            "pe_ratio": float("inf") if i % 11 == 0 else float(rng.uniform(5, 50)),
+            "vector": rng.normal(size=16).astype(np.float32),
+        })
+    return peers
+
+
+def test_candidate_rows_match_brute_force():
+    peers = _universe()
+    index = build_filter_index(peers)
+
+    rows = candidate_rows(index, sector="technology", revenue_range=(2e8, 8e8),
+                          multiple_ranges={"ev_ebitda": (3, 30)})
+
+    expected = [
+        i for i, p in enumerate(peers)
+        if p["sector"] == "Technology" and 2e8 <= p["revenue_base"] <= 8e8
+        and p["ev_ebitda"] is not None and 3 <= p["ev_ebitda"] <= 30
+    ]
+    assert rows.tolist() == expected
+    assert candidate_rows(index) is None
+    assert candidate_rows(index, sector="Utilities").size == 0
+    assert 0 not in candidate_rows(index, multiple_ranges={"pe_ratio": (0, None)})  # inf never matches a bound
+
+
+def test_filtered_search_equals_search_over_filtered_universe():
+    peers = _universe()
+    peer_matrix = build_peer_matrix(peers)
+    index = build_filter_index(peers, peer_matrix[1])
+    target = peers[0]
+
+    rows = candidate_rows(index, **resolve_peer_filters({"same_sector": True, "revenue_band": (0.5, 2)}, target))
+    filtered = find_closest_peers(target["vector"], peers, top_k=5, target_name=target["name"],
+                                  peer_matrix=peer_matrix, candidate_rows=rows, min_similarity=-1.0)
+
+    low, high = 0.5 * target["revenue_base"], 2 * target["revenue_base"]
+    subset = [p for p in peers if p["sector"] == target["sector"] and low <= p["revenue_base"] <= high]
+    expected = find_closest_peers(target["vector"], subset, top_k=5, target_name=target["name"],
+                                  min_similarity=-1.0)
+
+    assert [p["name"] for p, _ in filtered] == [p["name"] for p, _ in expected]
+    assert all(p["sector"] == target["sector"] for p, _ in filtered)
+
+
+def test_same_sector_without_target_sector_warns(caplog):
+    with caplog.at_level(logging.WARNING, logger="dcf_app.models.peer_filters"):
+        resolved = resolve_peer_filters({"same_sector": True}, {"name": "NEWCO", "sector": None})
+
+    assert resolved["sector"] is None
+    assert "same_sector ignored" in caplog.text
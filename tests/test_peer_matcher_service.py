@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+from dcf_app.models import peer_matcher
+from dcf_app.models.peer_matcher import build_peer_matrix, find_closest_peers, find_closest_peers_weighted
+from dcf_app.utils import loader
+from dcf_app.utils.loader import _combine_vector
+from dcf_app.services.peer_matcher_service import run_peer_match_pipeline
+
+
+def _fake_attach(companies, **kwargs):
+    rng = np.random.default_rng(1)
+    for company in companies:
+        company["desc_vector"] = rng.normal(size=8).astype(np.float32)
+
+
+def _universe(tmp_path, monkeypatch):
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({
+        "ticker": [f"T{i}" for i in range(10)],
+        "name": [f"Company {i}" for i in range(10)],
+        "description": ["x"] * 10,
+        "revenue_base": np.linspace(100, 1000, 10),
+        "revenue_growth": rng.uniform(0, 0.2, 10),
+        "ebitda_margin": rng.uniform(0.1, 0.4, 10),
+        "capex_pct": rng.uniform(0.01, 0.1, 10),
+        "ev_ebitda": np.linspace(5, 20, 10),
+        "pe_ratio": [20.0] * 10,
+    })
+    path = tmp_path / "universe.csv"
+    df.to_csv(path, index=False)
+    monkeypatch.setattr(peer_matcher, "attach_description_vectors", _fake_attach)
+    return peer_matcher.load_matching_universe(str(path))
+
+
+def test_pipeline_reuses_preloaded_universe(tmp_path, monkeypatch):
+    universe = _universe(tmp_path, monkeypatch)
+    peer_data, features = universe
+    snapshot = features["desc"].copy()
+
+    result = run_peer_match_pipeline("t3", top_n_peers=4, peer_universe=universe)
+
+    names = [peer["name"] for peer in result["top_peers"]]
+    assert len(names) == 4 and "Company 3" not in names
+    assert len(peer_data) == 10 and np.array_equal(features["desc"], snapshot)
+
+
+def test_query_time_weighting_matches_combined_vectors(tmp_path, monkeypatch):
+    peer_data, features = _universe(tmp_path, monkeypatch)
+    target = peer_data[0]
+
+    for desc_weight in (0.2, 0.5, 0.85, 1.0):
+        for peer in peer_data:
+            peer["vector"] = _combine_vector(peer, peer["desc_vector"], desc_weight=desc_weight)
+        expected = find_closest_peers(target["vector"], peer_data, top_k=9, target_name=target["name"],
+                                      peer_matrix=build_peer_matrix(peer_data), min_similarity=-1.0)
+        weighted = find_closest_peers_weighted(target, peer_data, features, desc_weight=desc_weight, top_k=9,
+                                               target_name=target["name"], min_similarity=-1.0)
+
+        assert [p["name"] for p, _ in weighted] == [p["name"] for p, _ in expected]
+        assert np.allclose([s for _, s in weighted], [s for _, s in expected], atol=1e-5)
+
+
+def test_pipeline_on_universe_uses_fallback_target(tmp_path, monkeypatch):
+    universe = _universe(tmp_path, monkeypatch)
+    target = {"name": "NEWCO", "description": "y", "revenue_base": 500.0, "ebitda_margin": 0.25,
+              "revenue_growth": 0.1, "capex_pct": 0.05}
+    monkeypatch.setattr("dcf_app.services.peer_matcher_service.load_fallback_target", lambda *args: dict(target))
+    monkeypatch.setattr(peer_matcher, "create_description_vectors",
+                        lambda companies, batch_size=64: [np.ones(8, dtype=np.float32) for _ in companies])
+
+    result = run_peer_match_pipeline("NEWCO", top_n_peers=3, peer_universe=universe)
+
+    assert result["company_name"] == "NEWCO"
+    assert len(result["top_peers"]) == 3
+    assert len(universe[0]) == 10  # The shared universe is not modified
+
+
+def test_pipeline_on_universe_applies_peer_filters(tmp_path, monkeypatch):
+    universe = _universe(tmp_path, monkeypatch)
+
+    result = run_peer_match_pipeline("t3", top_n_peers=5, peer_universe=universe,
+                                     peer_filters={"revenue_range": (500, 1000)})
+
+    allowed = {p["name"] for p in universe[0] if p["revenue_base"] >= 500}
+    names = [peer["name"] for peer in result["top_peers"]]
+    assert names and set(names) <= allowed
+
+
+def test_filtered_runs_without_universe_share_one_memoized_universe(tmp_path, monkeypatch):
+    _universe(tmp_path, monkeypatch)
+    monkeypatch.setattr(loader, "PEER_UNIVERSE_CSV", str(tmp_path / "universe.csv"))
+    loads = []
+    load = peer_matcher.load_matching_universe
+    monkeypatch.setattr(peer_matcher, "load_matching_universe", lambda *a, **k: loads.append(a) or load(*a, **k))
+
+    for low in (500, 300):
+        result = run_peer_match_pipeline("t3", top_n_peers=3, peer_filters={"revenue_range": (low, 1000)})
+        assert all(peer["name"] != "Company 0" for peer in result["top_peers"])
+
+    assert len(loads) == 1
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import numpy as np
+import pandas as pd
+from dcf_app.models import peer_matcher
+from dcf_app.services.async_pipeline import run_peer_match_pipeline_async
+from dcf_app.services.peer_matcher_service import run_peer_match_pipeline
+from dcf_app.utils import loader
+from dcf_app.utils.profiling import profiled, span, count, with_timing, format_report
+
+
+def _universe(tmp_path, monkeypatch):
+    def fake_attach(companies, **kwargs):
+        rng = np.random.default_rng(1)
+        for company in companies:
+            company["desc_vector"] = rng.normal(size=8).astype(np.float32)
+
+    df = pd.DataFrame({
+        "ticker": [f"T{i}" for i in range(6)],
+        "name": [f"Company {i}" for i in range(6)],
+        "description": ["x"] * 6,
+        "sector": ["Technology"] * 6,
+        "revenue_base": np.linspace(100, 600, 6),
+        "revenue_growth": [0.1] * 6,
+        "ebitda_margin": [0.2] * 6,
+        "capex_pct": [0.05] * 6,
+        "ev_ebitda": np.linspace(5, 15, 6),
+        "pe_ratio": [20.0] * 6,
+    })
+    path = tmp_path / "universe.csv"
+    df.to_csv(path, index=False)
+    monkeypatch.setattr(peer_matcher, "attach_description_vectors", fake_attach)
+    return peer_matcher.load_matching_universe(str(path))
+
+
+def test_spans_and_counters_accumulate():
+    with profiled() as profile:
+        for _ in range(3):
+            with span("stage"):
+                count("hits", 2)
+        with profiled() as inner:
+            count("hits")
+
+    report = profile.report()
+    assert inner is profile
+    assert report["stages"]["stage"]["calls"] == 3
+    assert report["counters"] == {"hits": 7}
+    assert "stage" in format_report(report)
+
+
+def test_spans_are_no_ops_without_a_profile():
+    with span("stage"):
+        count("hits")
+
+    @with_timing
+    def valuation():
+        with span("dcf"):
+            return {"value": 1.0}
+
+    result = valuation()
+    assert result["value"] == 1.0
+    assert result["timing"]["stages"]["dcf"]["calls"] == 1
+
+
+def test_pipeline_result_has_timing_block(tmp_path, monkeypatch):
+    universe = _universe(tmp_path, monkeypatch)
+
+    result = run_peer_match_pipeline("t2", top_n_peers=3, peer_universe=universe)
+    async_result = asyncio.run(run_peer_match_pipeline_async("t2", top_n_peers=3, peer_universe=universe))
+
+    for timing in (result["timing"], async_result["timing"]):
+        assert {"similarity", "dcf", "peer_multiples"} <= set(timing["stages"])
+        assert timing["counters"]["candidates_scored"] == 6
+        assert timing["total_seconds"] >= timing["stages"]["similarity"]["seconds"]
+
+
+def test_vector_cache_messages_are_debug_logs(monkeypatch, caplog, capsys):
+    monkeypatch.setattr(loader, "get_cached_vector", lambda key: np.ones(4, dtype=np.float32))
+
+    with caplog.at_level(logging.DEBUG, logger="dcf_app.utils.loader"), profiled() as profile:
+        loader.create_description_vector({"name": "Company 1", "description": "cloud software"})
+
+    assert capsys.readouterr().out == ""
+    assert any(record.levelno == logging.DEBUG for record in caplog.records)
+    assert profile.report()["counters"]["vector_cache_hits"] == 1
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from dcf_app.models.quantized_index import QuantizedMatrix, evaluate_quantization
+from dcf_app.models.peer_matcher import (
+    build_peer_matrix, build_peer_features, find_closest_peers, find_closest_peers_weighted
+)
+
+
+def _clustered_matrix(n_clusters=20, per_cluster=50, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim))
+    return np.vstack([c + 0.3 * rng.normal(size=(per_cluster, dim)) for c in centers]).astype(np.float32)
+
+
+@pytest.mark.parametrize("dtype, max_ratio", [("int8", 0.3), ("float16", 0.5)])
+def test_quantized_products_are_close_and_smaller(dtype, max_ratio):
+    matrix = _clustered_matrix()
+    quantized = QuantizedMatrix(matrix, dtype=dtype, block_size=128)
+
+    query = matrix[3]
+    assert np.allclose(quantized @ query, matrix @ query, rtol=0.02, atol=0.05 * np.abs(matrix @ query).max())
+    assert np.allclose(quantized[[1, 5]] @ query, (quantized @ query)[[1, 5]])
+    assert quantized.nbytes <= max_ratio * matrix.nbytes + 1
+
+
+def test_reranking_restores_exact_recall():
+    report = evaluate_quantization(_clustered_matrix(dim=64), dtype="int8", top_k=10, rerank=50, n_queries=50)
+    assert report["recall_at_k"] == 1.0
+    assert report["memory_saved"] > 0.7
+
+
+def test_find_closest_peers_with_quantized_matrix_matches_exact():
+    matrix = _clustered_matrix(dim=16)
+    peers = [{"name": f"Peer {i}", "vector": v} for i, v in enumerate(matrix)]
+    peer_matrix = build_peer_matrix(peers)
+    quantized = QuantizedMatrix(peer_matrix[0], dtype="int8")
+
+    exact = find_closest_peers(matrix[0], peers, top_k=5, target_name="Peer 0", peer_matrix=peer_matrix)
+    approx = find_closest_peers(matrix[0], peers, top_k=5, target_name="Peer 0", peer_matrix=peer_matrix,
+                                quantized=quantized, rerank=20, candidate_rows=np.arange(0, 1000, 2))
+    filtered = find_closest_peers(matrix[0], peers, top_k=5, target_name="Peer 0", peer_matrix=peer_matrix,
+                                  candidate_rows=np.arange(0, 1000, 2))
+    assert [p["name"] for p, _ in filtered] == [p["name"] for p, _ in approx]
+    assert len(exact) == 5
+
+
+def test_weighted_search_with_quantized_features_matches_exact():
+    rng = np.random.default_rng(4)
+    peers = [{"name": f"Peer {i}", "desc_vector": v, "revenue_base": float(rng.uniform(100, 1000)),
+              "revenue_growth": float(rng.uniform(0, 0.2)), "ebitda_margin": float(rng.uniform(0.1, 0.4))}
+             for i, v in enumerate(_clustered_matrix(dim=24))]
+    exact_features = build_peer_features(peers)
+    quantized_features = build_peer_features(peers, quantize="float16")
+
+    exact = find_closest_peers_weighted(peers[0], peers, exact_features, top_k=5, target_name="Peer 0")
+    approx = find_closest_peers_weighted(peers[0], peers, quantized_features, top_k=5, target_name="Peer 0",
+                                         rerank=30)
+    assert [p["name"] for p, _ in approx] == [p["name"] for p, _ in exact]
+    assert np.allclose([s for _, s in approx], [s for _, s in exact])
@@ -0,0 +1,36 @@
+import numpy as np
+from dcf_app.models.dcf_model import discounted_cash_flow, discounted_cash_flow_grid
+from dcf_app.models.dcf_generator import run_sensitivity_analysis, sensitivity_to_frame
+
+FCFS = [100.0, 110.0, 121.0, 133.1, 146.4]
+
+
+def test_grid_matches_scalar_dcf():
+    waccs = [0.08, 0.10, 0.12]
+    growths = [0.01, 0.02, 0.03]
+    grid = discounted_cash_flow_grid(FCFS, waccs, growths)
+
+    for i, wacc in enumerate(waccs):
+        for j, growth in enumerate(growths):
+            expected, _ = discounted_cash_flow(FCFS, wacc=wacc, terminal_growth=growth)
+            assert np.isclose(grid[i, j], expected)
+
+
+def test_wacc_at_or_below_growth_is_nan():
+    grid = discounted_cash_flow_grid(FCFS, [0.02, 0.03, 0.05], [0.03])
+    assert np.isnan(grid[0, 0]) and np.isnan(grid[1, 0])
+    assert np.isfinite(grid[2, 0])
+
+
+def test_run_sensitivity_analysis_fine_grid():
+    forecast = [{"fcf": f} for f in FCFS]
+    result = run_sensitivity_analysis(forecast, (0.02, 0.12), (0.02, 0.04), num_points=120)
+
+    matrix = result["valuation_matrix"]
+    assert len(matrix) == 120 and len(matrix[0]) == 120
+    assert matrix[0][-1] is None
+    assert isinstance(matrix[-1][0], float)
+
+    frame = sensitivity_to_frame(result)
+    assert frame.shape == (120, 120)
+    assert frame.index[0] == "WACC: 2.00%"
@@ -0,0 +1,36 @@
+import numpy as np
+from dcf_app.models.similarity import stack_peer_vectors, normalize_rows, cosine_scores, top_k_indices
+
+
+def _brute_force(target, vectors):
+    return [float(np.dot(target, v) / (np.linalg.norm(target) * np.linalg.norm(v))) for v in vectors]
+
+
+def test_stack_peer_vectors_skips_invalid_rows():
+    peers = [
+        {"name": "A", "vector": np.array([1.0, 0.0, 0.0])},
+        {"name": "B", "vector": None},
+        {"name": "C", "vector": np.array([np.nan, 1.0, 0.0])},
+        {"name": "D", "vector": np.array([0.0, 1.0])},
+        {"name": "E", "vector": [0.5, 0.5, 0.0]},
+    ]
+    matrix, positions = stack_peer_vectors(peers)
+    assert matrix.dtype == np.float32
+    assert matrix.flags["C_CONTIGUOUS"]
+    assert positions.tolist() == [0, 4]
+
+
+def test_cosine_scores_match_pairwise():
+    rng = np.random.default_rng(0)
+    target = rng.normal(size=16)
+    vectors = rng.normal(size=(50, 16))
+    scores = cosine_scores(target, normalize_rows(vectors), normalized=True)
+    assert np.allclose(scores, _brute_force(target, vectors), atol=1e-5)
+
+
+def test_top_k_indices_respects_mask_and_order():
+    scores = np.array([0.1, 0.9, 0.5, 0.95, 0.7], dtype=np.float32)
+    mask = np.array([True, True, True, False, True])
+    assert top_k_indices(scores, 3, mask=mask).tolist() == [1, 4, 2]
+    assert top_k_indices(scores, 10).tolist() == [3, 1, 4, 2, 0]
+    assert top_k_indices(scores, 0).size == 0
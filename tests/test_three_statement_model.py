@@ -0,0 +1,38 @@
+import numpy as np
+from dcf_app.models.three_statement_model import forecast_3_statement, forecast_3_statement_batch
+from dcf_app.models.dcf_generator import generate_forecasted_fcfs_batch
+
+INPUTS = {
+    "revenue_base": [1000.0, 250.0, 40.0],
+    "revenue_growth": [0.05, 0.12, -0.02],
+    "ebitda_margin": [0.25, 0.30, 0.10],
+    "capex_pct": [0.10, 0.05, 0.02],
+    "depreciation_pct": [0.05, 0.04, 0.03],
+    "nwc_pct": [0.04, 0.02, 0.01],
+    "tax_rate": [0.25, 0.21, 0.30],
+}
+
+
+def test_batch_matches_per_company_forecast():
+    batch = forecast_3_statement_batch(**INPUTS, years=6)
+    assert batch["fcf"].shape == (3, 6)
+
+    for i in range(3):
+        single = forecast_3_statement(**{k: v[i] for k, v in INPUTS.items()}, years=6)
+        for field in ("revenue", "ebitda", "depreciation", "nopat", "capex", "change_nwc", "fcf"):
+            assert np.allclose(batch[field][i], [year[field] for year in single])
+
+
+def test_scalars_broadcast_and_missing_values_use_defaults():
+    batch = forecast_3_statement_batch(
+        revenue_base=[100.0, 200.0], revenue_growth=0.1, ebitda_margin=0.2,
+        capex_pct=None, depreciation_pct=None, nwc_pct=None, tax_rate=[None, 0.0]
+    )
+    expected_nopat = batch["ebitda"] * (1 - 0.21)
+    assert np.allclose(batch["nopat"], expected_nopat)
+    assert np.allclose(batch["fcf"], batch["nopat"])
+
+
+def test_generate_forecasted_fcfs_batch():
+    fcfs = generate_forecasted_fcfs_batch(INPUTS)
+    assert fcfs.shape == (3, 5)
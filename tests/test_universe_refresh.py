@@ -0,0 +1,67 @@
+import hashlib
+import numpy as np
+import pandas as pd
+from dcf_app.services import universe_refresh
+from dcf_app.services.universe_refresh import refresh_universe, diff_snapshots
+from dcf_app.utils.embedding_store import EmbeddingStore
+
+
+def _records(n=5):
+    return [
+        {"ticker": f"T{i}", "name": f"Company {i}", "description": f"Business {i}",
+         "revenue_growth": 0.05, "ebitda_margin": 0.2, "capex_pct": 0.04, "ev_ebitda": 10.0 + i}
+        for i in range(n)
+    ]
+
+
+class FakeEncoder:
+    def __init__(self):
+        self.encoded = []
+
+    def __call__(self, companies, batch_size=64):
+        self.encoded.extend(c["ticker"] for c in companies)
+        return [
+            np.frombuffer(hashlib.sha256(c["description"].encode()).digest(), dtype=np.uint8)[:8].astype(np.float32) + 1
+            for c in companies
+        ]
+
+
+def test_refresh_re_embeds_only_changed_rows(tmp_path, monkeypatch):
+    encoder = FakeEncoder()
+    monkeypatch.setattr(universe_refresh, "create_description_vectors", encoder)
+    store = EmbeddingStore(str(tmp_path / "store"))
+    path = str(tmp_path / "universe.csv")
+
+    first = refresh_universe(_records(), universe_path=path, store=store)
+    assert first["embedded"] == 5 and len(store) == 5
+    view = store.get("T1")
+
+    updated = _records()
+    updated[1]["description"] = "Pivoted to something else"  # vector input changed
+    updated[2]["ev_ebitda"] = 25.0                           # fundamentals only
+    updated[3]["capex_pct"] = 0.08                           # numerics are applied at query time
+    del updated[4]
+    updated.append({**_records(6)[5]})
+    encoder.encoded.clear()
+
+    summary = refresh_universe(updated, universe_path=path, store=store)
+
+    assert sorted(encoder.encoded) == ["T1", "T5"]
+    assert (summary["added"], summary["changed"], summary["removed"]) == (1, 3, 1)
+    assert len(store) == 6  # T1 overwritten in place, T5 appended
+    assert np.array_equal(store.get("T1"), encoder([updated[1]])[0])
+    assert np.array_equal(view, store.get("T1"))  # Open views see the in-place update
+    assert pd.read_csv(path)["ticker"].tolist() == ["T0", "T1", "T2", "T3", "T5"]
+
+    # Nothing changed since the last refresh: nothing is re-embedded, even in a new process
+    encoder.encoded.clear()
+    reopened = EmbeddingStore(str(tmp_path / "store"))
+    assert refresh_universe(updated, universe_path=path, store=reopened)["embedded"] == 0
+    assert encoder.encoded == []
+
+
+def test_diff_snapshots_treats_missing_values_as_equal():
+    old = [{"ticker": "A", "pe_ratio": float("nan"), "name": "A"}]
+    new = [{"ticker": "A", "pe_ratio": None, "name": "A"}, {"ticker": "B", "name": "B"}]
+    diff = diff_snapshots(old, new)
+    assert diff["unchanged"] == ["A"] and diff["added"] == ["B"] and diff["changed"] == []
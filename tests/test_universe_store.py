@@ -0,0 +1,67 @@
+import os
+import pandas as pd
+from dcf_app.utils import universe_store
+from dcf_app.utils.universe_store import (
+    load_universe_frame, load_universe_records, convert_csv_to_parquet, KEY_COLUMNS, NUMERIC_COLUMNS
+)
+
+
+def _write_csv(path, n=5):
+    pd.DataFrame({
+        "ticker": [f"T{i}" for i in range(n)],
+        "name": [f"Company {i}" for i in range(n)],
+        "description": ["long text " * 50] * n,
+        "sector": ["Technology"] * n,
+        "revenue_base": list(range(100, 100 + n)),
+        "ev_ebitda": [10.0] * n,
+    }).to_csv(path, index=False)
+
+
+def test_frame_is_memoized_and_invalidated_by_mtime(tmp_path):
+    path = str(tmp_path / "universe.csv")
+    _write_csv(path)
+
+    first = load_universe_frame(path)
+    assert load_universe_frame(path) is first
+    assert first["revenue_base"].dtype == "float64"
+
+    _write_csv(path, n=7)
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10**9))
+    assert len(load_universe_frame(path)) == 7
+
+
+def test_projection_skips_descriptions(tmp_path):
+    path = str(tmp_path / "universe.csv")
+    _write_csv(path)
+
+    records = load_universe_records(path, columns=KEY_COLUMNS + NUMERIC_COLUMNS)
+    assert "description" not in records[0]
+    assert records[0]["ticker"] == "T0" and records[0]["ev_ebitda"] == 10.0
+
+    # Records are fresh dicts, so callers can attach vectors without touching the cache
+    records[0]["vector"] = [1.0]
+    assert "vector" not in load_universe_records(path, columns=KEY_COLUMNS + NUMERIC_COLUMNS)[0]
+
+    # A projection onto columns the file lacks loads nothing, not every column
+    assert load_universe_frame(path, columns=["earnings"]).empty
+
+
+def test_parquet_copy_is_preferred_when_newer(tmp_path):
+    csv_path = str(tmp_path / "universe.csv")
+    _write_csv(csv_path)
+    parquet_path = convert_csv_to_parquet(csv_path)
+
+    assert universe_store.resolve_universe_path(csv_path) == parquet_path
+    df = load_universe_frame(csv_path, columns=["ticker", "revenue_base"])
+    assert list(df.columns) == ["ticker", "revenue_base"]
+    assert df["revenue_base"].tolist() == [100.0, 101.0, 102.0, 103.0, 104.0]
+
+
+def test_csv_fallback_without_pyarrow(tmp_path, monkeypatch):
+    path = str(tmp_path / "universe.csv")
+    _write_csv(path)
+    monkeypatch.setattr(universe_store, "pa", None)
+
+    df = load_universe_frame(path, columns=["name", "revenue_base"])
+    assert list(df.columns) == ["name", "revenue_base"]
+    assert df["revenue_base"].dtype == "float64"
@@ -0,0 +1,90 @@
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from dcf_app.models import peer_matcher
+from dcf_app.services import valuation_service
+from dcf_app.services.peer_matcher_service import run_peer_match_pipeline
+from dcf_app.services.valuation_client import ValuationClient
+from dcf_app.services.valuation_service import ValuationService, create_server
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    def fake_attach(companies, **kwargs):
+        rng = np.random.default_rng(1)
+        for company in companies:
+            company["desc_vector"] = rng.normal(size=8).astype(np.float32)
+
+    df = pd.DataFrame({
+        "ticker": [f"T{i}" for i in range(8)],
+        "name": [f"Company {i}" for i in range(8)],
+        "description": ["x"] * 8,
+        "sector": ["Technology", "Energy"] * 4,
+        "revenue_base": np.linspace(100, 800, 8),
+        "revenue_growth": [0.1] * 8,
+        "ebitda_margin": [0.2] * 8,
+        "capex_pct": [0.05] * 8,
+        "ev_ebitda": np.linspace(5, 15, 8),
+        "pe_ratio": [20.0] * 8,
+    })
+    path = tmp_path / "universe.csv"
+    df.to_csv(path, index=False)
+    monkeypatch.setenv("DCF_ENCODER", "hashing")
+    monkeypatch.setattr(peer_matcher, "attach_description_vectors", fake_attach)
+
+    return ValuationService(str(path))
+
+
+@pytest.fixture
+def client(service):
+    server = create_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    yield ValuationClient(f"http://{host}:{port}")
+    server.shutdown()
+    server.server_close()
+
+
+def test_pipeline_endpoint_matches_local_pipeline(service, client):
+    local = run_peer_match_pipeline("t3", top_n_peers=3, peer_filters={"same_sector": True},
+                                    peer_universe=service.universe)
+    remote = client.pipeline("t3", top_n_peers=3, peer_filters={"same_sector": True})
+
+    assert [p["name"] for p in remote["top_peers"]] == [p["name"] for p in local["top_peers"]]
+    assert remote["combined_valuation"] == pytest.approx(local["combined_valuation"])
+    assert client.health()["companies"] == 8
+
+
+def test_batch_and_sensitivity_endpoints(client):
+    results = client.batch(["t1", "t2"], top_n_peers=2)
+    assert [r["company_name"] for r in results] == ["t1", "t2"]
+
+    grid = client.sensitivity((0.08, 0.12), (0.02, 0.03), company_name="t1", num_points=3)
+    assert len(grid["valuation_matrix"]) == 3
+    assert grid == client.sensitivity((0.08, 0.12), (0.02, 0.03), fcfs=results[0]["fcfs"], num_points=3)
+
+
+def test_bad_requests_are_rejected(client):
+    with pytest.raises(ValueError, match="Unknown option"):
+        client.pipeline("t1", no_such_option=1)
+    with pytest.raises(ValueError, match="wacc_range"):
+        client.sensitivity((0.08,), (0.02, 0.03), fcfs=[1.0, 2.0])
+    with pytest.raises(ValueError, match="top_n_peers must be an integer"):
+        client.pipeline("t1", top_n_peers="5")
+    with pytest.raises(ValueError, match="same_sector must be true or false"):
+        client.pipeline("t1", peer_filters={"same_sector": "yes"})
+    with pytest.raises(ValueError, match="limited to 200 points"):
+        client.sensitivity((0.08, 0.12), (0.02, 0.03), fcfs=[1.0, 2.0], num_points=10_000)
+    with pytest.raises(ValueError, match="limited to 200 points"):
+        client.sensitivity((0.08, 0.12), (0.02, 0.03), fcfs=[1.0, 2.0], step=1e-6)
+
+
+def test_server_errors_are_not_reported_as_bad_requests(client, monkeypatch):
+    def broken_pipeline(*args, **kwargs):
+        raise TypeError("unsupported operand type(s)")
+
+    monkeypatch.setattr(valuation_service, "run_peer_match_pipeline", broken_pipeline)
+    with pytest.raises(RuntimeError, match="unsupported operand"):
+        client.pipeline("t1")
+
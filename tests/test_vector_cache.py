@@ -0,0 +1,46 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dcf_app.utils.vector_cache import VectorCache
+from dcf_app.utils.lru import LRUCache
+
+
+def test_set_and_get_roundtrip(tmp_path):
+    cache = VectorCache(str(tmp_path / "cache.sqlite"))
+    cache.set("Apple Inc.", [0.1, 0.2, 0.3])
+
+    vector = cache.get("Apple Inc.")
+    assert vector.dtype == np.float32
+    assert np.allclose(vector, [0.1, 0.2, 0.3])
+    assert cache.get("Missing Co") is None
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    VectorCache(path).set("Apple Inc.", [1.0, 2.0])
+
+    reopened = VectorCache(path)
+    assert len(reopened.memory) == 0
+    assert np.allclose(reopened.get("Apple Inc."), [1.0, 2.0])
+    assert len(reopened.memory) == 1
+
+
+def test_concurrent_writers_keep_every_entry(tmp_path):
+    cache = VectorCache(str(tmp_path / "cache.sqlite"), maxsize=8)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda i: cache.set(f"company-{i}", np.full(4, i)), range(200)))
+
+    assert len(cache) == 200
+    assert len(cache.memory) == 8
+    assert np.allclose(cache.get("company-17"), 17.0)
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert "a" in cache and "c" in cache
+    assert cache.get("b") is None
+    assert len(cache) == 2
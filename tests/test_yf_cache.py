@@ -0,0 +1,80 @@
+import threading
+import time
+import pandas as pd
+import pytest
+from dcf_app.utils.yf_cache import YFinanceCache, CachedTicker
+
+
+class CountingFetcher:
+    def __init__(self, value, delay=0.0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, ticker):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if isinstance(self.value, Exception):
+            raise self.value
+        return self.value
+
+
+def test_memory_and_disk_hits_skip_the_network(tmp_path):
+    path = str(tmp_path / "yf.sqlite")
+    fetch = CountingFetcher({"shortName": "Apple", "totalRevenue": 1e9})
+    cache = YFinanceCache(path, fetchers={"info": fetch})
+
+    assert cache.get("info", "aapl")["shortName"] == "Apple"
+    assert cache.get("info", "AAPL")["shortName"] == "Apple"
+    assert fetch.calls == 1
+
+    # A new process-level cache reads the response back from disk
+    reopened = YFinanceCache(path, fetchers={"info": fetch})
+    assert reopened.get("info", "AAPL")["totalRevenue"] == 1e9
+    assert fetch.calls == 1
+
+
+def test_ttl_is_per_kind(tmp_path):
+    now = [1000.0]
+    info = CountingFetcher({"shortName": "X"})
+    frame = pd.DataFrame({"2024-03-31": [10.0], "2023-12-31": [9.0]}, index=["Total Revenue"])
+    financials = CountingFetcher(frame)
+    cache = YFinanceCache(str(tmp_path / "yf.sqlite"), ttls={"info": 10, "quarterly_financials": 100},
+                          fetchers={"info": info, "quarterly_financials": financials}, clock=lambda: now[0])
+
+    ticker = CachedTicker("X", cache=cache)
+    ticker.info
+    assert ticker.quarterly_financials.loc["Total Revenue"].iloc[0] == 10.0
+
+    now[0] += 50
+    ticker.info
+    ticker.quarterly_financials
+    assert info.calls == 2
+    assert financials.calls == 1
+
+
+def test_concurrent_misses_share_one_fetch(tmp_path):
+    fetch = CountingFetcher({"shortName": "Slow"}, delay=0.2)
+    cache = YFinanceCache(str(tmp_path / "yf.sqlite"), fetchers={"info": fetch})
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("info", "SLOW"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert fetch.calls == 1
+    assert len(results) == 8 and all(r["shortName"] == "Slow" for r in results)
+
+
+def test_failures_are_not_cached(tmp_path):
+    fetch = CountingFetcher(RuntimeError("rate limited"))
+    cache = YFinanceCache(str(tmp_path / "yf.sqlite"), fetchers={"info": fetch})
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            cache.get("info", "FAIL")
+    assert fetch.calls == 2